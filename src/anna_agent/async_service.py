@@ -0,0 +1,366 @@
+"""asyncio HTTP/1.1 server for ``anna serve``.
+
+It exposes the same routes as the threaded server in :mod:`.service`, but
+chat turns are awaited on ``AsyncOpenAI`` instead of holding an OS thread for
+the whole LLM round-trip. Concurrency is bounded, requests time out and the
+server drains in-flight requests on shutdown.
+"""
+
+import asyncio
+import json
+import logging
+import signal
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+
+from .common.registry import registry
+from .config import AnnaEngineConfig, anna_engine_defaults
+from .memory import LanceMemoryStore
+from .runtime import AsyncFrozenPromptSession
+from .service import (
+    health_status,
+    memory_search,
+    session_message,
+    session_state,
+    shared_memory_store,
+    sse_event,
+)
+from .session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    version: str
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> dict[str, Any]:
+        if not self.body:
+            return {}
+        return json.loads(self.body.decode("utf-8"))
+
+
+async def read_request(
+    reader: asyncio.StreamReader, max_body_bytes: int
+) -> Request | None:
+    """Read one request from ``reader``; ``None`` means the peer closed."""
+
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as err:
+        if not err.partial.strip():
+            return None
+        raise HTTPError(400, "incomplete request") from None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "request headers too large") from None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length") from None
+    if length > max_body_bytes:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length > 0 else b""
+    return Request(method, target.split("?", 1)[0], version, headers, body)
+
+
+def response_head(status: int, headers: dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class AsyncService:
+    """Route requests for one workspace on the running event loop.
+
+    At most ``max_concurrency`` requests are handled at once and up to
+    ``max_pending`` more may wait for a slot; beyond that the server answers
+    ``503`` right away so clients can back off.
+    """
+
+    def __init__(
+        self,
+        workspace: Path,
+        *,
+        max_concurrency: int = 256,
+        max_pending: int = 1024,
+        request_timeout: float = 600.0,
+        keepalive_timeout: float = 5.0,
+        shutdown_timeout: float = 30.0,
+        max_body_bytes: int = 1024 * 1024,
+        sessions: SessionManager | None = None,
+        memory_store: LanceMemoryStore | None = None,
+    ):
+        self.workspace = workspace
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self.max_body_bytes = max_body_bytes
+        self.sessions = sessions or SessionManager(
+            AsyncFrozenPromptSession,
+            workspace / anna_engine_defaults.service_session_spill_dir,
+        )
+        self.memory_store = memory_store or shared_memory_store(
+            workspace, AnnaEngineConfig()
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._admitted = 0
+        self._connections: set[asyncio.Task] = set()
+        self._busy: set[asyncio.Task] = set()
+        self._closing = False
+        self._server: asyncio.Server | None = None
+
+    @classmethod
+    def from_config(cls, workspace: Path, cfg) -> "AsyncService":
+        return cls(
+            workspace,
+            max_concurrency=cfg.service_max_concurrency,
+            max_pending=cfg.service_max_pending,
+            request_timeout=cfg.service_request_timeout,
+            keepalive_timeout=cfg.service_keepalive_timeout,
+            shutdown_timeout=cfg.service_shutdown_timeout,
+            max_body_bytes=cfg.service_max_body_bytes,
+            sessions=SessionManager.from_config(
+                workspace, cfg, AsyncFrozenPromptSession
+            ),
+            memory_store=shared_memory_store(workspace, cfg),
+        )
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        self.sessions.start_sweeper()
+        self._server = await asyncio.start_server(
+            self._handle_connection, host, port, limit=64 * 1024
+        )
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def shutdown(self) -> None:
+        """Stop accepting, drain in-flight requests, then drop the rest."""
+
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+        for task in self._connections - self._busy:
+            task.cancel()
+        if self._busy:
+            _, stuck = await asyncio.wait(self._busy, timeout=self.shutdown_timeout)
+            for task in stuck:
+                task.cancel()
+        remaining = list(self._connections)
+        if remaining:
+            await asyncio.gather(*remaining, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        await asyncio.to_thread(self.sessions.close)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while not self._closing:
+                try:
+                    request = await asyncio.wait_for(
+                        read_request(reader, self.max_body_bytes),
+                        self.keepalive_timeout,
+                    )
+                except HTTPError as err:
+                    await self._write_json(
+                        writer, {"error": str(err)}, err.status, keep_alive=False
+                    )
+                    break
+                except (asyncio.TimeoutError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                self._busy.add(task)
+                try:
+                    keep_alive = await self._dispatch(request, writer)
+                finally:
+                    self._busy.discard(task)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> bool:
+        keep_alive = request.keep_alive and not self._closing
+        if self._admitted >= self.max_concurrency + self.max_pending:
+            await self._write_json(writer, {"error": "server busy"}, 503, keep_alive)
+            return keep_alive
+        self._admitted += 1
+        try:
+            async with self._slots:
+                return await asyncio.wait_for(
+                    self._route(request, writer, keep_alive), self.request_timeout
+                )
+        except asyncio.TimeoutError:
+            await self._write_json(
+                writer, {"error": "request timed out"}, 504, keep_alive=False
+            )
+            return False
+        except Exception as err:
+            await self._write_json(writer, {"error": str(err)}, 500, keep_alive)
+            return keep_alive
+        finally:
+            self._admitted -= 1
+
+    async def _route(
+        self, request: Request, writer: asyncio.StreamWriter, keep_alive: bool
+    ) -> bool:
+        method, path = request.method, request.path
+        if method == "GET" and path == "/health":
+            data = health_status(self.workspace)
+        elif method == "GET" and path == "/v1/sessions":
+            data = {"sessions": self.sessions.keys()}
+        elif method == "POST" and path == "/v1/sessions":
+            session_id, state = await asyncio.to_thread(
+                session_state, self.workspace, request.json()
+            )
+            # 会话存取可能读写溢出文件，放到线程中执行
+            await asyncio.to_thread(
+                self.sessions.__setitem__, session_id, AsyncFrozenPromptSession(state)
+            )
+            data = {"session_id": session_id}
+        elif method == "POST" and path == "/v1/chat":
+            session_id, session, message = await asyncio.to_thread(
+                session_message, self.sessions, request.json()
+            )
+            try:
+                data = {"response": await session.chat(message)}
+            finally:
+                await asyncio.to_thread(self.sessions.release, session_id)
+        elif method == "POST" and path == "/v1/chat/stream":
+            session_id, session, message = await asyncio.to_thread(
+                session_message, self.sessions, request.json()
+            )
+            try:
+                await self._stream_chat(writer, session, message)
+            finally:
+                await asyncio.to_thread(self.sessions.release, session_id)
+            return False
+        elif method == "POST" and path == "/v1/memory/search":
+            # LanceDB 检索是阻塞调用，放到线程中执行
+            data = await asyncio.to_thread(
+                memory_search, self.memory_store, request.json()
+            )
+        else:
+            await self._write_json(writer, {"error": "not found"}, 404, keep_alive)
+            return keep_alive
+        await self._write_json(writer, data, 200, keep_alive)
+        return keep_alive
+
+    async def _stream_chat(
+        self, writer: asyncio.StreamWriter, session: Any, message: str
+    ) -> None:
+        writer.write(
+            response_head(
+                200,
+                {
+                    "Content-Type": "text/event-stream; charset=utf-8",
+                    "Cache-Control": "no-cache",
+                    "Connection": "close",
+                },
+            )
+        )
+        # 响应头已发出，之后的错误只能以 SSE 事件的形式告知客户端
+        parts = []
+        try:
+            async for text in session.chat_stream(message):
+                parts.append(text)
+                writer.write(sse_event({"delta": text}))
+                await writer.drain()
+        except ConnectionError:
+            return
+        except Exception as err:
+            writer.write(sse_event({"error": str(err)}, event="error"))
+            await writer.drain()
+            return
+        writer.write(sse_event({"response": "".join(parts)}, event="done"))
+        await writer.drain()
+
+    async def _write_json(
+        self,
+        writer: asyncio.StreamWriter,
+        data: dict[str, Any],
+        status: int,
+        keep_alive: bool,
+    ) -> None:
+        raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            response_head(
+                status,
+                {
+                    "Content-Type": "application/json; charset=utf-8",
+                    "Content-Length": str(len(raw)),
+                    "Connection": "keep-alive" if keep_alive else "close",
+                },
+            )
+            + raw
+        )
+        await writer.drain()
+
+
+async def serve_async(
+    workspace: Path,
+    host: str,
+    port: int,
+    on_ready: Callable[[AsyncService], None] | None = None,
+) -> None:
+    """Run :class:`AsyncService` until SIGINT/SIGTERM, then shut down cleanly."""
+
+    service = AsyncService.from_config(workspace, registry.get("anna_engine_config"))
+    await service.start(host, port)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        with suppress(NotImplementedError, RuntimeError):
+            loop.add_signal_handler(signum, stop.set)
+    if on_ready:
+        on_ready(service)
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Shutting down AnnaAgent API, draining in-flight requests")
+        await service.shutdown()
@@ -1,12 +1,30 @@
 """Load base OpenAI configuration for the OpenAI clients."""
 
-from pathlib import Path
+import asyncio
 import os
+import threading
+import weakref
+from pathlib import Path
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 
-from .config import AnnaEngineConfig, load_config
+from .common.governor import AsyncGovernedClient, EndpointGovernor, GovernedClient
 from .common.registry import registry
+from .common.retry import (
+    AsyncRetryingClient,
+    LatencyWindow,
+    RetryingClient,
+    RetryPolicy,
+)
+from .common.tracing import (
+    AsyncTracingClient,
+    Trace,
+    TracingClient,
+    build_exporters,
+)
+from .config import AnnaEngineConfig, load_config
+from .llm_cache import AsyncCachingChatClient, CachingChatClient, LLMResponseCache
 
 
 def _load_engine_config(workspace: Path | None = None) -> AnnaEngineConfig:
@@ -19,7 +37,9 @@ def _load_engine_config(workspace: Path | None = None) -> AnnaEngineConfig:
     """
 
     root = Path(
-        workspace if workspace is not None else os.getenv("ANNA_AGENT_WORKSPACE", Path.cwd())
+        workspace
+        if workspace is not None
+        else os.getenv("ANNA_AGENT_WORKSPACE", Path.cwd())
     )
     try:
         return load_config(root)
@@ -30,11 +50,18 @@ def _load_engine_config(workspace: Path | None = None) -> AnnaEngineConfig:
 def configure(workspace: Path | None = None) -> None:
     """(Re)load configuration from ``workspace`` and update globals."""
 
-    root = Path(workspace if workspace is not None else os.getenv("ANNA_AGENT_WORKSPACE", Path.cwd()))
+    root = Path(
+        workspace
+        if workspace is not None
+        else os.getenv("ANNA_AGENT_WORKSPACE", Path.cwd())
+    )
     cfg = _load_engine_config(workspace)
     # Register configuration for global access
     registry.register("anna_engine_config", cfg)
     registry.register("anna_agent_workspace", root)
+    registry.unregister("llm_response_cache")
+    registry.unregister("span_exporters")
+    reset_client_pool()
     globals().update(
         {
             "api_key": cfg.api_key,
@@ -65,34 +92,321 @@ def configure(workspace: Path | None = None) -> None:
     )
 
 
+_client_pool: dict[tuple[str, str], OpenAI] = {}
+_client_pool_lock = threading.Lock()
+_endpoint_governors: dict[str, EndpointGovernor] = {}
+_latency_windows: dict[str, LatencyWindow] = {}
+
+
+# Async clients bind their connection pool to the event loop that created them,
+# so they are pooled per running loop.
+_async_client_pools: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _http_options(cfg: AnnaEngineConfig) -> tuple:
+    timeout = httpx.Timeout(cfg.http_timeout, connect=cfg.http_connect_timeout)
+    limits = httpx.Limits(
+        max_connections=cfg.http_max_connections,
+        max_keepalive_connections=cfg.http_max_keepalive_connections,
+        keepalive_expiry=cfg.http_keepalive_expiry,
+    )
+    return timeout, limits
+
+
+def _build_client(cfg: AnnaEngineConfig, api_key: str, base_url: str) -> OpenAI:
+    timeout, limits = _http_options(cfg)
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=timeout,
+        max_retries=_sdk_max_retries(cfg),
+        http_client=DefaultHttpxClient(limits=limits, timeout=timeout),
+    )
+
+
+def _build_async_client(
+    cfg: AnnaEngineConfig, api_key: str, base_url: str
+) -> AsyncOpenAI:
+    timeout, limits = _http_options(cfg)
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=timeout,
+        max_retries=_sdk_max_retries(cfg),
+        http_client=DefaultAsyncHttpxClient(limits=limits, timeout=timeout),
+    )
+
+
+def _sdk_max_retries(cfg: AnnaEngineConfig) -> int:
+    # The retry layer owns retries when enabled; SDK retries would multiply them.
+    return cfg.http_max_retries if cfg.retry_max_attempts <= 1 else 0
+
+
+def get_pooled_client(api_key: str, base_url: str) -> OpenAI:
+    """Return the shared client for ``(api_key, base_url)``.
+
+    Clients keep their HTTP connection pool alive between calls, so repeated
+    turns against the same endpoint reuse TCP/TLS connections.
+    """
+    key = (api_key, base_url)
+    with _client_pool_lock:
+        client = _client_pool.get(key)
+        if client is None:
+            client = _build_client(
+                registry.get("anna_engine_config"), api_key, base_url
+            )
+            _client_pool[key] = client
+        return client
+
+
+def get_endpoint_governor(base_url: str) -> EndpointGovernor | None:
+    """Return the governor shared by every client of ``base_url``.
+
+    The in-flight cap and request rate are the smallest positive
+    ``concurrency.*_max_inflight`` and ``*_requests_per_second`` among the
+    roles (base, complaint, emotion, counselor) served by that endpoint.
+    ``None`` means the endpoint is not limited at all.
+    """
+    cfg = registry.get("anna_engine_config")
+    max_inflight, requests_per_second = _endpoint_limits(cfg, base_url)
+    if max_inflight <= 0 and requests_per_second <= 0:
+        return None
+    with _client_pool_lock:
+        governor = _endpoint_governors.get(base_url)
+        if governor is None:
+            governor = _endpoint_governors[base_url] = EndpointGovernor(
+                max_inflight=max_inflight,
+                requests_per_second=requests_per_second,
+                burst=cfg.concurrency_burst,
+                adaptive=cfg.concurrency_adaptive,
+                latency_target=cfg.concurrency_adaptive_latency_target,
+                min_inflight=cfg.concurrency_adaptive_min_inflight,
+            )
+        return governor
+
+
+def _endpoint_limits(cfg: AnnaEngineConfig, base_url: str) -> tuple[int, float]:
+    # Resolve each role's endpoint the same way the get_*_client helpers do.
+    complaint = cfg.complaint_use_sft_model and cfg.complaint_base_url
+    emotion = cfg.emotion_use_sft_model and cfg.emotion_base_url
+    roles = [
+        (
+            cfg.base_url,
+            cfg.concurrency_base_max_inflight,
+            cfg.concurrency_base_requests_per_second,
+        ),
+        (
+            complaint or cfg.base_url,
+            cfg.concurrency_complaint_max_inflight,
+            cfg.concurrency_complaint_requests_per_second,
+        ),
+        (
+            emotion or cfg.base_url,
+            cfg.concurrency_emotion_max_inflight,
+            cfg.concurrency_emotion_requests_per_second,
+        ),
+        (
+            cfg.counselor_base_url or cfg.base_url,
+            cfg.concurrency_counselor_max_inflight,
+            cfg.concurrency_counselor_requests_per_second,
+        ),
+    ]
+    served = [(cap, rate) for url, cap, rate in roles if url == base_url]
+    return (
+        min((cap for cap, _ in served if cap > 0), default=0),
+        min((rate for _, rate in served if rate > 0), default=0.0),
+    )
+
+
+def get_pooled_async_client(api_key: str, base_url: str) -> AsyncOpenAI:
+    """Return the shared async client for ``(api_key, base_url)``.
+
+    Must be called from a running event loop; each loop gets its own clients.
+    """
+    loop = asyncio.get_running_loop()
+    key = (api_key, base_url)
+    with _client_pool_lock:
+        pool = _async_client_pools.setdefault(loop, {})
+        client = pool.get(key)
+        if client is None:
+            client = _build_async_client(
+                registry.get("anna_engine_config"), api_key, base_url
+            )
+            pool[key] = client
+        return client
+
+
+def reset_client_pool() -> None:
+    """Close and forget pooled clients, e.g. after settings were reloaded.
+
+    Async clients are dropped without awaiting ``close()``; their connections
+    are released when the owning event loop goes away.
+    """
+    with _client_pool_lock:
+        clients = list(_client_pool.values())
+        _client_pool.clear()
+        _async_client_pools.clear()
+        _endpoint_governors.clear()
+        _latency_windows.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:  # pragma: no cover - best effort cleanup
+            pass
+
+
+def _latency_window(base_url: str) -> LatencyWindow:
+    with _client_pool_lock:
+        window = _latency_windows.get(base_url)
+        if window is None:
+            window = _latency_windows[base_url] = LatencyWindow()
+        return window
+
+
+def _retry_layer(cfg: AnnaEngineConfig, base_url: str, hedged: bool) -> tuple:
+    """Return the retry policy and hedging window for a new client."""
+
+    policy = RetryPolicy.from_config(cfg)
+    hedged = hedged and cfg.retry_hedge_enabled
+    if policy.max_attempts <= 1 and not hedged:
+        return None, None
+    return policy, _latency_window(base_url) if hedged else None
+
+
+def get_llm_cache() -> LLMResponseCache | None:
+    """Return the shared response cache, or ``None`` when caching is off."""
+    cfg = registry.get("anna_engine_config")
+    if not cfg or not cfg.llm_cache_enabled:
+        return None
+    cache = registry.get("llm_response_cache")
+    if cache is None:
+        workspace = registry.get("anna_agent_workspace", Path.cwd())
+        cache = LLMResponseCache.from_config(cfg, workspace=workspace)
+        registry.register("llm_response_cache", cache)
+    return cache
+
+
+def get_span_exporters() -> list:
+    """Return the shared span exporters selected by the ``tracing`` settings."""
+    exporters = registry.get("span_exporters")
+    if exporters is None:
+        workspace = registry.get("anna_agent_workspace")
+        exporters = build_exporters(registry.get("anna_engine_config"), workspace)
+        registry.register("span_exporters", exporters)
+    return exporters
+
+
+def start_trace(name: str) -> Trace | None:
+    """Return a new trace for ``name``, or ``None`` when tracing is off.
+
+    Activate it with :func:`anna_agent.common.tracing.activate` and call
+    ``finish()`` to export its spans.
+    """
+    cfg = registry.get("anna_engine_config")
+    if not cfg or not cfg.tracing_enabled:
+        return None
+    return Trace(name, get_span_exporters())
+
+
 def get_openai_client(
-    api_key_override: str | None = None, base_url_override: str | None = None
+    api_key_override: str | None = None,
+    base_url_override: str | None = None,
+    cached: bool = False,
+    hedged: bool = False,
 ) -> OpenAI:
-    """Create an OpenAI client using configuration values."""
+    """Return a pooled OpenAI client using configuration values.
+
+    ``cached=True`` puts the shared response cache in front of the client; use
+    it only for deterministic calls such as forced low-temperature tool calls.
+    ``hedged=True`` lets latency-critical calls send a second request after
+    the endpoint's p95 latency when ``retry.hedge_enabled`` is set.
+    """
     cfg = registry.get("anna_engine_config")
-    return OpenAI(
-        api_key=api_key_override or cfg.api_key,
-        base_url=base_url_override or cfg.base_url,
-    )
+    base_url = base_url_override or cfg.base_url
+    client = get_pooled_client(api_key_override or cfg.api_key, base_url)
+    governor = get_endpoint_governor(base_url)
+    if governor is not None:
+        client = GovernedClient(client, governor)
+    policy, latencies = _retry_layer(cfg, base_url, hedged)
+    if policy is not None:
+        client = RetryingClient(client, policy, latencies)
+    cache = get_llm_cache() if cached else None
+    if cache:
+        client = CachingChatClient(client, cache)
+    return TracingClient(client, base_url) if cfg.tracing_enabled else client
 
 
-def get_complaint_client() -> OpenAI:
+def get_complaint_client(cached: bool = False) -> OpenAI:
     """Create a client for the complaint server."""
     cfg = registry.get("anna_engine_config")
     if not cfg.complaint_use_sft_model:
-        return get_openai_client()
-    return get_openai_client(cfg.complaint_api_key, cfg.complaint_base_url)
+        return get_openai_client(cached=cached)
+    return get_openai_client(
+        cfg.complaint_api_key, cfg.complaint_base_url, cached=cached
+    )
 
 
-def get_counselor_client() -> OpenAI:
+def get_counselor_client(cached: bool = False) -> OpenAI:
     """Create a client for the counselor server."""
     cfg = registry.get("anna_engine_config")
-    return get_openai_client(cfg.counselor_api_key, cfg.counselor_base_url)
+    return get_openai_client(
+        cfg.counselor_api_key, cfg.counselor_base_url, cached=cached
+    )
 
 
-def get_emotion_client() -> OpenAI:
+def get_emotion_client(cached: bool = False) -> OpenAI:
     """Create a client for the emotion server."""
     cfg = registry.get("anna_engine_config")
     if not cfg.emotion_use_sft_model:
-        return get_openai_client()
-    return get_openai_client(cfg.emotion_api_key, cfg.emotion_base_url)
+        return get_openai_client(cached=cached)
+    return get_openai_client(cfg.emotion_api_key, cfg.emotion_base_url, cached=cached)
+
+
+def get_async_openai_client(
+    api_key_override: str | None = None,
+    base_url_override: str | None = None,
+    cached: bool = False,
+    hedged: bool = False,
+) -> AsyncOpenAI:
+    """Async counterpart of :func:`get_openai_client`."""
+    cfg = registry.get("anna_engine_config")
+    base_url = base_url_override or cfg.base_url
+    client = get_pooled_async_client(api_key_override or cfg.api_key, base_url)
+    governor = get_endpoint_governor(base_url)
+    if governor is not None:
+        client = AsyncGovernedClient(client, governor)
+    policy, latencies = _retry_layer(cfg, base_url, hedged)
+    if policy is not None:
+        client = AsyncRetryingClient(client, policy, latencies)
+    cache = get_llm_cache() if cached else None
+    if cache:
+        client = AsyncCachingChatClient(client, cache)
+    return AsyncTracingClient(client, base_url) if cfg.tracing_enabled else client
+
+
+def get_async_complaint_client(cached: bool = False) -> AsyncOpenAI:
+    """Create an async client for the complaint server."""
+    cfg = registry.get("anna_engine_config")
+    if not cfg.complaint_use_sft_model:
+        return get_async_openai_client(cached=cached)
+    return get_async_openai_client(
+        cfg.complaint_api_key, cfg.complaint_base_url, cached=cached
+    )
+
+
+def get_async_counselor_client(cached: bool = False) -> AsyncOpenAI:
+    """Create an async client for the counselor server."""
+    cfg = registry.get("anna_engine_config")
+    return get_async_openai_client(
+        cfg.counselor_api_key, cfg.counselor_base_url, cached=cached
+    )
+
+
+def get_async_emotion_client(cached: bool = False) -> AsyncOpenAI:
+    """Create an async client for the emotion server."""
+    cfg = registry.get("anna_engine_config")
+    if not cfg.emotion_use_sft_model:
+        return get_async_openai_client(cached=cached)
+    return get_async_openai_client(
+        cfg.emotion_api_key, cfg.emotion_base_url, cached=cached
+    )
@@ -1,7 +1,9 @@
 import json
 import logging
+import os
 import shlex
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager, redirect_stderr, redirect_stdout
 from io import StringIO
 from pathlib import Path
@@ -10,6 +12,7 @@ from typing import Any
 import typer
 import yaml
 from rich.console import Console
+from rich.live import Live
 from rich.markup import escape
 from rich.panel import Panel
 from rich.rule import Rule
@@ -27,9 +30,12 @@ from .case_data import (
     validate_case,
     write_case_json,
 )
+from .common.fallbacks import fallbacks
 from .common.registry import registry
+from .common.retry import retry_stats
 from .diagnostics import run_doctor
 from .memory import LanceMemoryStore
+from .memory.bulk import DEFAULT_WRITE_ROWS, bulk_index
 from .model_services import (
     configure_sft_endpoint,
     deploy_env_status,
@@ -39,6 +45,7 @@ from .model_services import (
     set_sft_mode,
     setup_deploy_env,
 )
+from .run_manifest import MANIFEST_NAME, RunManifest
 from .runtime import (
     FrozenPromptSession,
     append_jsonl,
@@ -193,6 +200,13 @@ def _render_debug_context(seeker: Any) -> None:
     for key in ["emotion", "complaint_stage", "complaint", "memory_used"]:
         if key in context:
             table.add_row(key, str(context[key]))
+    trace = context.get("trace")
+    if trace:
+        table.add_row(
+            "latency",
+            f"{trace['duration']:.2f}s, {trace['llm_calls']} LLM calls, "
+            f"{trace['prompt_tokens']}+{trace['completion_tokens']} tokens",
+        )
     console.print(Panel(table, title="本轮内部状态", border_style="magenta"))
 
 
@@ -403,8 +417,11 @@ def _interactive_chat(
                 border_style="cyan",
             )
         )
+        streaming = hasattr(seeker, "chat_stream")
         try:
-            if debug_ui:
+            if streaming:
+                response = _stream_seeker_reply(seeker, message, debug_ui=debug_ui)
+            elif debug_ui:
                 response = seeker.chat(message)
             else:
                 with console.status("[green]Seeker 正在生成回复...[/green]"):
@@ -419,19 +436,49 @@ def _interactive_chat(
             response_text = response
         if debug_ui:
             _render_debug_context(seeker)
-        console.print(
-            Panel(
-                escape(response_text or "<empty response>"),
-                title="Seeker",
-                border_style="green",
-            )
-        )
+        if not streaming:
+            console.print(_seeker_panel(response_text))
         if save:
             append_jsonl(save, {"role": "Counselor", "content": message})
             append_jsonl(save, {"role": "Seeker", "content": response_text})
         turn += 1
 
 
+def _seeker_panel(text: str, *, pending: bool = False) -> Panel:
+    if pending and not text:
+        body = "[dim]Seeker 正在生成回复...[/dim]"
+    else:
+        body = escape(text or "<empty response>")
+    return Panel(body, title="Seeker", border_style="green")
+
+
+def _stream_seeker_reply(seeker: Any, message: str, *, debug_ui: bool) -> str:
+    """Render the Seeker panel token by token and return the full reply.
+
+    Stray prints from the generation pipeline are suppressed while the next
+    fragment is produced; the panel itself is only redrawn outside of that
+    window so Live output is never swallowed.
+    """
+
+    stream = seeker.chat_stream(message)
+    text = ""
+    with Live(
+        _seeker_panel(text, pending=True),
+        console=console,
+        auto_refresh=False,
+        transient=False,
+    ) as live:
+        while True:
+            with _suppress_stdio(not debug_ui):
+                fragment = next(stream, None)
+            if fragment is None:
+                break
+            text += fragment
+            live.update(_seeker_panel(text, pending=True), refresh=True)
+        live.update(_seeker_panel(text), refresh=True)
+    return text
+
+
 @app.callback(invoke_without_command=True)
 def main(
     ctx: typer.Context,
@@ -827,6 +874,44 @@ def memory_index(
     )
 
 
+@memory_app.command("index-batch")
+def memory_index_batch(
+    cases: list[str] = typer.Option(
+        ..., "--case", help="Case file or glob. Repeatable."
+    ),
+    workspace: Path = typer.Option(Path(), "--workspace", "--root", resolve_path=True),
+    workers: int = typer.Option(
+        min(os.cpu_count() or 1, 8), "--workers", min=1, help="Chunking processes."
+    ),
+    write_rows: int = typer.Option(
+        DEFAULT_WRITE_ROWS, "--write-rows", min=1, help="Chunks per table write."
+    ),
+) -> None:
+    _configure(workspace)
+    cfg = registry.get("anna_engine_config")
+    case_files = discover_case_files(cases, root=workspace)
+    if not case_files:
+        raise typer.BadParameter("No case files matched")
+    store = LanceMemoryStore.from_config(cfg, workspace=workspace)
+    console.print(
+        f"[blue]Running:[/blue] chunk {len(case_files)} cases with {workers} workers"
+    )
+    result = bulk_index(
+        store,
+        case_files,
+        window_size=cfg.memory_window_size,
+        window_stride=cfg.memory_window_stride,
+        workers=workers,
+        write_rows=write_rows,
+        progress=lambda detail: console.print(f"[blue]Running:[/blue] {detail}"),
+    )
+    console.print(
+        f"[green]Indexed {result.added} new memory chunks[/green] "
+        f"from {result.cases} cases ({result.chunks} chunks, "
+        f"{result.writes} table writes)."
+    )
+
+
 @memory_app.command("search")
 def memory_search(
     query_text: str = typer.Argument(..., help="Query text for long-term memory."),
@@ -835,13 +920,19 @@ def memory_search(
         None, help="Defaults to the current interactive file id."
     ),
     top_k: int | None = typer.Option(None, help="Number of chunks to show."),
+    mode: str | None = typer.Option(
+        None, help="hybrid (full-text + vector) or vector; defaults to config."
+    ),
 ) -> None:
     _configure(workspace)
     cfg = registry.get("anna_engine_config")
     resolved_seeker_id = _resolve_seeker_id(workspace, seeker_id)
     store = LanceMemoryStore.from_config(cfg, workspace=workspace)
     hits = store.search(
-        query_text, seeker_id=resolved_seeker_id, top_k=top_k or cfg.memory_top_k
+        query_text,
+        seeker_id=resolved_seeker_id,
+        top_k=top_k or cfg.memory_top_k,
+        mode=mode,
     )
     _print_hits(hits, resolved_seeker_id)
 
@@ -858,18 +949,61 @@ def memory_stats(
     console.print(f"chunks={count}, db={store.db_path}, table={store.table_name}")
 
 
+@memory_app.command("optimize")
+def memory_optimize(
+    workspace: Path = typer.Option(Path(), "--workspace", "--root", resolve_path=True),
+) -> None:
+    _configure(workspace)
+    cfg = registry.get("anna_engine_config")
+    store = LanceMemoryStore.from_config(cfg, workspace=workspace)
+    result = store.optimize()
+    if not result["rows"]:
+        console.print("[yellow]No memory table to optimize.[/yellow]")
+        return
+    vector_index = result["vector_index"] or (
+        f"none (built from {store.index_settings.min_rows} rows)"
+    )
+    console.print(
+        f"[green]Memory optimized[/green] chunks={result['rows']}, "
+        f"vector_index={vector_index}, unindexed={result['unindexed_rows']}, "
+        f"indices={', '.join(result['indices'])}"
+    )
+
+
 @memory_app.command("inspect")
 def memory_inspect(
     workspace: Path = typer.Option(Path(), "--workspace", "--root", resolve_path=True),
+    seeker_id: str | None = typer.Option(None, help="Only show this seeker."),
+    limit: int = typer.Option(20, min=1, help="Sessions per page."),
+    page: int = typer.Option(1, min=1, help="Page number, starting at 1."),
 ) -> None:
     _configure(workspace)
     cfg = registry.get("anna_engine_config")
     store = LanceMemoryStore.from_config(cfg, workspace=workspace)
-    path = store.db_path.parent / "sessions.json"
-    if not path.exists():
+    total = store.sessions.count(seeker_id)
+    if not total:
         console.print("[yellow]No session metadata found.[/yellow]")
         return
-    console.print(path.read_text(encoding="utf-8"))
+    offset = (page - 1) * limit
+    sessions = store.sessions.page(seeker_id=seeker_id, offset=offset, limit=limit)
+    last = offset + len(sessions)
+    table = Table(title=f"Memory sessions {offset + 1}-{last} of {total}")
+    table.add_column("Seeker")
+    table.add_column("Session")
+    table.add_column("#", justify="right")
+    table.add_column("Case")
+    table.add_column("Summary")
+    for session in sessions:
+        table.add_row(
+            session.seeker_id,
+            session.session_id,
+            str(session.session_index),
+            session.case_id,
+            session.summary[:120],
+        )
+    console.print(table)
+    if last < total:
+        console.print(f"More sessions: --page {page + 1}")
 
 
 @memory_app.command("reset")
@@ -1303,6 +1437,14 @@ def run_batch(
     live: bool = typer.Option(
         False, "--live", help="Call the model for scripted conversations."
     ),
+    workers: int = typer.Option(
+        1, "--workers", min=1, help="Cases to run concurrently."
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Skip cases and turns already recorded in the output manifest.",
+    ),
     workspace: Path = typer.Option(Path(), "--workspace", "--root", resolve_path=True),
 ) -> None:
     _configure(workspace)
@@ -1317,7 +1459,65 @@ def run_batch(
     messages = load_script_messages(script) if script else []
     output.mkdir(parents=True, exist_ok=True)
     summary_path = output / "summary.jsonl"
-    for case_file in case_files:
+    manifest = RunManifest(output / MANIFEST_NAME, resume=resume)
+    if resume:
+        # 续跑时按输入顺序重写汇总，已完成的案例直接取自清单
+        summary_path.unlink(missing_ok=True)
+
+    def run_case(case_file: Path) -> dict[str, Any]:
+        return _run_batch_case(
+            case_file, output, mode, messages if live else [], manifest
+        )
+
+    # 结果按输入顺序写入 summary.jsonl，与并发度无关
+    if workers > 1 and len(case_files) > 1:
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="anna-batch"
+        ) as executor:
+            for record in executor.map(run_case, case_files):
+                append_jsonl(summary_path, record)
+    else:
+        for case_file in case_files:
+            append_jsonl(summary_path, run_case(case_file))
+    console.print(
+        f"[green]Batch complete[/green] cases={len(case_files)}, out={output}"
+    )
+    cache = registry.get("llm_response_cache")
+    if cache is not None:
+        stats = cache.snapshot()
+        console.print(
+            f"LLM cache hits={stats['hits']}, misses={stats['misses']}, "
+            f"evictions={stats['evictions']}"
+        )
+    retries = retry_stats.snapshot()
+    console.print(
+        f"LLM retries={retries['retries']}, hedges={retries['hedges']}, "
+        f"hedge_wins={retries['hedge_wins']}"
+    )
+    fired = fallbacks.snapshot()
+    if fired:
+        counts = ", ".join(f"{site}={count}" for site, count in fired.items())
+        console.print(f"[yellow]Fallbacks used:[/yellow] {counts}")
+
+
+def _run_batch_case(
+    case_file: Path,
+    output: Path,
+    mode: str,
+    messages: list[str],
+    manifest: RunManifest,
+) -> dict[str, Any]:
+    progress = manifest.get(case_file)
+    done_turns = progress.completed_turns(messages) if progress else 0
+    if progress and progress.done and done_turns == len(messages):
+        console.print(f"[blue]Skipping:[/blue] {case_file} already finished")
+        return _batch_record(progress.case_id, progress.state_file, progress.turns)
+    if progress and Path(progress.state_file).exists():
+        state_path = Path(progress.state_file)
+        console.print(f"[blue]Resuming:[/blue] load state from {state_path}")
+        state = load_state(state_path)
+    else:
+        done_turns = 0
         console.print(f"[blue]Running:[/blue] build {mode} state for {case_file}")
         state = build_full_state(
             case_file,
@@ -1328,27 +1528,41 @@ def run_batch(
         state_path = output / f"{state['case_id']}.state.json"
         console.print(f"[blue]Running:[/blue] write state to {state_path}")
         save_state(state, state_path)
-        record = {
-            "case_id": state["case_id"],
-            "state_file": str(state_path),
-            "turns": [],
-        }
-        if live and messages:
-            session = FrozenPromptSession(state)
-            transcript_path = output / f"{state['case_id']}.transcript.jsonl"
-            for index, message in enumerate(messages, start=1):
-                console.print(
-                    f"[blue]Running:[/blue] live scripted turn {index} "
-                    f"for {state['case_id']}"
-                )
-                response = session.chat(message)
-                append_jsonl(transcript_path, {"role": "Counselor", "content": message})
-                append_jsonl(transcript_path, {"role": "Seeker", "content": response})
-                record["turns"].append({"message": message, "response": response})
-        append_jsonl(summary_path, record)
-    console.print(
-        f"[green]Batch complete[/green] cases={len(case_files)}, out={output}"
-    )
+        manifest.state_built(case_file, state["case_id"], state_path)
+    turns = progress.turns[:done_turns] if done_turns else []
+    record = _batch_record(state["case_id"], str(state_path), turns)
+    if messages:
+        session = FrozenPromptSession(state)
+        transcript_path = output / f"{state['case_id']}.transcript.jsonl"
+        if progress:
+            # 转录文件可能比清单多写了半轮，按清单重建
+            transcript_path.unlink(missing_ok=True)
+        for turn in turns:
+            session.messages.append({"role": "user", "content": turn["message"]})
+            session.messages.append({"role": "assistant", "content": turn["response"]})
+            _append_transcript(transcript_path, turn["message"], turn["response"])
+        for index, message in enumerate(messages[done_turns:], start=done_turns + 1):
+            console.print(
+                f"[blue]Running:[/blue] live scripted turn {index} "
+                f"for {state['case_id']}"
+            )
+            response = session.chat(message)
+            _append_transcript(transcript_path, message, response)
+            manifest.turn_done(case_file, index, message, response)
+            record["turns"].append({"message": message, "response": response})
+    manifest.case_done(case_file)
+    return record
+
+
+def _batch_record(
+    case_id: str, state_file: str, turns: list[dict[str, str]]
+) -> dict[str, Any]:
+    return {"case_id": case_id, "state_file": state_file, "turns": list(turns)}
+
+
+def _append_transcript(path: Path, message: str, response: str) -> None:
+    append_jsonl(path, {"role": "Counselor", "content": message})
+    append_jsonl(path, {"role": "Seeker", "content": response})
 
 
 @app.command("serve")
@@ -1356,11 +1570,16 @@ def serve_command(
     workspace: Path = typer.Option(Path(), "--workspace", "--root", resolve_path=True),
     host: str = typer.Option("127.0.0.1", "--host"),
     port: int = typer.Option(8000, "--port"),
+    mode: str | None = typer.Option(
+        None,
+        "--mode",
+        help="Server mode: asyncio or threaded. Defaults to service.mode.",
+    ),
 ) -> None:
     from .service import serve
 
     console.print(f"Serving AnnaAgent API on http://{host}:{port}")
-    serve(workspace=workspace, host=host, port=port)
+    serve(workspace=workspace, host=host, port=port, mode=mode)
 
 
 @logs_app.command("tail")
@@ -1388,6 +1607,23 @@ def cache_list(
             console.print(path)
 
 
+@cache_app.command("stats")
+def cache_stats(
+    workspace: Path = typer.Option(Path(), "--workspace", "--root", resolve_path=True),
+) -> None:
+    _configure(workspace)
+    cfg = registry.get("anna_engine_config")
+    if not cfg.llm_cache_enabled:
+        console.print("[yellow]LLM response cache is disabled.[/yellow]")
+        return
+    cache = backbone.get_llm_cache()
+    console.print(
+        f"backend={cfg.llm_cache_backend}, entries={len(cache.backend)}, "
+        f"ttl_seconds={cfg.llm_cache_ttl_seconds}, "
+        f"max_entries={cfg.llm_cache_max_entries}"
+    )
+
+
 @cache_app.command("clean")
 def cache_clean(
     workspace: Path = typer.Option(Path(), "--workspace", "--root", resolve_path=True),
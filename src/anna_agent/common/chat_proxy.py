@@ -0,0 +1,39 @@
+from collections.abc import Callable
+from typing import Any
+
+
+class _CompletionsProxy:
+    def __init__(self, completions: Any, create: Callable[..., Any]):
+        self._completions = completions
+        self.create = create
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._completions, name)
+
+
+class _ChatProxy:
+    def __init__(self, chat: Any, create: Callable[..., Any]):
+        self._chat = chat
+        self.completions = _CompletionsProxy(chat.completions, create)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._chat, name)
+
+
+class ChatClientProxy:
+    """Wrap an OpenAI-style client and replace ``chat.completions.create``.
+
+    Every other attribute is forwarded to the wrapped client, so proxies can
+    be stacked and handed to code that expects a plain ``OpenAI`` client.
+    """
+
+    def __init__(self, client: Any, create: Callable[..., Any]):
+        self._client = client
+        self.chat = _ChatProxy(client.chat, create)
+
+    @property
+    def wrapped(self) -> Any:
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
@@ -0,0 +1,39 @@
+"""Count how often helpers fell back to a canned default instead of a model answer."""
+
+import logging
+import threading
+from collections import Counter
+
+from .tracing import note_fallback
+
+logger = logging.getLogger(__name__)
+
+
+class FallbackCounter:
+    """Thread-safe tally of fallbacks by site name.
+
+    A simulation whose answers came from fallbacks is not a faithful
+    simulation, so batch runs report this tally; a non-zero count points at
+    an endpoint or a prompt that needs attention.
+    """
+
+    def __init__(self):
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, site: str) -> None:
+        logger.warning("Falling back to the default for %s", site)
+        with self._lock:
+            self._counts[site] += 1
+        note_fallback(site)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._counts.items()))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+fallbacks = FallbackCounter()
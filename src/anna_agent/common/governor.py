@@ -0,0 +1,349 @@
+"""Flow control for chat completions sent to one model endpoint.
+
+An :class:`EndpointGovernor` is shared by every client of a ``base_url``. It
+caps in-flight requests, spaces request starts with a token bucket and can
+shrink or grow the in-flight cap (AIMD) from observed latency and 429/503
+responses, so parallel runs stay under vLLM's ``--max-num-seqs``.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from .chat_proxy import ChatClientProxy
+
+# Status codes that mean the endpoint is overloaded rather than broken.
+THROTTLE_STATUS_CODES = frozenset({429, 503})
+
+# AIMD factors: a throttled response halves the cap, a response slower than
+# the latency target trims it, and every other response adds 1/cap. Only
+# requests started after the last decrease can decrease the cap again, so a
+# burst of 429s from one window shrinks it once.
+THROTTLE_DECREASE = 0.5
+LATENCY_DECREASE = 0.9
+
+
+class EndpointGovernor:
+    """In-flight cap, token bucket and adaptive concurrency for one endpoint.
+
+    Threads and coroutines draw from the same slots and tokens. Waiters are
+    served first-in first-out; a released slot is handed straight to the
+    next waiter, waking coroutines on their own event loop.
+
+    ``max_inflight=0`` and ``requests_per_second=0`` mean unlimited.
+    Adaptive concurrency needs a ``max_inflight`` to start from: the cap
+    never grows past it and never drops below ``min_inflight``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_inflight: int = 0,
+        requests_per_second: float = 0.0,
+        burst: int = 0,
+        adaptive: bool = False,
+        latency_target: float = 0.0,
+        min_inflight: int = 1,
+    ):
+        self.max_inflight = max_inflight
+        self.limit = float(max_inflight)
+        self.requests_per_second = requests_per_second
+        self.adaptive = adaptive and max_inflight > 0
+        self.latency_target = latency_target
+        self.min_inflight = max(1, min(min_inflight, max_inflight or 1))
+        self.inflight = 0
+        self.throttled = 0
+        self._decreased_at = 0.0
+        self._burst = burst or max(1, math.ceil(requests_per_second))
+        self._tokens = float(self._burst)
+        self._refilled = time.monotonic()
+        self._waiters: deque = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            event = None
+            if self._waiters or not self._has_slot():
+                event = threading.Event()
+                self._waiters.append(event)
+            else:
+                self.inflight += 1
+        try:
+            if event is not None:
+                event.wait()
+            delay = self._reserve_token()
+            if delay:
+                time.sleep(delay)
+        except BaseException:
+            # 等待被中断（如 KeyboardInterrupt）时交还已拿到的名额
+            with self._lock:
+                queued = event is not None and event in self._waiters
+                if queued:
+                    self._waiters.remove(event)
+            if not queued:
+                self.release()
+            raise
+
+    async def aacquire(self) -> None:
+        with self._lock:
+            future = None
+            if self._waiters or not self._has_slot():
+                future = asyncio.get_running_loop().create_future()
+                self._waiters.append(future)
+            else:
+                self.inflight += 1
+        try:
+            if future is not None:
+                await future
+            delay = self._reserve_token()
+            if delay:
+                await asyncio.sleep(delay)
+        except BaseException:
+            with self._lock:
+                queued = future is not None and future in self._waiters
+                if queued:
+                    self._waiters.remove(future)
+            if not queued:
+                self.release()
+            raise
+
+    def release(self, started: float | None = None, throttled: bool = False) -> None:
+        """Free a slot.
+
+        ``started`` is the ``time.monotonic()`` at which the request was sent;
+        together with ``throttled`` it feeds the adaptive cap.
+        """
+
+        with self._lock:
+            self.inflight -= 1
+            if throttled:
+                self.throttled += 1
+            if self.adaptive and started is not None:
+                self._adapt(started, throttled)
+            self._wake()
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "inflight": self.inflight,
+                "limit": self.limit,
+                "waiting": len(self._waiters),
+                "throttled": self.throttled,
+            }
+
+    def _has_slot(self) -> bool:
+        return not self.max_inflight or self.inflight < int(self.limit)
+
+    def _wake(self) -> None:
+        while self._waiters and self._has_slot():
+            waiter = self._waiters.popleft()
+            self.inflight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+                continue
+            try:
+                waiter.get_loop().call_soon_threadsafe(_grant, waiter)
+            except RuntimeError:  # the waiter's event loop has been closed
+                self.inflight -= 1
+
+    def _reserve_token(self) -> float:
+        """Take a token and return how long to wait before it is valid.
+
+        Tokens may go negative, which books the next refill for this caller
+        and keeps request starts evenly spaced under contention.
+        """
+        if self.requests_per_second <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._burst,
+                self._tokens + (now - self._refilled) * self.requests_per_second,
+            )
+            self._refilled = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.requests_per_second
+
+    def _adapt(self, started: float, throttled: bool) -> None:
+        now = time.monotonic()
+        slow = 0 < self.latency_target < now - started
+        if throttled or slow:
+            if started < self._decreased_at:
+                return
+            self.limit *= THROTTLE_DECREASE if throttled else LATENCY_DECREASE
+            self._decreased_at = now
+        else:
+            self.limit += 1 / self.limit
+        self.limit = min(max(self.limit, self.min_inflight), self.max_inflight)
+
+
+class GovernedClient(ChatClientProxy):
+    """Route every ``chat.completions.create`` through ``governor``.
+
+    Streamed completions keep their slot until the stream is exhausted,
+    closed or garbage collected, because the server is busy until the last
+    token is sent; their latency is not used to adapt the cap.
+    """
+
+    def __init__(self, client: Any, governor: EndpointGovernor):
+        self.governor = governor
+        completions = client.chat.completions
+
+        def create(**kwargs: Any) -> Any:
+            governor.acquire()
+            started = time.monotonic()
+            try:
+                response = completions.create(**kwargs)
+            except BaseException as err:
+                throttled = _is_throttled(err)
+                governor.release(started if throttled else None, throttled)
+                raise
+            if kwargs.get("stream"):
+                return GovernedStream(response, governor)
+            governor.release(started)
+            return response
+
+        super().__init__(client, create)
+
+
+class AsyncGovernedClient(ChatClientProxy):
+    """:class:`GovernedClient` for ``AsyncOpenAI`` clients."""
+
+    def __init__(self, client: Any, governor: EndpointGovernor):
+        self.governor = governor
+        completions = client.chat.completions
+
+        async def create(**kwargs: Any) -> Any:
+            await governor.aacquire()
+            started = time.monotonic()
+            try:
+                response = await completions.create(**kwargs)
+            except BaseException as err:
+                throttled = _is_throttled(err)
+                governor.release(started if throttled else None, throttled)
+                raise
+            if kwargs.get("stream"):
+                return AsyncGovernedStream(response, governor)
+            governor.release(started)
+            return response
+
+        super().__init__(client, create)
+
+
+def _grant(future: asyncio.Future) -> None:
+    # A waiter cancelled after being handed a slot releases it itself.
+    if not future.done():
+        future.set_result(None)
+
+
+def _is_throttled(err: BaseException) -> bool:
+    return getattr(err, "status_code", None) in THROTTLE_STATUS_CODES
+
+
+class _StreamSlot:
+    """Governor slot held by a streamed completion until it is released once.
+
+    Other attributes, such as ``response``, come from the wrapped stream.
+    """
+
+    _released = True
+
+    def __init__(self, stream: Any, governor: EndpointGovernor):
+        self._stream = stream
+        self._governor = governor
+        self._released = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    def __del__(self) -> None:
+        self._release()
+
+    def _release(self, throttled: bool = False) -> None:
+        if not self._released:
+            self._released = True
+            self._governor.release(throttled=throttled)
+
+
+class GovernedStream(_StreamSlot):
+    """A streamed completion that holds a governor slot until it ends.
+
+    The slot is released when the stream is exhausted, fails, is closed
+    (directly or by leaving a ``with`` block) or is garbage collected, so a
+    stream the caller drops half-read does not hold its slot forever.
+    """
+
+    def __init__(self, stream: Any, governor: EndpointGovernor):
+        super().__init__(stream, governor)
+        self._iterator = iter(stream)
+
+    def __iter__(self) -> "GovernedStream":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            self._release()
+            raise
+        except BaseException as err:
+            self._release(_is_throttled(err))
+            raise
+
+    def __enter__(self) -> "GovernedStream":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._release()
+
+
+class AsyncGovernedStream(_StreamSlot):
+    """:class:`GovernedStream` for ``AsyncOpenAI`` streams."""
+
+    def __init__(self, stream: Any, governor: EndpointGovernor):
+        super().__init__(stream, governor)
+        self._iterator = stream.__aiter__()
+
+    def __aiter__(self) -> "AsyncGovernedStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self._iterator.__anext__()
+        except StopAsyncIteration:
+            self._release()
+            raise
+        except BaseException as err:
+            self._release(_is_throttled(err))
+            raise
+
+    async def __aenter__(self) -> "AsyncGovernedStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        try:
+            close = getattr(self._stream, "close", None) or getattr(
+                self._stream, "aclose", None
+            )
+            if close is not None:
+                await close()
+        finally:
+            self._release()
+
+    aclose = close
@@ -0,0 +1,307 @@
+"""Retry and hedge chat completions before callers fall back to defaults.
+
+:class:`RetryingClient` retries transient failures (connection errors,
+timeouts, 408/409/429 and 5xx) with exponential backoff and jitter, and
+stops once the per-call deadline, if one is set, would be crossed. Given a
+:class:`LatencyWindow` it also hedges: if the first request is still running
+after the window's p95 latency, a second identical request is sent and
+whichever answers first wins.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from openai import APIConnectionError
+
+from .chat_proxy import ChatClientProxy
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 8.0
+    jitter: float = 0.5
+    deadline: float = 0.0
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20
+    hedge_min_delay: float = 0.5
+
+    @classmethod
+    def from_config(cls, cfg) -> "RetryPolicy":
+        return cls(
+            max_attempts=cfg.retry_max_attempts,
+            backoff=cfg.retry_backoff,
+            max_backoff=cfg.retry_max_backoff,
+            jitter=cfg.retry_jitter,
+            deadline=cfg.retry_deadline,
+            hedge_percentile=cfg.retry_hedge_percentile,
+            hedge_min_samples=cfg.retry_hedge_min_samples,
+            hedge_min_delay=cfg.retry_hedge_min_delay,
+        )
+
+    def deadline_at(self) -> float | None:
+        return time.monotonic() + self.deadline if self.deadline > 0 else None
+
+    def next_delay(
+        self, attempt: int, err: BaseException, deadline_at: float | None
+    ) -> float | None:
+        """Seconds to wait before attempt ``attempt + 1``, or ``None`` to give up."""
+
+        if attempt >= self.max_attempts or not is_retryable(err):
+            return None
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        delay *= 1 - self.jitter * random.random()
+        if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+            retry_stats.count("deadline_exceeded")
+            return None
+        return delay
+
+
+@dataclass
+class RetryStats:
+    retries: int = 0
+    deadline_exceeded: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+
+
+class _RetryCounters:
+    def __init__(self):
+        self.stats = RetryStats()
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return asdict(self.stats)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats = RetryStats()
+
+
+retry_stats = _RetryCounters()
+
+
+class LatencyWindow:
+    """Latencies of the most recent successful calls to one endpoint."""
+
+    def __init__(self, size: int = 256):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 1) -> float | None:
+        with self._lock:
+            if not self._samples or len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def is_retryable(err: BaseException) -> bool:
+    if isinstance(err, APIConnectionError):  # includes APITimeoutError
+        return True
+    status = getattr(err, "status_code", None)
+    return status in RETRYABLE_STATUS_CODES or (status is not None and status >= 500)
+
+
+_hedge_executor: ThreadPoolExecutor | None = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _hedge_pool() -> ThreadPoolExecutor:
+    # The losing request of a sync hedge cannot be cancelled, so both run on
+    # a shared pool and the caller only waits for the winner. Calls without
+    # enough latency samples to hedge stay on the caller's thread.
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=32, thread_name_prefix="anna-hedge"
+            )
+        return _hedge_executor
+
+
+class RetryingClient(ChatClientProxy):
+    """Apply ``policy`` to every ``chat.completions.create`` call.
+
+    Streamed completions are retried only while opening the stream and are
+    never hedged. With a ``deadline`` set, each attempt gets the time left
+    before it as its request ``timeout`` unless the caller passed one;
+    otherwise the client's own HTTP timeout applies.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        policy: RetryPolicy,
+        latencies: LatencyWindow | None = None,
+    ):
+        self.policy = policy
+        self.latencies = latencies
+        completions = client.chat.completions
+
+        def timed(kwargs: dict[str, Any]) -> Any:
+            started = time.monotonic()
+            response = completions.create(**kwargs)
+            if latencies is not None:
+                latencies.add(time.monotonic() - started)
+            return response
+
+        def create(**kwargs: Any) -> Any:
+            deadline_at = policy.deadline_at()
+            attempt = 0
+            while True:
+                attempt += 1
+                request = _with_timeout(kwargs, deadline_at)
+                try:
+                    if latencies is None or request.get("stream"):
+                        return completions.create(**request)
+                    return self._hedged(timed, request)
+                except Exception as err:
+                    delay = policy.next_delay(attempt, err, deadline_at)
+                    if delay is None:
+                        raise
+                    _log_retry(err, attempt, policy, delay)
+                    time.sleep(delay)
+
+        super().__init__(client, create)
+
+    def _hedged(self, timed: Callable[[dict], Any], request: dict[str, Any]) -> Any:
+        delay = _hedge_delay(self.policy, self.latencies)
+        if delay is None:
+            return timed(request)
+        pool = _hedge_pool()
+        first = pool.submit(timed, request)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        retry_stats.count("hedges")
+        second = pool.submit(timed, request)
+        pending: set[Future] = {first, second}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        retry_stats.count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+
+class AsyncRetryingClient(ChatClientProxy):
+    """:class:`RetryingClient` for ``AsyncOpenAI`` clients.
+
+    The losing request of a hedge is cancelled.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        policy: RetryPolicy,
+        latencies: LatencyWindow | None = None,
+    ):
+        self.policy = policy
+        self.latencies = latencies
+        completions = client.chat.completions
+
+        async def timed(kwargs: dict[str, Any]) -> Any:
+            started = time.monotonic()
+            response = await completions.create(**kwargs)
+            if latencies is not None:
+                latencies.add(time.monotonic() - started)
+            return response
+
+        async def create(**kwargs: Any) -> Any:
+            deadline_at = policy.deadline_at()
+            attempt = 0
+            while True:
+                attempt += 1
+                request = _with_timeout(kwargs, deadline_at)
+                try:
+                    if latencies is None or request.get("stream"):
+                        return await completions.create(**request)
+                    return await self._hedged(timed, request)
+                except Exception as err:
+                    delay = policy.next_delay(attempt, err, deadline_at)
+                    if delay is None:
+                        raise
+                    _log_retry(err, attempt, policy, delay)
+                    await asyncio.sleep(delay)
+
+        super().__init__(client, create)
+
+    async def _hedged(self, timed: Callable[[dict], Any], request: dict[str, Any]):
+        delay = _hedge_delay(self.policy, self.latencies)
+        if delay is None:
+            return await timed(request)
+        first = asyncio.ensure_future(timed(request))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+            retry_stats.count("hedges")
+            second = asyncio.ensure_future(timed(request))
+            pending.add(second)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            retry_stats.count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+def _hedge_delay(policy: RetryPolicy, latencies: LatencyWindow) -> float | None:
+    latency = latencies.percentile(policy.hedge_percentile, policy.hedge_min_samples)
+    return None if latency is None else max(latency, policy.hedge_min_delay)
+
+
+def _with_timeout(kwargs: dict[str, Any], deadline_at: float | None) -> dict:
+    if deadline_at is None or "timeout" in kwargs:
+        return kwargs
+    return {**kwargs, "timeout": max(deadline_at - time.monotonic(), 0.001)}
+
+
+def _log_retry(
+    err: BaseException, attempt: int, policy: RetryPolicy, delay: float
+) -> None:
+    retry_stats.count("retries")
+    logger.info(
+        "Chat completion failed (%s), retry %d/%d in %.2fs",
+        err,
+        attempt,
+        policy.max_attempts - 1,
+        delay,
+    )
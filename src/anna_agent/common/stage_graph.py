@@ -0,0 +1,179 @@
+"""Run dependent initialization stages on a bounded thread pool."""
+
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+from .tracing import ain_stage, in_stage, submit
+
+StageCallback = Callable[["Stage"], None]
+StageFinishCallback = Callable[["Stage", float], None]
+
+
+@dataclass
+class Stage:
+    """A named unit of work that runs once all ``requires`` stages finished.
+
+    ``run`` receives a mapping with the results of the required stages.
+    """
+
+    name: str
+    run: Callable[[dict[str, Any]], Any]
+    requires: tuple[str, ...] = field(default_factory=tuple)
+    detail: str = ""
+
+
+def validate_stage_graph(stages: list[Stage]) -> list[Stage]:
+    """Return ``stages`` in a dependency-respecting order.
+
+    Raises ``ValueError`` for duplicate names, unknown dependencies and cycles.
+    """
+
+    by_name: dict[str, Stage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for requirement in stage.requires:
+            if requirement not in by_name:
+                raise ValueError(
+                    f"Stage '{stage.name}' requires unknown stage '{requirement}'"
+                )
+
+    ordered: list[Stage] = []
+    done: set[str] = set()
+    pending = list(stages)
+    while pending:
+        ready = [stage for stage in pending if set(stage.requires) <= done]
+        if not ready:
+            names = ", ".join(stage.name for stage in pending)
+            raise ValueError(f"Stage graph has a cycle between: {names}")
+        for stage in ready:
+            ordered.append(stage)
+            done.add(stage.name)
+        pending = [stage for stage in pending if stage.name not in done]
+    return ordered
+
+
+def run_stage_graph(
+    stages: list[Stage],
+    *,
+    max_workers: int = 4,
+    on_start: StageCallback | None = None,
+    on_finish: StageFinishCallback | None = None,
+) -> dict[str, Any]:
+    """Run ``stages`` as a DAG and return their results keyed by stage name.
+
+    Independent stages run concurrently on at most ``max_workers`` threads, so
+    the total wall time follows the critical path instead of the sum of all
+    stages. ``max_workers <= 1`` runs every stage inline in dependency order.
+    Callbacks are always invoked from the calling thread. The first stage
+    error cancels stages that have not started yet and is re-raised.
+    """
+
+    ordered = validate_stage_graph(stages)
+    results: dict[str, Any] = {}
+
+    if max_workers <= 1:
+        for stage in ordered:
+            started = _start(stage, on_start)
+            results[stage.name] = in_stage(
+                stage.name, stage.run, _inputs(stage, results)
+            )
+            _finish(stage, started, on_finish)
+        return results
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="anna-stage"
+    )
+    running: dict[Future, tuple[Stage, float]] = {}
+    remaining = list(ordered)
+    try:
+        while remaining or running:
+            ready = [
+                stage
+                for stage in remaining
+                if all(name in results for name in stage.requires)
+            ]
+            for stage in ready:
+                remaining.remove(stage)
+                started = _start(stage, on_start)
+                future = submit(
+                    executor, in_stage, stage.name, stage.run, _inputs(stage, results)
+                )
+                running[future] = (stage, started)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, started = running.pop(future)
+                results[stage.name] = future.result()
+                _finish(stage, started, on_finish)
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+    return results
+
+
+async def arun_stage_graph(
+    stages: list[Stage],
+    *,
+    on_start: StageCallback | None = None,
+    on_finish: StageFinishCallback | None = None,
+) -> dict[str, Any]:
+    """Async counterpart of :func:`run_stage_graph`.
+
+    ``run`` must return an awaitable. Every stage is scheduled as a task on the
+    running event loop as soon as its requirements are done, so no threads are
+    used. The first stage error cancels the other stages and is re-raised.
+    """
+
+    ordered = validate_stage_graph(stages)
+    results: dict[str, Any] = {}
+    running: dict[asyncio.Task, tuple[Stage, float]] = {}
+    remaining = list(ordered)
+    try:
+        while remaining or running:
+            ready = [
+                stage
+                for stage in remaining
+                if all(name in results for name in stage.requires)
+            ]
+            for stage in ready:
+                remaining.remove(stage)
+                started = _start(stage, on_start)
+                task = asyncio.ensure_future(
+                    ain_stage(stage.name, stage.run(_inputs(stage, results)))
+                )
+                running[task] = (stage, started)
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                stage, started = running.pop(task)
+                results[stage.name] = task.result()
+                _finish(stage, started, on_finish)
+    except BaseException:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        raise
+    return results
+
+
+def _inputs(stage: Stage, results: dict[str, Any]) -> dict[str, Any]:
+    return {name: results[name] for name in stage.requires}
+
+
+def _start(stage: Stage, on_start: StageCallback | None) -> float:
+    if on_start:
+        on_start(stage)
+    return time.perf_counter()
+
+
+def _finish(
+    stage: Stage, started: float, on_finish: StageFinishCallback | None
+) -> None:
+    if on_finish:
+        on_finish(stage, time.perf_counter() - started)
@@ -0,0 +1,30 @@
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+
+def delta_text(chunk: Any) -> str:
+    """Return the text carried by one ``stream=True`` completion chunk."""
+
+    choices = getattr(chunk, "choices", None)
+    if not choices:
+        return ""
+    delta = getattr(choices[0], "delta", None)
+    return getattr(delta, "content", None) or ""
+
+
+def iter_text_deltas(stream: Any) -> Iterator[str]:
+    """Yield the non-empty text fragments of a streamed chat completion."""
+
+    for chunk in stream:
+        text = delta_text(chunk)
+        if text:
+            yield text
+
+
+async def aiter_text_deltas(stream: Any) -> AsyncIterator[str]:
+    """Async counterpart of :func:`iter_text_deltas` for ``AsyncOpenAI``."""
+
+    async for chunk in stream:
+        text = delta_text(chunk)
+        if text:
+            yield text
@@ -0,0 +1,458 @@
+"""Per-stage latency and token tracing for initialization and chat turns.
+
+A :class:`Trace` collects spans for one unit of work, such as a seeker's
+initialization or a chat turn. While a trace is active, stages opened with
+:func:`stage` get a span each. Every ``chat.completions.create`` made
+through a :class:`TracingClient` gets an ``llm`` span recording:
+
+- the caller stage, endpoint and model;
+- the wall latency;
+- the prompt and completion tokens;
+- whether the response cache answered;
+- which fallback, if any, the caller used for the result.
+
+The trace and stage are kept in context variables. Worker threads must be
+started with :func:`submit` to inherit them.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .chat_proxy import ChatClientProxy
+
+logger = logging.getLogger(__name__)
+
+_trace: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar(
+    "anna_trace", default=None
+)
+_stage: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "anna_trace_stage", default=None
+)
+_llm_call: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "anna_trace_llm_call", default=None
+)
+
+
+def _new_id() -> str:
+    return os.urandom(8).hex()
+
+
+@dataclass
+class Span:
+    trace_id: str
+    name: str
+    kind: str
+    stage: str = ""
+    span_id: str = field(default_factory=_new_id)
+    parent_id: str = ""
+    start: float = field(default_factory=time.time)
+    duration: float = 0.0
+    endpoint: str = ""
+    model: str = ""
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    cache_hit: bool = False
+    fallback: str = ""
+    error: str = ""
+
+    def finish(self, started: float) -> "Span":
+        self.duration = time.perf_counter() - started
+        return self
+
+
+class Trace:
+    """Spans of one initialization or chat turn."""
+
+    def __init__(self, name: str, exporters: list | None = None):
+        self.root = Span(trace_id=_new_id(), name=name, kind="trace")
+        self.exporters = exporters or []
+        self.spans: list[Span] = []
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @property
+    def trace_id(self) -> str:
+        return self.root.trace_id
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def finish(self) -> dict[str, Any]:
+        """Close the root span, hand all spans to the exporters, summarize."""
+
+        self.root.finish(self._started)
+        spans = [self.root, *self.spans]
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception as err:  # tracing must never break a turn
+                logger.warning("Span export failed: %s", err)
+        return self.summary()
+
+    def summary(self) -> dict[str, Any]:
+        """Totals per stage plus every span, as stored in states and turns."""
+
+        with self._lock:
+            spans = list(self.spans)
+        calls = [span for span in spans if span.kind == "llm"]
+        stages: dict[str, dict[str, Any]] = {}
+        for span in spans:
+            totals = stages.setdefault(
+                span.stage or span.name,
+                {
+                    "duration": 0.0,
+                    "llm_calls": 0,
+                    "llm_seconds": 0.0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cache_hits": 0,
+                    "fallbacks": 0,
+                },
+            )
+            if span.kind == "stage":
+                totals["duration"] += span.duration
+            elif span.kind == "llm":
+                totals["llm_calls"] += 1
+                totals["llm_seconds"] += span.duration
+                totals["prompt_tokens"] += span.prompt_tokens or 0
+                totals["completion_tokens"] += span.completion_tokens or 0
+                totals["cache_hits"] += span.cache_hit
+            if span.fallback:
+                totals["fallbacks"] += 1
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "duration": self.root.duration,
+            "llm_calls": len(calls),
+            "prompt_tokens": sum(span.prompt_tokens or 0 for span in calls),
+            "completion_tokens": sum(span.completion_tokens or 0 for span in calls),
+            "cache_hits": sum(span.cache_hit for span in calls),
+            "fallbacks": [span.fallback for span in spans if span.fallback],
+            "stages": stages,
+            "spans": [asdict(span) for span in spans],
+        }
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+@contextmanager
+def activate(trace: Trace | None) -> Iterator[None]:
+    """Make ``trace`` current inside the block; ``None`` leaves tracing off.
+
+    Keep ``yield`` statements of generators outside the block: the variable
+    would leak into, and be reset from, whatever context drives the generator.
+    """
+
+    if trace is None:
+        yield
+        return
+    token = _trace.set(trace)
+    try:
+        yield
+    finally:
+        _trace.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Attribute the LLM calls made inside the block to stage ``name``."""
+
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    span = Span(trace.trace_id, name, "stage", stage=name, parent_id=trace.root.span_id)
+    started = time.perf_counter()
+    token = _stage.set(span)
+    call_token = _llm_call.set(None)
+    try:
+        yield
+    except BaseException as err:
+        span.error = repr(err)
+        raise
+    finally:
+        _llm_call.reset(call_token)
+        _stage.reset(token)
+        trace.add(span.finish(started))
+
+
+def in_stage(name: str, fn: Callable[..., Any], *args: Any) -> Any:
+    with stage(name):
+        return fn(*args)
+
+
+async def ain_stage(name: str, awaitable: Awaitable) -> Any:
+    with stage(name):
+        return await awaitable
+
+
+def submit(
+    executor: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any
+) -> Future:
+    """``executor.submit`` that carries the caller's trace and stage along."""
+
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def note_fallback(site: str) -> None:
+    """Mark the caller's latest LLM span as answered by a fallback.
+
+    Fallbacks taken without a preceding call in the same stage, such as a
+    failed request, get a span of their own.
+    """
+
+    trace = _trace.get()
+    if trace is None:
+        return
+    span = _llm_call.get()
+    if span is not None and not span.fallback and not span.error:
+        span.fallback = site
+        return
+    current = _stage.get()
+    trace.add(
+        Span(
+            trace.trace_id,
+            "fallback",
+            "fallback",
+            stage=current.name if current else "",
+            parent_id=current.span_id if current else trace.root.span_id,
+            fallback=site,
+        )
+    )
+
+
+def note_cache_hit() -> None:
+    span = _llm_call.get()
+    if span is not None:
+        span.cache_hit = True
+
+
+class TracingClient(ChatClientProxy):
+    """Record an ``llm`` span for every completion made inside a trace.
+
+    Outside a trace the call goes straight through. Streamed completions ask
+    the endpoint for a final usage chunk (``stream_options.include_usage``)
+    unless the caller set ``stream_options`` itself, and are timed until the
+    stream ends.
+    """
+
+    def __init__(self, client: Any, endpoint: str):
+        completions = client.chat.completions
+
+        def create(**kwargs: Any) -> Any:
+            span = _start_call(endpoint, kwargs)
+            if span is None:
+                return completions.create(**kwargs)
+            started = time.perf_counter()
+            trace = _trace.get()
+            try:
+                response = completions.create(**_with_stream_usage(kwargs))
+            except BaseException as err:
+                span.error = repr(err)
+                trace.add(span.finish(started))
+                raise
+            if kwargs.get("stream"):
+                return _traced_stream(response, span, trace, started)
+            _record_usage(span, response)
+            trace.add(span.finish(started))
+            return response
+
+        super().__init__(client, create)
+
+
+class AsyncTracingClient(ChatClientProxy):
+    """:class:`TracingClient` for ``AsyncOpenAI`` clients."""
+
+    def __init__(self, client: Any, endpoint: str):
+        completions = client.chat.completions
+
+        async def create(**kwargs: Any) -> Any:
+            span = _start_call(endpoint, kwargs)
+            if span is None:
+                return await completions.create(**kwargs)
+            started = time.perf_counter()
+            trace = _trace.get()
+            try:
+                response = await completions.create(**_with_stream_usage(kwargs))
+            except BaseException as err:
+                span.error = repr(err)
+                trace.add(span.finish(started))
+                raise
+            if kwargs.get("stream"):
+                return _atraced_stream(response, span, trace, started)
+            _record_usage(span, response)
+            trace.add(span.finish(started))
+            return response
+
+        super().__init__(client, create)
+
+
+def _start_call(endpoint: str, kwargs: dict[str, Any]) -> Span | None:
+    trace = _trace.get()
+    if trace is None:
+        return None
+    current = _stage.get()
+    span = Span(
+        trace.trace_id,
+        "chat.completions",
+        "llm",
+        stage=current.name if current else "",
+        parent_id=current.span_id if current else trace.root.span_id,
+        endpoint=endpoint,
+        model=str(kwargs.get("model", "")),
+    )
+    # Left set after the call so the cache layer below can mark a hit and the
+    # caller can mark a fallback on this span.
+    _llm_call.set(span)
+    return span
+
+
+def _with_stream_usage(kwargs: dict[str, Any]) -> dict[str, Any]:
+    if kwargs.get("stream") and "stream_options" not in kwargs:
+        return {**kwargs, "stream_options": {"include_usage": True}}
+    return kwargs
+
+
+def _record_usage(span: Span, response: Any) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        span.prompt_tokens = getattr(usage, "prompt_tokens", None)
+        span.completion_tokens = getattr(usage, "completion_tokens", None)
+
+
+def _traced_stream(stream: Any, span: Span, trace: Trace, started: float) -> Iterator:
+    try:
+        for chunk in stream:
+            _record_usage(span, chunk)
+            yield chunk
+    except BaseException as err:
+        span.error = repr(err)
+        raise
+    finally:
+        trace.add(span.finish(started))
+
+
+async def _atraced_stream(
+    stream: Any, span: Span, trace: Trace, started: float
+) -> AsyncIterator:
+    try:
+        async for chunk in stream:
+            _record_usage(span, chunk)
+            yield chunk
+    except BaseException as err:
+        span.error = repr(err)
+        raise
+    finally:
+        trace.add(span.finish(started))
+
+
+class JsonlSpanExporter:
+    """Append finished spans, one JSON object per line, to ``path``."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        lines = "".join(
+            json.dumps(asdict(span), ensure_ascii=False) + "\n" for span in spans
+        )
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as file:
+                file.write(lines)
+
+
+class OtelSpanExporter:
+    """Re-emit spans through the OpenTelemetry API.
+
+    Spans go to whatever tracer provider the application configured, so any
+    OTLP or console exporter set up there receives them. Requires the
+    optional ``opentelemetry-api`` package.
+    """
+
+    def __init__(self):
+        from opentelemetry import trace as otel_trace
+
+        self._otel = otel_trace
+        self._tracer = otel_trace.get_tracer("anna_agent")
+
+    def export(self, spans: list[Span]) -> None:
+        root, *children = spans
+        parent = self._start(root, None)
+        context = self._otel.set_span_in_context(parent)
+        for span in children:
+            self._start(span, context).end(_ns(span.start + span.duration))
+        parent.end(_ns(root.start + root.duration))
+
+    def _start(self, span: Span, context: Any) -> Any:
+        attributes = {
+            f"anna.{key}": value
+            for key, value in asdict(span).items()
+            if value not in (None, "") and key not in ("name", "start", "duration")
+        }
+        return self._tracer.start_span(
+            span.name if span.kind != "stage" else f"stage {span.name}",
+            context=context,
+            start_time=_ns(span.start),
+            attributes=attributes,
+        )
+
+
+def _ns(seconds: float) -> int:
+    return int(seconds * 1_000_000_000)
+
+
+def build_exporters(cfg: Any, workspace: str | Path | None = None) -> list:
+    """Exporters selected by the ``tracing`` settings.
+
+    A relative ``tracing.path`` lives in ``workspace``; without a workspace
+    only an absolute path is written.
+    """
+
+    if not cfg or not cfg.tracing_enabled:
+        return []
+    exporters: list = []
+    path = Path(cfg.tracing_path) if cfg.tracing_path else None
+    if path is not None and not path.is_absolute():
+        path = Path(workspace) / path if workspace is not None else None
+    if path is not None:
+        exporters.append(JsonlSpanExporter(path))
+    if cfg.tracing_otel:
+        try:
+            exporters.append(OtelSpanExporter())
+        except ImportError:
+            logger.warning("tracing.otel is on but opentelemetry-api is not installed")
+    return exporters
+
+
+__all__ = [
+    "AsyncTracingClient",
+    "JsonlSpanExporter",
+    "OtelSpanExporter",
+    "Span",
+    "Trace",
+    "TracingClient",
+    "activate",
+    "ain_stage",
+    "build_exporters",
+    "current_trace",
+    "in_stage",
+    "note_cache_hit",
+    "note_fallback",
+    "stage",
+    "submit",
+]
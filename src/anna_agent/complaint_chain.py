@@ -1,4 +1,5 @@
-from .backbone import get_complaint_client
+from .backbone import get_async_complaint_client, get_complaint_client
+from .common.fallbacks import fallbacks
 from .common.registry import registry
 from .common.tool_calls import extract_tool_call_arguments
 from .event_trigger import event_trigger
@@ -36,12 +37,11 @@ tools = [
 
 
 
-def gen_complaint_chain(profile):
+def _complaint_chain_request(profile):
     patient_info = f"### 患者信息\n年龄：{profile['age']}\n性别：{profile['gender']}\n职业：{profile['occupation']}\n婚姻状况：{profile['martial_status']}\n症状：{profile['symptoms']}"
     event = event_trigger(profile)
-    client = get_complaint_client()
     config = registry.get("anna_engine_config")
-    response = client.chat.completions.create(
+    return dict(
         model=config.active_complaint_model_name,
         messages=[
             {
@@ -55,12 +55,28 @@ def gen_complaint_chain(profile):
             "function": {"name": "generate_complaint_chain"},
         },
     )
+
+
+def _parse_complaint_chain(response, profile):
     args = extract_tool_call_arguments(response)
     chain = args.get("chain") if args else None
     if not isinstance(chain, list):
+        fallbacks.record("complaint_chain")
         return [
             {"stage": 1, "content": profile["symptoms"]},
             {"stage": 2, "content": "开始意识到困扰对生活和情绪的影响"},
             {"stage": 3, "content": "尝试在咨询中表达并理解自己的核心困扰"},
         ]
     return chain
+
+
+def gen_complaint_chain(profile):
+    client = get_complaint_client()
+    response = client.chat.completions.create(**_complaint_chain_request(profile))
+    return _parse_complaint_chain(response, profile)
+
+
+async def agen_complaint_chain(profile):
+    client = get_async_complaint_client()
+    response = await client.chat.completions.create(**_complaint_chain_request(profile))
+    return _parse_complaint_chain(response, profile)
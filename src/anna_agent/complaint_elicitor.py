@@ -1,6 +1,7 @@
 import logging
 
-from .backbone import get_openai_client
+from .backbone import get_async_openai_client, get_openai_client
+from .common.fallbacks import fallbacks
 from .common.registry import registry
 from .common.tool_calls import extract_tool_call_arguments
 
@@ -35,37 +36,63 @@ def transform_chain(chain):
     return transformed_chain
 
 
+def _switch_request(chain, index, conversation):
+    transformed_chain = transform_chain(chain)
+    logger.debug("transformed chain: %s", transformed_chain)
+
+    # 提取对话记录
+    dialogue_history = "\n".join(
+        [f"{conv['role']}: {conv['content']}" for conv in conversation]
+    )
+    return dict(
+        model=registry.get("anna_engine_config").model_name,
+        messages=[
+            {
+                "role": "user",
+                "content": (
+                    "### 任务\n"
+                    "根据患者情况及咨访对话历史记录，判断患者当前阶段的主诉问题是否已经得到解决。"
+                    f"\n### 咨访对话历史记录\n{dialogue_history}"
+                    f"\n### 主诉认知变化链\n{transformed_chain}"
+                    f"\n### 当前阶段\n{transformed_chain[index]}"
+                ),
+            }
+        ],
+        tools=tools,
+        tool_choice={"type": "function", "function": {"name": "is_recognized"}},
+    )
+
+
+def _next_index(response, index):
+    args = extract_tool_call_arguments(response)
+    if args and args.get("is_recognized"):
+        return index + 1
+    return index
+
+
 def switch_complaint(chain, index, conversation):
     client = get_openai_client()
 
     try:
-        transformed_chain = transform_chain(chain)
-        logger.debug("transformed chain: %s", transformed_chain)
-
-        # 提取对话记录
-        dialogue_history = "\n".join(
-            [f"{conv['role']}: {conv['content']}" for conv in conversation]
-        )
         response = client.chat.completions.create(
-            model=registry.get("anna_engine_config").model_name,  
-            messages=[
-                {
-                    "role": "user",
-                    "content": (
-                        "### 任务\n"
-                        "根据患者情况及咨访对话历史记录，判断患者当前阶段的主诉问题是否已经得到解决。"
-                        f"\n### 咨访对话历史记录\n{dialogue_history}"
-                        f"\n### 主诉认知变化链\n{transformed_chain}"
-                        f"\n### 当前阶段\n{transformed_chain[index]}"
-                    ),
-                }
-            ],
-            tools=tools,
-            tool_choice={"type": "function", "function": {"name": "is_recognized"}},
+            **_switch_request(chain, index, conversation)
+        )
+        return _next_index(response, index)
+    except Exception as err:
+        logger.debug("switch_complaint error: %s", err)
+        fallbacks.record("complaint_switch")
+    return index
+
+
+async def aswitch_complaint(chain, index, conversation):
+    client = get_async_openai_client()
+
+    try:
+        response = await client.chat.completions.create(
+            **_switch_request(chain, index, conversation)
         )
-        args = extract_tool_call_arguments(response)
-        if args and args.get("is_recognized"):
-            return index + 1
+        return _next_index(response, index)
     except Exception as err:
         logger.debug("switch_complaint error: %s", err)
+        fallbacks.record("complaint_switch")
     return index
@@ -31,11 +31,89 @@ class AnnaEngineDefaults:
     memory_top_k: int = 8
     memory_window_size: int = 4
     memory_window_stride: int = 2
+    memory_read_consistency_interval: float = 1.0
+    memory_index_type: str = "IVF_PQ"
+    memory_index_min_rows: int = 10000
+    memory_index_optimize_rows: int = 5000
+    memory_index_num_partitions: int = 0
+    memory_index_num_sub_vectors: int = 0
+    memory_index_hnsw_m: int = 20
+    memory_index_hnsw_ef_construction: int = 300
+    memory_search_nprobes: int = 20
+    memory_search_refine_factor: int = 0
+    memory_search_mode: str = "hybrid"
+    memory_search_rrf_k: int = 60
+    memory_query_cache_size: int = 1024
 
     embedding_model_name: str = "text-embedding-3-small"
     embedding_dimension: int = 1536
     embedding_api_key: str = ""
     embedding_base_url: str = ""
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = "cache/embeddings.sqlite"
+    embedding_batch_size: int = 64
+    embedding_max_batch_tokens: int = 8000
+    embedding_concurrency: int = 4
+    embedding_max_retries: int = 3
+    embedding_retry_backoff: float = 1.0
+    embedding_failure_cooldown: float = 60.0
+
+    concurrency_init_workers: int = 4
+    concurrency_scale_fills: bool = True
+    concurrency_scale_changes: bool = True
+    concurrency_skip_unchanged_scales: bool = True
+    concurrency_turn_pipeline: bool = True
+    concurrency_base_max_inflight: int = 0
+    concurrency_complaint_max_inflight: int = 0
+    concurrency_emotion_max_inflight: int = 0
+    concurrency_counselor_max_inflight: int = 0
+    concurrency_base_requests_per_second: float = 0.0
+    concurrency_complaint_requests_per_second: float = 0.0
+    concurrency_emotion_requests_per_second: float = 0.0
+    concurrency_counselor_requests_per_second: float = 0.0
+    concurrency_burst: int = 0
+    concurrency_adaptive: bool = False
+    concurrency_adaptive_latency_target: float = 0.0
+    concurrency_adaptive_min_inflight: int = 1
+
+    llm_cache_enabled: bool = True
+    llm_cache_backend: str = "disk"
+    llm_cache_path: str = "cache/llm_responses.sqlite"
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+    llm_cache_max_entries: int = 10000
+    llm_cache_max_bytes: int = 256 * 1024 * 1024
+    llm_cache_temperature: float = 0.1
+
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 600.0
+    http_connect_timeout: float = 5.0
+    http_max_retries: int = 2
+    retry_max_attempts: int = 3
+    retry_backoff: float = 0.5
+    retry_max_backoff: float = 8.0
+    retry_jitter: float = 0.5
+    retry_deadline: float = 0.0
+    retry_hedge_enabled: bool = False
+    retry_hedge_percentile: float = 0.95
+    retry_hedge_min_samples: int = 20
+    retry_hedge_min_delay: float = 0.5
+    tracing_enabled: bool = True
+    tracing_path: str = "logs/traces.jsonl"
+    tracing_otel: bool = False
+
+    service_mode: str = "asyncio"
+    service_max_concurrency: int = 256
+    service_max_pending: int = 1024
+    service_request_timeout: float = 600.0
+    service_keepalive_timeout: float = 5.0
+    service_shutdown_timeout: float = 30.0
+    service_max_body_bytes: int = 1024 * 1024
+    service_session_max_count: int = 1000
+    service_session_max_bytes: int = 256 * 1024 * 1024
+    service_session_idle_ttl: float = 1800.0
+    service_session_spill_dir: str = "runs/service_sessions"
 
 
 anna_engine_defaults = AnnaEngineDefaults()
@@ -28,11 +28,91 @@ memory:
   top_k: {anna_engine_defaults.memory_top_k}
   window_size: {anna_engine_defaults.memory_window_size}
   window_stride: {anna_engine_defaults.memory_window_stride}
+  read_consistency_interval: {anna_engine_defaults.memory_read_consistency_interval}
+  index_type: {anna_engine_defaults.memory_index_type}
+  index_min_rows: {anna_engine_defaults.memory_index_min_rows}
+  index_optimize_rows: {anna_engine_defaults.memory_index_optimize_rows}
+  index_num_partitions: {anna_engine_defaults.memory_index_num_partitions}
+  index_num_sub_vectors: {anna_engine_defaults.memory_index_num_sub_vectors}
+  index_hnsw_m: {anna_engine_defaults.memory_index_hnsw_m}
+  index_hnsw_ef_construction: {anna_engine_defaults.memory_index_hnsw_ef_construction}
+  search_nprobes: {anna_engine_defaults.memory_search_nprobes}
+  search_refine_factor: {anna_engine_defaults.memory_search_refine_factor}
+  search_mode: {anna_engine_defaults.memory_search_mode}
+  search_rrf_k: {anna_engine_defaults.memory_search_rrf_k}
+  query_cache_size: {anna_engine_defaults.memory_query_cache_size}
 embedding:
   model_name: {anna_engine_defaults.embedding_model_name}
   dimension: {anna_engine_defaults.embedding_dimension}
   api_key: ""
   base_url: ""
+  cache_enabled: {str(anna_engine_defaults.embedding_cache_enabled).lower()}
+  cache_path: {anna_engine_defaults.embedding_cache_path}
+  batch_size: {anna_engine_defaults.embedding_batch_size}
+  max_batch_tokens: {anna_engine_defaults.embedding_max_batch_tokens}
+  concurrency: {anna_engine_defaults.embedding_concurrency}
+  max_retries: {anna_engine_defaults.embedding_max_retries}
+  retry_backoff: {anna_engine_defaults.embedding_retry_backoff}
+  failure_cooldown: {anna_engine_defaults.embedding_failure_cooldown}
+concurrency:
+  init_workers: {anna_engine_defaults.concurrency_init_workers}
+  scale_fills: {str(anna_engine_defaults.concurrency_scale_fills).lower()}
+  scale_changes: {str(anna_engine_defaults.concurrency_scale_changes).lower()}
+  skip_unchanged_scales: {str(anna_engine_defaults.concurrency_skip_unchanged_scales).lower()}
+  turn_pipeline: {str(anna_engine_defaults.concurrency_turn_pipeline).lower()}
+  base_max_inflight: {anna_engine_defaults.concurrency_base_max_inflight}
+  complaint_max_inflight: {anna_engine_defaults.concurrency_complaint_max_inflight}
+  emotion_max_inflight: {anna_engine_defaults.concurrency_emotion_max_inflight}
+  counselor_max_inflight: {anna_engine_defaults.concurrency_counselor_max_inflight}
+  base_requests_per_second: {anna_engine_defaults.concurrency_base_requests_per_second}
+  complaint_requests_per_second: {anna_engine_defaults.concurrency_complaint_requests_per_second}
+  emotion_requests_per_second: {anna_engine_defaults.concurrency_emotion_requests_per_second}
+  counselor_requests_per_second: {anna_engine_defaults.concurrency_counselor_requests_per_second}
+  burst: {anna_engine_defaults.concurrency_burst}
+  adaptive: {str(anna_engine_defaults.concurrency_adaptive).lower()}
+  adaptive_latency_target: {anna_engine_defaults.concurrency_adaptive_latency_target}
+  adaptive_min_inflight: {anna_engine_defaults.concurrency_adaptive_min_inflight}
+llm_cache:
+  enabled: {str(anna_engine_defaults.llm_cache_enabled).lower()}
+  backend: {anna_engine_defaults.llm_cache_backend}
+  path: {anna_engine_defaults.llm_cache_path}
+  ttl_seconds: {anna_engine_defaults.llm_cache_ttl_seconds}
+  max_entries: {anna_engine_defaults.llm_cache_max_entries}
+  max_bytes: {anna_engine_defaults.llm_cache_max_bytes}
+  temperature: {anna_engine_defaults.llm_cache_temperature}
+http:
+  max_connections: {anna_engine_defaults.http_max_connections}
+  max_keepalive_connections: {anna_engine_defaults.http_max_keepalive_connections}
+  keepalive_expiry: {anna_engine_defaults.http_keepalive_expiry}
+  timeout: {anna_engine_defaults.http_timeout}
+  connect_timeout: {anna_engine_defaults.http_connect_timeout}
+  max_retries: {anna_engine_defaults.http_max_retries}
+service:
+  mode: {anna_engine_defaults.service_mode}
+  max_concurrency: {anna_engine_defaults.service_max_concurrency}
+  max_pending: {anna_engine_defaults.service_max_pending}
+  request_timeout: {anna_engine_defaults.service_request_timeout}
+  keepalive_timeout: {anna_engine_defaults.service_keepalive_timeout}
+  shutdown_timeout: {anna_engine_defaults.service_shutdown_timeout}
+  max_body_bytes: {anna_engine_defaults.service_max_body_bytes}
+  session_max_count: {anna_engine_defaults.service_session_max_count}
+  session_max_bytes: {anna_engine_defaults.service_session_max_bytes}
+  session_idle_ttl: {anna_engine_defaults.service_session_idle_ttl}
+  session_spill_dir: {anna_engine_defaults.service_session_spill_dir}
+retry:
+  max_attempts: {anna_engine_defaults.retry_max_attempts}
+  backoff: {anna_engine_defaults.retry_backoff}
+  max_backoff: {anna_engine_defaults.retry_max_backoff}
+  jitter: {anna_engine_defaults.retry_jitter}
+  deadline: {anna_engine_defaults.retry_deadline}
+  hedge_enabled: {str(anna_engine_defaults.retry_hedge_enabled).lower()}
+  hedge_percentile: {anna_engine_defaults.retry_hedge_percentile}
+  hedge_min_samples: {anna_engine_defaults.retry_hedge_min_samples}
+  hedge_min_delay: {anna_engine_defaults.retry_hedge_min_delay}
+tracing:
+  enabled: {str(anna_engine_defaults.tracing_enabled).lower()}
+  path: {anna_engine_defaults.tracing_path}
+  otel: {str(anna_engine_defaults.tracing_otel).lower()}
 """
 
 INIT_INTERACTIVE_YAML = """\
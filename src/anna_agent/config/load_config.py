@@ -137,6 +137,36 @@ def _flatten_config(data: dict[str, Any]) -> dict[str, Any]:
         values["memory_window_size"] = memory.get("window_size")
     if memory.get("window_stride") is not None:
         values["memory_window_stride"] = memory.get("window_stride")
+    if memory.get("read_consistency_interval") is not None:
+        values["memory_read_consistency_interval"] = memory.get(
+            "read_consistency_interval"
+        )
+    if memory.get("index_type") is not None:
+        values["memory_index_type"] = memory.get("index_type")
+    if memory.get("index_min_rows") is not None:
+        values["memory_index_min_rows"] = memory.get("index_min_rows")
+    if memory.get("index_optimize_rows") is not None:
+        values["memory_index_optimize_rows"] = memory.get("index_optimize_rows")
+    if memory.get("index_num_partitions") is not None:
+        values["memory_index_num_partitions"] = memory.get("index_num_partitions")
+    if memory.get("index_num_sub_vectors") is not None:
+        values["memory_index_num_sub_vectors"] = memory.get("index_num_sub_vectors")
+    if memory.get("index_hnsw_m") is not None:
+        values["memory_index_hnsw_m"] = memory.get("index_hnsw_m")
+    if memory.get("index_hnsw_ef_construction") is not None:
+        values["memory_index_hnsw_ef_construction"] = memory.get(
+            "index_hnsw_ef_construction"
+        )
+    if memory.get("search_nprobes") is not None:
+        values["memory_search_nprobes"] = memory.get("search_nprobes")
+    if memory.get("search_refine_factor") is not None:
+        values["memory_search_refine_factor"] = memory.get("search_refine_factor")
+    if memory.get("search_mode") is not None:
+        values["memory_search_mode"] = memory.get("search_mode")
+    if memory.get("search_rrf_k") is not None:
+        values["memory_search_rrf_k"] = memory.get("search_rrf_k")
+    if memory.get("query_cache_size") is not None:
+        values["memory_query_cache_size"] = memory.get("query_cache_size")
 
     embedding = data.get("embedding") or {}
     if embedding.get("model_name") is not None:
@@ -147,6 +177,160 @@ def _flatten_config(data: dict[str, Any]) -> dict[str, Any]:
         values["embedding_api_key"] = embedding.get("api_key")
     if embedding.get("base_url") is not None:
         values["embedding_base_url"] = embedding.get("base_url")
+    if embedding.get("cache_enabled") is not None:
+        values["embedding_cache_enabled"] = embedding.get("cache_enabled")
+    if embedding.get("cache_path") is not None:
+        values["embedding_cache_path"] = embedding.get("cache_path")
+    if embedding.get("batch_size") is not None:
+        values["embedding_batch_size"] = embedding.get("batch_size")
+    if embedding.get("max_batch_tokens") is not None:
+        values["embedding_max_batch_tokens"] = embedding.get("max_batch_tokens")
+    if embedding.get("concurrency") is not None:
+        values["embedding_concurrency"] = embedding.get("concurrency")
+    if embedding.get("max_retries") is not None:
+        values["embedding_max_retries"] = embedding.get("max_retries")
+    if embedding.get("retry_backoff") is not None:
+        values["embedding_retry_backoff"] = embedding.get("retry_backoff")
+    if embedding.get("failure_cooldown") is not None:
+        values["embedding_failure_cooldown"] = embedding.get("failure_cooldown")
+
+    concurrency = data.get("concurrency") or {}
+    if concurrency.get("init_workers") is not None:
+        values["concurrency_init_workers"] = concurrency.get("init_workers")
+    if concurrency.get("scale_fills") is not None:
+        values["concurrency_scale_fills"] = concurrency.get("scale_fills")
+    if concurrency.get("scale_changes") is not None:
+        values["concurrency_scale_changes"] = concurrency.get("scale_changes")
+    if concurrency.get("skip_unchanged_scales") is not None:
+        values["concurrency_skip_unchanged_scales"] = concurrency.get(
+            "skip_unchanged_scales"
+        )
+    if concurrency.get("turn_pipeline") is not None:
+        values["concurrency_turn_pipeline"] = concurrency.get("turn_pipeline")
+    if concurrency.get("base_max_inflight") is not None:
+        values["concurrency_base_max_inflight"] = concurrency.get("base_max_inflight")
+    if concurrency.get("complaint_max_inflight") is not None:
+        values["concurrency_complaint_max_inflight"] = concurrency.get(
+            "complaint_max_inflight"
+        )
+    if concurrency.get("emotion_max_inflight") is not None:
+        values["concurrency_emotion_max_inflight"] = concurrency.get(
+            "emotion_max_inflight"
+        )
+    if concurrency.get("counselor_max_inflight") is not None:
+        values["concurrency_counselor_max_inflight"] = concurrency.get(
+            "counselor_max_inflight"
+        )
+    if concurrency.get("base_requests_per_second") is not None:
+        values["concurrency_base_requests_per_second"] = concurrency.get(
+            "base_requests_per_second"
+        )
+    if concurrency.get("complaint_requests_per_second") is not None:
+        values["concurrency_complaint_requests_per_second"] = concurrency.get(
+            "complaint_requests_per_second"
+        )
+    if concurrency.get("emotion_requests_per_second") is not None:
+        values["concurrency_emotion_requests_per_second"] = concurrency.get(
+            "emotion_requests_per_second"
+        )
+    if concurrency.get("counselor_requests_per_second") is not None:
+        values["concurrency_counselor_requests_per_second"] = concurrency.get(
+            "counselor_requests_per_second"
+        )
+    if concurrency.get("burst") is not None:
+        values["concurrency_burst"] = concurrency.get("burst")
+    if concurrency.get("adaptive") is not None:
+        values["concurrency_adaptive"] = concurrency.get("adaptive")
+    if concurrency.get("adaptive_latency_target") is not None:
+        values["concurrency_adaptive_latency_target"] = concurrency.get(
+            "adaptive_latency_target"
+        )
+    if concurrency.get("adaptive_min_inflight") is not None:
+        values["concurrency_adaptive_min_inflight"] = concurrency.get(
+            "adaptive_min_inflight"
+        )
+
+    llm_cache = data.get("llm_cache") or {}
+    if llm_cache.get("enabled") is not None:
+        values["llm_cache_enabled"] = llm_cache.get("enabled")
+    if llm_cache.get("backend") is not None:
+        values["llm_cache_backend"] = llm_cache.get("backend")
+    if llm_cache.get("path") is not None:
+        values["llm_cache_path"] = llm_cache.get("path")
+    if llm_cache.get("ttl_seconds") is not None:
+        values["llm_cache_ttl_seconds"] = llm_cache.get("ttl_seconds")
+    if llm_cache.get("max_entries") is not None:
+        values["llm_cache_max_entries"] = llm_cache.get("max_entries")
+    if llm_cache.get("max_bytes") is not None:
+        values["llm_cache_max_bytes"] = llm_cache.get("max_bytes")
+    if llm_cache.get("temperature") is not None:
+        values["llm_cache_temperature"] = llm_cache.get("temperature")
+
+    http = data.get("http") or {}
+    if http.get("max_connections") is not None:
+        values["http_max_connections"] = http.get("max_connections")
+    if http.get("max_keepalive_connections") is not None:
+        values["http_max_keepalive_connections"] = http.get("max_keepalive_connections")
+    if http.get("keepalive_expiry") is not None:
+        values["http_keepalive_expiry"] = http.get("keepalive_expiry")
+    if http.get("timeout") is not None:
+        values["http_timeout"] = http.get("timeout")
+    if http.get("connect_timeout") is not None:
+        values["http_connect_timeout"] = http.get("connect_timeout")
+    if http.get("max_retries") is not None:
+        values["http_max_retries"] = http.get("max_retries")
+
+    service = data.get("service") or {}
+    if service.get("mode") is not None:
+        values["service_mode"] = service.get("mode")
+    if service.get("max_concurrency") is not None:
+        values["service_max_concurrency"] = service.get("max_concurrency")
+    if service.get("max_pending") is not None:
+        values["service_max_pending"] = service.get("max_pending")
+    if service.get("request_timeout") is not None:
+        values["service_request_timeout"] = service.get("request_timeout")
+    if service.get("keepalive_timeout") is not None:
+        values["service_keepalive_timeout"] = service.get("keepalive_timeout")
+    if service.get("shutdown_timeout") is not None:
+        values["service_shutdown_timeout"] = service.get("shutdown_timeout")
+    if service.get("max_body_bytes") is not None:
+        values["service_max_body_bytes"] = service.get("max_body_bytes")
+    if service.get("session_max_count") is not None:
+        values["service_session_max_count"] = service.get("session_max_count")
+    if service.get("session_max_bytes") is not None:
+        values["service_session_max_bytes"] = service.get("session_max_bytes")
+    if service.get("session_idle_ttl") is not None:
+        values["service_session_idle_ttl"] = service.get("session_idle_ttl")
+    if service.get("session_spill_dir") is not None:
+        values["service_session_spill_dir"] = service.get("session_spill_dir")
+
+    retry = data.get("retry") or {}
+    if retry.get("max_attempts") is not None:
+        values["retry_max_attempts"] = retry.get("max_attempts")
+    if retry.get("backoff") is not None:
+        values["retry_backoff"] = retry.get("backoff")
+    if retry.get("max_backoff") is not None:
+        values["retry_max_backoff"] = retry.get("max_backoff")
+    if retry.get("jitter") is not None:
+        values["retry_jitter"] = retry.get("jitter")
+    if retry.get("deadline") is not None:
+        values["retry_deadline"] = retry.get("deadline")
+    if retry.get("hedge_enabled") is not None:
+        values["retry_hedge_enabled"] = retry.get("hedge_enabled")
+    if retry.get("hedge_percentile") is not None:
+        values["retry_hedge_percentile"] = retry.get("hedge_percentile")
+    if retry.get("hedge_min_samples") is not None:
+        values["retry_hedge_min_samples"] = retry.get("hedge_min_samples")
+    if retry.get("hedge_min_delay") is not None:
+        values["retry_hedge_min_delay"] = retry.get("hedge_min_delay")
+
+    tracing = data.get("tracing") or {}
+    if tracing.get("enabled") is not None:
+        values["tracing_enabled"] = tracing.get("enabled")
+    if tracing.get("path") is not None:
+        values["tracing_path"] = tracing.get("path")
+    if tracing.get("otel") is not None:
+        values["tracing_otel"] = tracing.get("otel")
     return values
 
 
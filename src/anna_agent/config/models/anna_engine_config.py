@@ -41,10 +41,182 @@ class AnnaEngineConfig(BaseModel):
     memory_top_k: int = Field(default=anna_engine_defaults.memory_top_k)
     memory_window_size: int = Field(default=anna_engine_defaults.memory_window_size)
     memory_window_stride: int = Field(default=anna_engine_defaults.memory_window_stride)
+    memory_read_consistency_interval: float = Field(
+        default=anna_engine_defaults.memory_read_consistency_interval
+    )
+    memory_index_type: str = Field(default=anna_engine_defaults.memory_index_type)
+    memory_index_min_rows: int = Field(
+        default=anna_engine_defaults.memory_index_min_rows
+    )
+    memory_index_optimize_rows: int = Field(
+        default=anna_engine_defaults.memory_index_optimize_rows
+    )
+    memory_index_num_partitions: int = Field(
+        default=anna_engine_defaults.memory_index_num_partitions
+    )
+    memory_index_num_sub_vectors: int = Field(
+        default=anna_engine_defaults.memory_index_num_sub_vectors
+    )
+    memory_index_hnsw_m: int = Field(default=anna_engine_defaults.memory_index_hnsw_m)
+    memory_index_hnsw_ef_construction: int = Field(
+        default=anna_engine_defaults.memory_index_hnsw_ef_construction
+    )
+    memory_search_nprobes: int = Field(
+        default=anna_engine_defaults.memory_search_nprobes
+    )
+    memory_search_refine_factor: int = Field(
+        default=anna_engine_defaults.memory_search_refine_factor
+    )
+    memory_search_mode: str = Field(default=anna_engine_defaults.memory_search_mode)
+    memory_search_rrf_k: int = Field(default=anna_engine_defaults.memory_search_rrf_k)
+    memory_query_cache_size: int = Field(
+        default=anna_engine_defaults.memory_query_cache_size
+    )
     embedding_model_name: str = Field(default=anna_engine_defaults.embedding_model_name)
     embedding_dimension: int = Field(default=anna_engine_defaults.embedding_dimension)
     embedding_api_key: str = Field(default=anna_engine_defaults.embedding_api_key)
     embedding_base_url: str = Field(default=anna_engine_defaults.embedding_base_url)
+    embedding_cache_enabled: bool = Field(
+        default=anna_engine_defaults.embedding_cache_enabled
+    )
+    embedding_cache_path: str = Field(default=anna_engine_defaults.embedding_cache_path)
+    embedding_batch_size: int = Field(default=anna_engine_defaults.embedding_batch_size)
+    embedding_max_batch_tokens: int = Field(
+        default=anna_engine_defaults.embedding_max_batch_tokens
+    )
+    embedding_concurrency: int = Field(
+        default=anna_engine_defaults.embedding_concurrency
+    )
+    embedding_max_retries: int = Field(
+        default=anna_engine_defaults.embedding_max_retries
+    )
+    embedding_retry_backoff: float = Field(
+        default=anna_engine_defaults.embedding_retry_backoff
+    )
+    embedding_failure_cooldown: float = Field(
+        default=anna_engine_defaults.embedding_failure_cooldown
+    )
+    concurrency_init_workers: int = Field(
+        default=anna_engine_defaults.concurrency_init_workers
+    )
+    concurrency_scale_fills: bool = Field(
+        default=anna_engine_defaults.concurrency_scale_fills
+    )
+    concurrency_scale_changes: bool = Field(
+        default=anna_engine_defaults.concurrency_scale_changes
+    )
+    concurrency_skip_unchanged_scales: bool = Field(
+        default=anna_engine_defaults.concurrency_skip_unchanged_scales
+    )
+    concurrency_turn_pipeline: bool = Field(
+        default=anna_engine_defaults.concurrency_turn_pipeline
+    )
+    concurrency_base_max_inflight: int = Field(
+        default=anna_engine_defaults.concurrency_base_max_inflight
+    )
+    concurrency_complaint_max_inflight: int = Field(
+        default=anna_engine_defaults.concurrency_complaint_max_inflight
+    )
+    concurrency_emotion_max_inflight: int = Field(
+        default=anna_engine_defaults.concurrency_emotion_max_inflight
+    )
+    concurrency_counselor_max_inflight: int = Field(
+        default=anna_engine_defaults.concurrency_counselor_max_inflight
+    )
+    concurrency_base_requests_per_second: float = Field(
+        default=anna_engine_defaults.concurrency_base_requests_per_second
+    )
+    concurrency_complaint_requests_per_second: float = Field(
+        default=anna_engine_defaults.concurrency_complaint_requests_per_second
+    )
+    concurrency_emotion_requests_per_second: float = Field(
+        default=anna_engine_defaults.concurrency_emotion_requests_per_second
+    )
+    concurrency_counselor_requests_per_second: float = Field(
+        default=anna_engine_defaults.concurrency_counselor_requests_per_second
+    )
+    concurrency_burst: int = Field(default=anna_engine_defaults.concurrency_burst)
+    concurrency_adaptive: bool = Field(
+        default=anna_engine_defaults.concurrency_adaptive
+    )
+    concurrency_adaptive_latency_target: float = Field(
+        default=anna_engine_defaults.concurrency_adaptive_latency_target
+    )
+    concurrency_adaptive_min_inflight: int = Field(
+        default=anna_engine_defaults.concurrency_adaptive_min_inflight
+    )
+    llm_cache_enabled: bool = Field(default=anna_engine_defaults.llm_cache_enabled)
+    llm_cache_backend: str = Field(default=anna_engine_defaults.llm_cache_backend)
+    llm_cache_path: str = Field(default=anna_engine_defaults.llm_cache_path)
+    llm_cache_ttl_seconds: int = Field(
+        default=anna_engine_defaults.llm_cache_ttl_seconds
+    )
+    llm_cache_max_entries: int = Field(
+        default=anna_engine_defaults.llm_cache_max_entries
+    )
+    llm_cache_max_bytes: int = Field(default=anna_engine_defaults.llm_cache_max_bytes)
+    llm_cache_temperature: float = Field(
+        default=anna_engine_defaults.llm_cache_temperature
+    )
+    http_max_connections: int = Field(default=anna_engine_defaults.http_max_connections)
+    http_max_keepalive_connections: int = Field(
+        default=anna_engine_defaults.http_max_keepalive_connections
+    )
+    http_keepalive_expiry: float = Field(
+        default=anna_engine_defaults.http_keepalive_expiry
+    )
+    http_timeout: float = Field(default=anna_engine_defaults.http_timeout)
+    http_connect_timeout: float = Field(
+        default=anna_engine_defaults.http_connect_timeout
+    )
+    http_max_retries: int = Field(default=anna_engine_defaults.http_max_retries)
+    retry_max_attempts: int = Field(default=anna_engine_defaults.retry_max_attempts)
+    retry_backoff: float = Field(default=anna_engine_defaults.retry_backoff)
+    retry_max_backoff: float = Field(default=anna_engine_defaults.retry_max_backoff)
+    retry_jitter: float = Field(default=anna_engine_defaults.retry_jitter)
+    retry_deadline: float = Field(default=anna_engine_defaults.retry_deadline)
+    retry_hedge_enabled: bool = Field(default=anna_engine_defaults.retry_hedge_enabled)
+    retry_hedge_percentile: float = Field(
+        default=anna_engine_defaults.retry_hedge_percentile
+    )
+    retry_hedge_min_samples: int = Field(
+        default=anna_engine_defaults.retry_hedge_min_samples
+    )
+    retry_hedge_min_delay: float = Field(
+        default=anna_engine_defaults.retry_hedge_min_delay
+    )
+    tracing_enabled: bool = Field(default=anna_engine_defaults.tracing_enabled)
+    tracing_path: str = Field(default=anna_engine_defaults.tracing_path)
+    tracing_otel: bool = Field(default=anna_engine_defaults.tracing_otel)
+    service_mode: str = Field(default=anna_engine_defaults.service_mode)
+    service_max_concurrency: int = Field(
+        default=anna_engine_defaults.service_max_concurrency
+    )
+    service_max_pending: int = Field(default=anna_engine_defaults.service_max_pending)
+    service_request_timeout: float = Field(
+        default=anna_engine_defaults.service_request_timeout
+    )
+    service_keepalive_timeout: float = Field(
+        default=anna_engine_defaults.service_keepalive_timeout
+    )
+    service_shutdown_timeout: float = Field(
+        default=anna_engine_defaults.service_shutdown_timeout
+    )
+    service_max_body_bytes: int = Field(
+        default=anna_engine_defaults.service_max_body_bytes
+    )
+    service_session_max_count: int = Field(
+        default=anna_engine_defaults.service_session_max_count
+    )
+    service_session_max_bytes: int = Field(
+        default=anna_engine_defaults.service_session_max_bytes
+    )
+    service_session_idle_ttl: float = Field(
+        default=anna_engine_defaults.service_session_idle_ttl
+    )
+    service_session_spill_dir: str = Field(
+        default=anna_engine_defaults.service_session_spill_dir
+    )
 
     @property
     def active_complaint_model_name(self) -> str:
@@ -155,6 +327,58 @@ class AnnaEngineConfig(BaseModel):
                     "MEMORY_WINDOW_STRIDE",
                     default_value=anna_engine_defaults.memory_window_stride,
                 ),
+                "memory_read_consistency_interval": reader.float(
+                    "MEMORY_READ_CONSISTENCY_INTERVAL",
+                    default_value=anna_engine_defaults.memory_read_consistency_interval,
+                ),
+                "memory_index_type": reader.str(
+                    "MEMORY_INDEX_TYPE",
+                    default_value=anna_engine_defaults.memory_index_type,
+                ),
+                "memory_index_min_rows": reader.int(
+                    "MEMORY_INDEX_MIN_ROWS",
+                    default_value=anna_engine_defaults.memory_index_min_rows,
+                ),
+                "memory_index_optimize_rows": reader.int(
+                    "MEMORY_INDEX_OPTIMIZE_ROWS",
+                    default_value=anna_engine_defaults.memory_index_optimize_rows,
+                ),
+                "memory_index_num_partitions": reader.int(
+                    "MEMORY_INDEX_NUM_PARTITIONS",
+                    default_value=anna_engine_defaults.memory_index_num_partitions,
+                ),
+                "memory_index_num_sub_vectors": reader.int(
+                    "MEMORY_INDEX_NUM_SUB_VECTORS",
+                    default_value=anna_engine_defaults.memory_index_num_sub_vectors,
+                ),
+                "memory_index_hnsw_m": reader.int(
+                    "MEMORY_INDEX_HNSW_M",
+                    default_value=anna_engine_defaults.memory_index_hnsw_m,
+                ),
+                "memory_index_hnsw_ef_construction": reader.int(
+                    "MEMORY_INDEX_HNSW_EF_CONSTRUCTION",
+                    default_value=anna_engine_defaults.memory_index_hnsw_ef_construction,
+                ),
+                "memory_search_nprobes": reader.int(
+                    "MEMORY_SEARCH_NPROBES",
+                    default_value=anna_engine_defaults.memory_search_nprobes,
+                ),
+                "memory_search_refine_factor": reader.int(
+                    "MEMORY_SEARCH_REFINE_FACTOR",
+                    default_value=anna_engine_defaults.memory_search_refine_factor,
+                ),
+                "memory_search_mode": reader.str(
+                    "MEMORY_SEARCH_MODE",
+                    default_value=anna_engine_defaults.memory_search_mode,
+                ),
+                "memory_search_rrf_k": reader.int(
+                    "MEMORY_SEARCH_RRF_K",
+                    default_value=anna_engine_defaults.memory_search_rrf_k,
+                ),
+                "memory_query_cache_size": reader.int(
+                    "MEMORY_QUERY_CACHE_SIZE",
+                    default_value=anna_engine_defaults.memory_query_cache_size,
+                ),
                 "embedding_model_name": reader.str(
                     "EMBEDDING_MODEL_NAME",
                     default_value=anna_engine_defaults.embedding_model_name,
@@ -171,6 +395,250 @@ class AnnaEngineConfig(BaseModel):
                     "EMBEDDING_BASE_URL",
                     default_value=anna_engine_defaults.embedding_base_url,
                 ),
+                "embedding_cache_enabled": reader.bool(
+                    "EMBEDDING_CACHE_ENABLED",
+                    default_value=anna_engine_defaults.embedding_cache_enabled,
+                ),
+                "embedding_cache_path": reader.str(
+                    "EMBEDDING_CACHE_PATH",
+                    default_value=anna_engine_defaults.embedding_cache_path,
+                ),
+                "embedding_batch_size": reader.int(
+                    "EMBEDDING_BATCH_SIZE",
+                    default_value=anna_engine_defaults.embedding_batch_size,
+                ),
+                "embedding_max_batch_tokens": reader.int(
+                    "EMBEDDING_MAX_BATCH_TOKENS",
+                    default_value=anna_engine_defaults.embedding_max_batch_tokens,
+                ),
+                "embedding_concurrency": reader.int(
+                    "EMBEDDING_CONCURRENCY",
+                    default_value=anna_engine_defaults.embedding_concurrency,
+                ),
+                "embedding_max_retries": reader.int(
+                    "EMBEDDING_MAX_RETRIES",
+                    default_value=anna_engine_defaults.embedding_max_retries,
+                ),
+                "embedding_retry_backoff": reader.float(
+                    "EMBEDDING_RETRY_BACKOFF",
+                    default_value=anna_engine_defaults.embedding_retry_backoff,
+                ),
+                "embedding_failure_cooldown": reader.float(
+                    "EMBEDDING_FAILURE_COOLDOWN",
+                    default_value=anna_engine_defaults.embedding_failure_cooldown,
+                ),
+                "concurrency_init_workers": reader.int(
+                    "CONCURRENCY_INIT_WORKERS",
+                    default_value=anna_engine_defaults.concurrency_init_workers,
+                ),
+                "concurrency_scale_fills": reader.bool(
+                    "CONCURRENCY_SCALE_FILLS",
+                    default_value=anna_engine_defaults.concurrency_scale_fills,
+                ),
+                "concurrency_scale_changes": reader.bool(
+                    "CONCURRENCY_SCALE_CHANGES",
+                    default_value=anna_engine_defaults.concurrency_scale_changes,
+                ),
+                "concurrency_skip_unchanged_scales": reader.bool(
+                    "CONCURRENCY_SKIP_UNCHANGED_SCALES",
+                    default_value=anna_engine_defaults.concurrency_skip_unchanged_scales,
+                ),
+                "concurrency_turn_pipeline": reader.bool(
+                    "CONCURRENCY_TURN_PIPELINE",
+                    default_value=anna_engine_defaults.concurrency_turn_pipeline,
+                ),
+                "concurrency_base_max_inflight": reader.int(
+                    "CONCURRENCY_BASE_MAX_INFLIGHT",
+                    default_value=anna_engine_defaults.concurrency_base_max_inflight,
+                ),
+                "concurrency_complaint_max_inflight": reader.int(
+                    "CONCURRENCY_COMPLAINT_MAX_INFLIGHT",
+                    default_value=anna_engine_defaults.concurrency_complaint_max_inflight,
+                ),
+                "concurrency_emotion_max_inflight": reader.int(
+                    "CONCURRENCY_EMOTION_MAX_INFLIGHT",
+                    default_value=anna_engine_defaults.concurrency_emotion_max_inflight,
+                ),
+                "concurrency_counselor_max_inflight": reader.int(
+                    "CONCURRENCY_COUNSELOR_MAX_INFLIGHT",
+                    default_value=anna_engine_defaults.concurrency_counselor_max_inflight,
+                ),
+                "concurrency_base_requests_per_second": reader.float(
+                    "CONCURRENCY_BASE_REQUESTS_PER_SECOND",
+                    default_value=anna_engine_defaults.concurrency_base_requests_per_second,
+                ),
+                "concurrency_complaint_requests_per_second": reader.float(
+                    "CONCURRENCY_COMPLAINT_REQUESTS_PER_SECOND",
+                    default_value=anna_engine_defaults.concurrency_complaint_requests_per_second,
+                ),
+                "concurrency_emotion_requests_per_second": reader.float(
+                    "CONCURRENCY_EMOTION_REQUESTS_PER_SECOND",
+                    default_value=anna_engine_defaults.concurrency_emotion_requests_per_second,
+                ),
+                "concurrency_counselor_requests_per_second": reader.float(
+                    "CONCURRENCY_COUNSELOR_REQUESTS_PER_SECOND",
+                    default_value=anna_engine_defaults.concurrency_counselor_requests_per_second,
+                ),
+                "concurrency_burst": reader.int(
+                    "CONCURRENCY_BURST",
+                    default_value=anna_engine_defaults.concurrency_burst,
+                ),
+                "concurrency_adaptive": reader.bool(
+                    "CONCURRENCY_ADAPTIVE",
+                    default_value=anna_engine_defaults.concurrency_adaptive,
+                ),
+                "concurrency_adaptive_latency_target": reader.float(
+                    "CONCURRENCY_ADAPTIVE_LATENCY_TARGET",
+                    default_value=anna_engine_defaults.concurrency_adaptive_latency_target,
+                ),
+                "concurrency_adaptive_min_inflight": reader.int(
+                    "CONCURRENCY_ADAPTIVE_MIN_INFLIGHT",
+                    default_value=anna_engine_defaults.concurrency_adaptive_min_inflight,
+                ),
+                "llm_cache_enabled": reader.bool(
+                    "LLM_CACHE_ENABLED",
+                    default_value=anna_engine_defaults.llm_cache_enabled,
+                ),
+                "llm_cache_backend": reader.str(
+                    "LLM_CACHE_BACKEND",
+                    default_value=anna_engine_defaults.llm_cache_backend,
+                ),
+                "llm_cache_path": reader.str(
+                    "LLM_CACHE_PATH",
+                    default_value=anna_engine_defaults.llm_cache_path,
+                ),
+                "llm_cache_ttl_seconds": reader.int(
+                    "LLM_CACHE_TTL_SECONDS",
+                    default_value=anna_engine_defaults.llm_cache_ttl_seconds,
+                ),
+                "llm_cache_max_entries": reader.int(
+                    "LLM_CACHE_MAX_ENTRIES",
+                    default_value=anna_engine_defaults.llm_cache_max_entries,
+                ),
+                "llm_cache_max_bytes": reader.int(
+                    "LLM_CACHE_MAX_BYTES",
+                    default_value=anna_engine_defaults.llm_cache_max_bytes,
+                ),
+                "llm_cache_temperature": reader.float(
+                    "LLM_CACHE_TEMPERATURE",
+                    default_value=anna_engine_defaults.llm_cache_temperature,
+                ),
+                "http_max_connections": reader.int(
+                    "HTTP_MAX_CONNECTIONS",
+                    default_value=anna_engine_defaults.http_max_connections,
+                ),
+                "http_max_keepalive_connections": reader.int(
+                    "HTTP_MAX_KEEPALIVE_CONNECTIONS",
+                    default_value=anna_engine_defaults.http_max_keepalive_connections,
+                ),
+                "http_keepalive_expiry": reader.float(
+                    "HTTP_KEEPALIVE_EXPIRY",
+                    default_value=anna_engine_defaults.http_keepalive_expiry,
+                ),
+                "http_timeout": reader.float(
+                    "HTTP_TIMEOUT",
+                    default_value=anna_engine_defaults.http_timeout,
+                ),
+                "http_connect_timeout": reader.float(
+                    "HTTP_CONNECT_TIMEOUT",
+                    default_value=anna_engine_defaults.http_connect_timeout,
+                ),
+                "http_max_retries": reader.int(
+                    "HTTP_MAX_RETRIES",
+                    default_value=anna_engine_defaults.http_max_retries,
+                ),
+                "retry_max_attempts": reader.int(
+                    "RETRY_MAX_ATTEMPTS",
+                    default_value=anna_engine_defaults.retry_max_attempts,
+                ),
+                "retry_backoff": reader.float(
+                    "RETRY_BACKOFF",
+                    default_value=anna_engine_defaults.retry_backoff,
+                ),
+                "retry_max_backoff": reader.float(
+                    "RETRY_MAX_BACKOFF",
+                    default_value=anna_engine_defaults.retry_max_backoff,
+                ),
+                "retry_jitter": reader.float(
+                    "RETRY_JITTER",
+                    default_value=anna_engine_defaults.retry_jitter,
+                ),
+                "retry_deadline": reader.float(
+                    "RETRY_DEADLINE",
+                    default_value=anna_engine_defaults.retry_deadline,
+                ),
+                "retry_hedge_enabled": reader.bool(
+                    "RETRY_HEDGE_ENABLED",
+                    default_value=anna_engine_defaults.retry_hedge_enabled,
+                ),
+                "retry_hedge_percentile": reader.float(
+                    "RETRY_HEDGE_PERCENTILE",
+                    default_value=anna_engine_defaults.retry_hedge_percentile,
+                ),
+                "retry_hedge_min_samples": reader.int(
+                    "RETRY_HEDGE_MIN_SAMPLES",
+                    default_value=anna_engine_defaults.retry_hedge_min_samples,
+                ),
+                "retry_hedge_min_delay": reader.float(
+                    "RETRY_HEDGE_MIN_DELAY",
+                    default_value=anna_engine_defaults.retry_hedge_min_delay,
+                ),
+                "tracing_enabled": reader.bool(
+                    "TRACING_ENABLED",
+                    default_value=anna_engine_defaults.tracing_enabled,
+                ),
+                "tracing_path": reader.str(
+                    "TRACING_PATH",
+                    default_value=anna_engine_defaults.tracing_path,
+                ),
+                "tracing_otel": reader.bool(
+                    "TRACING_OTEL",
+                    default_value=anna_engine_defaults.tracing_otel,
+                ),
+                "service_mode": reader.str(
+                    "SERVICE_MODE",
+                    default_value=anna_engine_defaults.service_mode,
+                ),
+                "service_max_concurrency": reader.int(
+                    "SERVICE_MAX_CONCURRENCY",
+                    default_value=anna_engine_defaults.service_max_concurrency,
+                ),
+                "service_max_pending": reader.int(
+                    "SERVICE_MAX_PENDING",
+                    default_value=anna_engine_defaults.service_max_pending,
+                ),
+                "service_request_timeout": reader.float(
+                    "SERVICE_REQUEST_TIMEOUT",
+                    default_value=anna_engine_defaults.service_request_timeout,
+                ),
+                "service_keepalive_timeout": reader.float(
+                    "SERVICE_KEEPALIVE_TIMEOUT",
+                    default_value=anna_engine_defaults.service_keepalive_timeout,
+                ),
+                "service_shutdown_timeout": reader.float(
+                    "SERVICE_SHUTDOWN_TIMEOUT",
+                    default_value=anna_engine_defaults.service_shutdown_timeout,
+                ),
+                "service_max_body_bytes": reader.int(
+                    "SERVICE_MAX_BODY_BYTES",
+                    default_value=anna_engine_defaults.service_max_body_bytes,
+                ),
+                "service_session_max_count": reader.int(
+                    "SERVICE_SESSION_MAX_COUNT",
+                    default_value=anna_engine_defaults.service_session_max_count,
+                ),
+                "service_session_max_bytes": reader.int(
+                    "SERVICE_SESSION_MAX_BYTES",
+                    default_value=anna_engine_defaults.service_session_max_bytes,
+                ),
+                "service_session_idle_ttl": reader.float(
+                    "SERVICE_SESSION_IDLE_TTL",
+                    default_value=anna_engine_defaults.service_session_idle_ttl,
+                ),
+                "service_session_spill_dir": reader.str(
+                    "SERVICE_SESSION_SPILL_DIR",
+                    default_value=anna_engine_defaults.service_session_spill_dir,
+                ),
             }
         mimo_model = env("MIMO_MODEL", None)
         mimo_api_key = env("MIMO_API_KEY", None)
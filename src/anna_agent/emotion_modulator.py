@@ -1,6 +1,7 @@
 from random import randint
 from .emotion_pertuber import perturb_state
-from .backbone import get_emotion_client
+from .backbone import get_async_emotion_client, get_emotion_client
+from .common.fallbacks import fallbacks
 from .common.registry import registry
 from .common.tool_calls import extract_tool_call_arguments
 
@@ -56,15 +57,13 @@ tools = [
 ]
 
 
-
-def emotion_inferencer(profile, conversation):
-    client = get_emotion_client()
+def _emotion_request(profile, conversation):
     patient_info = f"### 患者信息\n年龄：{profile['age']}\n性别：{profile['gender']}\n职业：{profile['occupation']}\n婚姻状况：{profile['martial_status']}\n症状：{profile['symptoms']}"
     dialogue_history = "\n".join(
         [f"{conv['role']}: {conv['content']}" for conv in conversation]
     )
     config = registry.get("anna_engine_config")
-    response = client.chat.completions.create(
+    return dict(
         model=config.active_emotion_model_name,
         messages=[
             {
@@ -75,17 +74,45 @@ def emotion_inferencer(profile, conversation):
         tools=tools,
         tool_choice={"type": "function", "function": {"name": "emotion_inference"}},
     )
+
+
+def _parse_emotion(response):
     args = extract_tool_call_arguments(response)
     emotion = args.get("emotion") if args else None
     if not isinstance(emotion, str):
+        fallbacks.record("emotion")
         return "neutral"
     return emotion
 
 
-def emotion_modulation(profile, conversation):
-    indicator = randint(0, 100)
-    emotion = emotion_inferencer(profile, conversation)
+def _modulate(emotion, indicator):
     if indicator > 90:
         return perturb_state(emotion)
     else:
         return emotion
+
+
+def emotion_inferencer(profile, conversation):
+    client = get_emotion_client()
+    response = client.chat.completions.create(**_emotion_request(profile, conversation))
+    return _parse_emotion(response)
+
+
+async def aemotion_inferencer(profile, conversation):
+    client = get_async_emotion_client()
+    response = await client.chat.completions.create(
+        **_emotion_request(profile, conversation)
+    )
+    return _parse_emotion(response)
+
+
+def emotion_modulation(profile, conversation):
+    indicator = randint(0, 100)
+    emotion = emotion_inferencer(profile, conversation)
+    return _modulate(emotion, indicator)
+
+
+async def aemotion_modulation(profile, conversation):
+    indicator = randint(0, 100)
+    emotion = await aemotion_inferencer(profile, conversation)
+    return _modulate(emotion, indicator)
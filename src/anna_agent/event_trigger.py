@@ -1,7 +1,8 @@
 import pandas as pd
 from pathlib import Path
 from random import choice
-from .backbone import get_counselor_client
+from .backbone import get_async_counselor_client, get_counselor_client
+from .common.fallbacks import fallbacks
 from .common.registry import registry
 from .common.tool_calls import extract_tool_call_arguments
 
@@ -50,11 +51,9 @@ def event_trigger(profile):
     )
 
 
-def situationalising_events(profile):
-    client = get_counselor_client()
+def _situation_request(profile, event):
     patient_info = f"### 患者信息\n年龄：{profile['age']}\n性别：{profile['gender']}"
-    event = event_trigger(profile)
-    response = client.chat.completions.create(
+    return dict(
         model=registry.get("anna_engine_config").counselor_model_name,
         messages=[
             {
@@ -68,8 +67,28 @@ def situationalising_events(profile):
             "function": {"name": "situationalising_events"},
         },
     )
+
+
+def _parse_situation(response, event):
     args = extract_tool_call_arguments(response)
     situation = args.get("situation") if args else None
     if not isinstance(situation, str):
+        fallbacks.record("situation")
         return event
     return situation
+
+
+def situationalising_events(profile):
+    client = get_counselor_client()
+    event = event_trigger(profile)
+    response = client.chat.completions.create(**_situation_request(profile, event))
+    return _parse_situation(response, event)
+
+
+async def asituationalising_events(profile):
+    client = get_async_counselor_client()
+    event = event_trigger(profile)
+    response = await client.chat.completions.create(
+        **_situation_request(profile, event)
+    )
+    return _parse_situation(response, event)
@@ -1,8 +1,12 @@
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from .backbone import get_counselor_client
+from .backbone import get_async_counselor_client, get_counselor_client
+from .common.fallbacks import fallbacks
 from .common.registry import registry
 from .common.tool_calls import extract_tool_call_arguments
+from .common.tracing import submit
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +16,10 @@ def _extract_answers(response, expected_length, default="B"):
     answers = args.get("answers") if args else None
     if isinstance(answers, list) and len(answers) == expected_length:
         return answers
+    fallbacks.record("scale_answers")
     return [default] * expected_length
 
+
 tools = [
     {
         "type": "function",
@@ -75,101 +81,117 @@ tools = [
 ]
 
 
-# 根据profile和report填写之前的量表
-def fill_scales_previous(profile, report):
-    """
-    结构化信息转换成非结构化文本数据，免去模型对语义解析的理解错误
-    """
-    client = get_counselor_client()
-    prompt = (
-        "### 任务\n根据个人描述和报告，填写量表。"
-        f"\n### 个人描述\n{profile}"
-        f"\n### 报告\n{report}"
-    )
+# 量表工具名及题目数量
+SCALES = [("fill_bdi", 21), ("fill_ghq", 28), ("fill_sass", 21)]
+
 
-    # 填写BDI量表
-    response = client.chat.completions.create(
+def _scale_request(messages, tool_name):
+    return dict(
         model=registry.get("anna_engine_config").counselor_model_name,
-        messages=[{"role": "user", "content": prompt}],
+        messages=messages,
         temperature=0.1,
         tools=tools,
-        tool_choice={"type": "function", "function": {"name": "fill_bdi"}},
+        tool_choice={"type": "function", "function": {"name": tool_name}},
     )
 
-    logger.debug("BDI response: %s", response)
-    bdi = _extract_answers(response, 21)
 
-    # 填写GHQ-28量表
-    response = client.chat.completions.create(
-        model=registry.get("anna_engine_config").counselor_model_name,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.1,
-        tools=tools,
-        tool_choice={"type": "function", "function": {"name": "fill_ghq"}},
+def _fill_scale(client, messages, tool_name, expected_length):
+    response = client.chat.completions.create(**_scale_request(messages, tool_name))
+    logger.debug("%s response: %s", tool_name, response)
+    return _extract_answers(response, expected_length)
+
+
+async def _afill_scale(client, messages, tool_name, expected_length):
+    response = await client.chat.completions.create(
+        **_scale_request(messages, tool_name)
     )
-    # print(response.choices[0].message.tool_calls[0].function.arguments)
-    ghq = _extract_answers(response, 28)
+    logger.debug("%s response: %s", tool_name, response)
+    return _extract_answers(response, expected_length)
 
-    # 填写SASS量表
-    response = client.chat.completions.create(
-        model=registry.get("anna_engine_config").counselor_model_name,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.1,
-        tools=tools,
-        tool_choice={"type": "function", "function": {"name": "fill_sass"}},
+
+def _fill_all_scales(messages, concurrent=None):
+    """Fill BDI, GHQ-28 and SASS for the same ``messages``.
+
+    The three tool calls are independent, so by default they are sent at once
+    and gathered in scale order. Each scale keeps its own answer fallback.
+    """
+
+    client = get_counselor_client(cached=True)
+    if concurrent is None:
+        cfg = registry.get("anna_engine_config")
+        concurrent = bool(cfg and cfg.concurrency_scale_fills)
+    if not concurrent:
+        return tuple(
+            _fill_scale(client, messages, tool_name, expected_length)
+            for tool_name, expected_length in SCALES
+        )
+    with ThreadPoolExecutor(
+        max_workers=len(SCALES), thread_name_prefix="anna-scales"
+    ) as executor:
+        futures = [
+            submit(executor, _fill_scale, client, messages, tool_name, expected_length)
+            for tool_name, expected_length in SCALES
+        ]
+        return tuple(future.result() for future in futures)
+
+
+async def _afill_all_scales(messages):
+    """Async :func:`_fill_all_scales`; the three calls are always gathered."""
+
+    client = get_async_counselor_client(cached=True)
+    return tuple(
+        await asyncio.gather(
+            *(
+                _afill_scale(client, messages, tool_name, expected_length)
+                for tool_name, expected_length in SCALES
+            )
+        )
     )
 
-    # Step 3：提取量表答案
-    sass = _extract_answers(response, 21)
 
-    return bdi, ghq, sass
+def _previous_scale_messages(profile, report):
+    prompt = (
+        "### 任务\n根据个人描述和报告，填写量表。"
+        f"\n### 个人描述\n{profile}"
+        f"\n### 报告\n{report}"
+    )
+    return [{"role": "user", "content": prompt}]
 
 
-# 根据prompt填写量表
-def fill_scales(prompt):
-    client = get_counselor_client()
+def _current_scale_messages(prompt):
     logger.debug("scale prompt: %s", prompt)
     task_prompt = "### 任务\n请根据你的情况填写量表。"
+    return [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": task_prompt},
+    ]
 
-    # 填写BDI量表
-    response = client.chat.completions.create(
-        model=registry.get("anna_engine_config").counselor_model_name,
-        messages=[
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": task_prompt},
-        ],
-        tools=tools,
-        temperature=0.1,
-        tool_choice={"type": "function", "function": {"name": "fill_bdi"}},
-    )
-    logger.debug("BDI response: %s", response)
-    bdi = _extract_answers(response, 21)
-    # 填写GHQ-28量表
-    response = client.chat.completions.create(
-        model=registry.get("anna_engine_config").counselor_model_name,
-        messages=[
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": task_prompt},
-        ],
-        temperature=0.1,
-        tools=tools,
-        tool_choice={"type": "function", "function": {"name": "fill_ghq"}},
+
+# 根据profile和report填写之前的量表
+def fill_scales_previous(profile, report, concurrent=None):
+    """
+    结构化信息转换成非结构化文本数据，免去模型对语义解析的理解错误
+    """
+    # 依次填写BDI、GHQ-28、SASS量表并提取答案
+    bdi, ghq, sass = _fill_all_scales(
+        _previous_scale_messages(profile, report), concurrent=concurrent
     )
+    return bdi, ghq, sass
 
-    logger.debug("GHQ response: %s", response)
-    ghq = _extract_answers(response, 28)
-    # 填写SASS量表
-    response = client.chat.completions.create(
-        model=registry.get("anna_engine_config").counselor_model_name,
-        messages=[
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": task_prompt},
-        ],
-        temperature=0.1,
-        tools=tools,
-        tool_choice={"type": "function", "function": {"name": "fill_sass"}},
+
+async def afill_scales_previous(profile, report):
+    bdi, ghq, sass = await _afill_all_scales(_previous_scale_messages(profile, report))
+    return bdi, ghq, sass
+
+
+# 根据prompt填写量表
+def fill_scales(prompt, concurrent=None):
+    bdi, ghq, sass = _fill_all_scales(
+        _current_scale_messages(prompt), concurrent=concurrent
     )
+    return bdi, ghq, sass
+
 
-    logger.debug("SASS response: %s", response)
-    sass = _extract_answers(response, 21)
+async def afill_scales(prompt):
+    bdi, ghq, sass = await _afill_all_scales(_current_scale_messages(prompt))
     return bdi, ghq, sass
@@ -0,0 +1,313 @@
+"""Content-addressed cache for deterministic chat completion calls."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from openai.types.chat import ChatCompletion
+
+from .common.chat_proxy import ChatClientProxy
+from .common.tool_calls import extract_tool_call_arguments
+from .common.tracing import note_cache_hit
+
+logger = logging.getLogger(__name__)
+
+# Request fields that decide the response of a deterministic tool call.
+KEY_FIELDS = ("model", "messages", "tools", "tool_choice", "temperature")
+
+
+def cache_key(request: dict[str, Any]) -> str:
+    payload = {field: request.get(field) for field in KEY_FIELDS}
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+
+class MemoryCacheBackend:
+    """In-process LRU with TTL and entry-count eviction."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, payload = entry
+            if _expired(created_at, self.ttl_seconds):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key: str, payload: dict) -> int:
+        with self._lock:
+            self._entries[key] = (time.time(), payload)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while self.max_entries > 0 and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend:
+    """SQLite-backed cache under the workspace ``cache/`` directory.
+
+    Entries are evicted by TTL, by count and by total payload bytes, least
+    recently used first. The file is shared by every process using the same
+    workspace, so repeated batch runs reuse earlier responses.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 0,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, created_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL, size INTEGER NOT NULL, "
+                "payload TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at "
+                "ON responses (accessed_at)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT created_at, payload FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            created_at, payload = row
+            if _expired(created_at, self.ttl_seconds):
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        return json.loads(payload)
+
+    def put(self, key: str, payload: dict) -> int:
+        raw = json.dumps(payload, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, created_at, accessed_at, size, payload) VALUES (?, ?, ?, ?, ?)",
+                (key, now, now, len(raw.encode("utf-8")), raw),
+            )
+            return self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        evicted = 0
+        if self.ttl_seconds > 0:
+            evicted += conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            ).rowcount
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if (self.max_entries <= 0 or count <= self.max_entries) and (
+            self.max_bytes <= 0 or total <= self.max_bytes
+        ):
+            return evicted
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            if (self.max_entries <= 0 or count <= self.max_entries) and (
+                self.max_bytes <= 0 or total <= self.max_bytes
+            ):
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class LLMResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, workspace: str | Path | None = None):
+        if config.llm_cache_backend == "memory":
+            backend = MemoryCacheBackend(
+                max_entries=config.llm_cache_max_entries,
+                ttl_seconds=config.llm_cache_ttl_seconds,
+            )
+        elif config.llm_cache_backend == "disk":
+            path = Path(config.llm_cache_path)
+            if not path.is_absolute() and workspace is not None:
+                path = Path(workspace) / path
+            backend = DiskCacheBackend(
+                path,
+                max_entries=config.llm_cache_max_entries,
+                max_bytes=config.llm_cache_max_bytes,
+                ttl_seconds=config.llm_cache_ttl_seconds,
+            )
+        else:
+            raise ValueError(
+                f"Unsupported llm_cache.backend: {config.llm_cache_backend}"
+            )
+        return cls(backend)
+
+    def get(self, request: dict[str, Any]) -> ChatCompletion | None:
+        try:
+            payload = self.backend.get(cache_key(request))
+        except Exception as err:
+            logger.warning("LLM cache read failed: %s", err)
+            payload = None
+        self._count("hits" if payload is not None else "misses")
+        if payload is None:
+            return None
+        return ChatCompletion.model_validate(payload)
+
+    def put(self, request: dict[str, Any], response: Any) -> None:
+        # Only real, non-empty completions are worth replaying. A tool call
+        # whose arguments do not parse made the caller fall back to a default,
+        # which must not be frozen for the whole TTL.
+        if not getattr(response, "choices", None) or not hasattr(
+            response, "model_dump"
+        ):
+            return
+        if request.get("tools") and extract_tool_call_arguments(response) is None:
+            return
+        try:
+            evicted = self.backend.put(
+                cache_key(request), response.model_dump(mode="json")
+            )
+        except Exception as err:
+            logger.warning("LLM cache write failed: %s", err)
+            return
+        self._count("writes")
+        self._count("evictions", evicted)
+
+    async def aget(self, request: dict[str, Any]) -> ChatCompletion | None:
+        """:meth:`get` that keeps SQLite reads off the event loop."""
+        if isinstance(self.backend, MemoryCacheBackend):
+            return self.get(request)
+        return await asyncio.to_thread(self.get, request)
+
+    async def aput(self, request: dict[str, Any], response: Any) -> None:
+        if isinstance(self.backend, MemoryCacheBackend):
+            self.put(request, response)
+            return
+        await asyncio.to_thread(self.put, request, response)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return asdict(self.stats)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + amount)
+
+
+class CachingChatClient(ChatClientProxy):
+    """Serve repeated deterministic ``chat.completions.create`` calls from cache."""
+
+    def __init__(self, client: Any, cache: LLMResponseCache):
+        self.cache = cache
+        completions = client.chat.completions
+
+        def create(**kwargs: Any) -> Any:
+            if kwargs.get("stream"):
+                return completions.create(**kwargs)
+            cached = cache.get(kwargs)
+            if cached is not None:
+                note_cache_hit()
+                return cached
+            response = completions.create(**kwargs)
+            cache.put(kwargs, response)
+            return response
+
+        super().__init__(client, create)
+
+
+class AsyncCachingChatClient(ChatClientProxy):
+    """:class:`CachingChatClient` for ``AsyncOpenAI`` clients."""
+
+    def __init__(self, client: Any, cache: LLMResponseCache):
+        self.cache = cache
+        completions = client.chat.completions
+
+        async def create(**kwargs: Any) -> Any:
+            if kwargs.get("stream"):
+                return await completions.create(**kwargs)
+            cached = await cache.aget(kwargs)
+            if cached is not None:
+                note_cache_hit()
+                return cached
+            response = await completions.create(**kwargs)
+            await cache.aput(kwargs, response)
+            return response
+
+        super().__init__(client, create)
+
+
+def _expired(created_at: float, ttl_seconds: float) -> bool:
+    return ttl_seconds > 0 and time.time() - created_at > ttl_seconds
@@ -1,13 +1,18 @@
 from .chunking import build_memory_chunks
+from .embedding_cache import EmbeddingCache
 from .embeddings import EmbeddingService
 from .models import MemoryChunk, MemoryHit, MemorySession
-from .store import LanceMemoryStore
+from .session_catalog import SessionCatalog
+from .store import LanceMemoryStore, MemoryIndexSettings
 
 __all__ = [
+    "EmbeddingCache",
     "EmbeddingService",
     "LanceMemoryStore",
     "MemoryChunk",
     "MemoryHit",
     "MemorySession",
+    "SessionCatalog",
+    "MemoryIndexSettings",
     "build_memory_chunks",
 ]
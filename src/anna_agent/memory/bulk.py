@@ -0,0 +1,130 @@
+"""Index many case files into long-term memory in a few large writes."""
+
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+from ..case_data import load_case
+from .chunking import build_memory_chunks, session_summary_from_chunks
+from .models import MemoryChunk, MemorySession
+from .store import LanceMemoryStore
+
+# Chunks embedded and written per ``table.add``; bounds peak memory.
+DEFAULT_WRITE_ROWS = 50_000
+
+
+@dataclass
+class BulkIndexResult:
+    cases: int = 0
+    chunks: int = 0
+    added: int = 0
+    writes: int = 0
+
+
+def chunk_case_file(
+    path: str | Path, window_size: int, window_stride: int
+) -> tuple[list[MemoryChunk], MemorySession]:
+    """Load one case file and split it into memory chunks plus its session.
+
+    Runs in worker processes, so it only takes and returns picklable values.
+    """
+
+    case = load_case(Path(path))
+    chunks = build_memory_chunks(
+        seeker_id=case["seeker_id"],
+        case_id=case["id"],
+        portrait=case["portrait"],
+        report=case["report"],
+        conversations=case["conversation"],
+        window_size=window_size,
+        window_stride=window_stride,
+    )
+    session = MemorySession(
+        seeker_id=case["seeker_id"],
+        case_id=case["id"],
+        session_id="session-001",
+        session_index=1,
+        summary=session_summary_from_chunks(chunks),
+        source_file=str(path),
+        metadata=chunks[0].metadata if chunks else {},
+    )
+    return chunks, session
+
+
+def bulk_index(
+    store: LanceMemoryStore,
+    case_files: list[Path],
+    *,
+    window_size: int,
+    window_stride: int,
+    workers: int = 1,
+    write_rows: int = DEFAULT_WRITE_ROWS,
+    progress: Callable[[str], None] | None = None,
+) -> BulkIndexResult:
+    """Chunk ``case_files`` across ``workers`` processes and index them.
+
+    Chunks are deduplicated against the table and embedded in large
+    batches, then committed with one ``table.add`` per ``write_rows``
+    chunks instead of one per case, which keeps the table from fragmenting.
+    Cases are written as they finish chunking, so at most ``write_rows``
+    chunks plus a few in-flight cases are held in memory.
+    """
+
+    result = BulkIndexResult()
+    paths = [str(path) for path in case_files]
+    pending: list[MemoryChunk] = []
+    sessions = []
+    for chunks, session in _chunk_cases(paths, window_size, window_stride, workers):
+        result.cases += 1
+        result.chunks += len(chunks)
+        pending.extend(chunks)
+        sessions.append(session)
+        while len(pending) >= write_rows:
+            batch, pending = pending[:write_rows], pending[write_rows:]
+            result.added += _write(store, batch, result, progress)
+    if pending:
+        result.added += _write(store, pending, result, progress)
+    store.sessions.upsert_many(sessions)
+    return result
+
+
+def _chunk_cases(
+    paths: list[str], window_size: int, window_stride: int, workers: int
+) -> Iterator[tuple[list[MemoryChunk], MemorySession]]:
+    """Yield ``chunk_case_file`` results in completion order."""
+
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield chunk_case_file(path, window_size, window_stride)
+        return
+    queued = iter(paths)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # 只保留少量在途任务，写入较慢时结果不会全部堆积在内存中
+        running = {
+            executor.submit(chunk_case_file, path, window_size, window_stride)
+            for path in islice(queued, workers * 2)
+        }
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for path in islice(queued, len(done)):
+                running.add(
+                    executor.submit(chunk_case_file, path, window_size, window_stride)
+                )
+            for future in done:
+                yield future.result()
+
+
+def _write(
+    store: LanceMemoryStore,
+    chunks: list[MemoryChunk],
+    result: BulkIndexResult,
+    progress: Callable[[str], None] | None,
+) -> int:
+    if progress:
+        progress(f"embedding and writing {len(chunks)} chunks")
+    added = store.add_chunks(chunks)
+    if added:
+        result.writes += 1
+    return added
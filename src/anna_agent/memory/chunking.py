@@ -198,3 +198,11 @@ def build_memory_chunks(
     )
 
     return chunks
+
+
+def session_summary_from_chunks(chunks: list[MemoryChunk]) -> str:
+    """Return the text of the ``session_summary`` chunk, or ``""``."""
+    for chunk in chunks:
+        if chunk.memory_type == "session_summary":
+            return chunk.text
+    return ""
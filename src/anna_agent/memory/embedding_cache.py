@@ -0,0 +1,91 @@
+"""Persistent cache of embedding vectors keyed by model and text hash."""
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# SQLite limits the number of ``?`` parameters per statement.
+LOOKUP_BATCH = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite table of ``(model, text_hash) -> vector``.
+
+    Vectors are stored as raw float64 so a cached vector is bit-identical to
+    the one the provider returned. The file lives under the workspace
+    ``cache/`` directory and is shared by every case indexed there, so the
+    same text is only ever embedded once per model.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text_hash TEXT NOT NULL, "
+                "vector BLOB NOT NULL, PRIMARY KEY (model, text_hash))"
+            )
+
+    @classmethod
+    def from_config(cls, config, workspace: str | Path | None = None):
+        if not config.embedding_cache_enabled:
+            return None
+        path = Path(config.embedding_cache_path)
+        if not path.is_absolute() and workspace is not None:
+            path = Path(workspace) / path
+        return cls(path)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, model: str, texts: list[str]) -> dict[str, list[float]]:
+        """Return cached vectors for ``texts``, keyed by text."""
+
+        by_hash = {text_hash(text): text for text in texts}
+        hashes = list(by_hash)
+        found = {}
+        with self._lock, self._connect() as conn:
+            for start in range(0, len(hashes), LOOKUP_BATCH):
+                batch = hashes[start : start + LOOKUP_BATCH]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = conn.execute(
+                    "SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    (model, *batch),
+                )
+                for digest, blob in rows:
+                    found[by_hash[digest]] = array("d", blob).tolist()
+        return found
+
+    def put_many(self, model: str, vectors: dict[str, list[float]]) -> None:
+        rows = [
+            (model, text_hash(text), array("d", vector).tobytes())
+            for text, vector in vectors.items()
+        ]
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
@@ -1,63 +1,239 @@
 import hashlib
-import math
+import logging
 import re
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-from openai import OpenAI
+import numpy as np
+from openai import InternalServerError, OpenAI, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+# Errors worth another attempt; anything else (bad request, auth) fails fast.
+# Connection errors are not retried either: an unreachable endpoint stays
+# unreachable for the next few seconds and the hash fallback is immediate.
+RETRYABLE_ERRORS = (InternalServerError, RateLimitError)
+
+
+TOKEN_PATTERN = re.compile(r"[\w]+|[\u4e00-\u9fff]")
 
 
 class HashEmbeddingProvider:
+    """Offline embeddings: signed feature hashing of word and CJK tokens.
+
+    Each token's SHA-256 picks one dimension and a sign. A whole batch is
+    scatter-added into one NumPy matrix and L2-normalised row by row.
+    Accumulation stays in float64, so vectors are bit-identical to the
+    original per-text implementation and existing tables remain valid.
+    """
+
     def __init__(self, dimension: int):
         self.dimension = dimension
 
     def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        return [self._embed(text) for text in texts]
-
-    def _embed(self, text: str) -> list[float]:
-        vector = [0.0] * self.dimension
-        tokens = re.findall(r"[\w]+|[\u4e00-\u9fff]", text.lower())
-        for token in tokens or [text]:
-            digest = hashlib.sha256(token.encode("utf-8")).digest()
-            index = int.from_bytes(digest[:8], "big") % self.dimension
-            sign = 1.0 if digest[8] % 2 else -1.0
-            vector[index] += sign
-        norm = math.sqrt(sum(value * value for value in vector))
-        if norm == 0:
-            return vector
-        return [value / norm for value in vector]
+        if not texts:
+            return []
+        cells, signs = [], []
+        for row, text in enumerate(texts):
+            offset = row * self.dimension
+            for token in TOKEN_PATTERN.findall(text.lower()) or [text]:
+                index, sign = _token_slot(token, self.dimension)
+                cells.append(offset + index)
+                signs.append(sign)
+        matrix = np.bincount(
+            cells, weights=signs, minlength=len(texts) * self.dimension
+        ).reshape(len(texts), self.dimension)
+        norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))[:, None]
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix.tolist()
+
+
+@lru_cache(maxsize=65536)
+def _token_slot(token: str, dimension: int) -> tuple[int, float]:
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    index = int.from_bytes(digest[:8], "big") % dimension
+    return index, 1.0 if digest[8] % 2 else -1.0
 
 
 class OpenAIEmbeddingProvider:
-    def __init__(self, api_key: str, base_url: str, model_name: str):
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+    """Embed texts with an OpenAI-compatible ``/embeddings`` endpoint.
+
+    Inputs are split into requests of at most ``batch_size`` texts and about
+    ``max_batch_tokens`` tokens, up to ``concurrency`` requests run at once,
+    and transient errors are retried with exponential backoff. The client is
+    created once and reused for every call.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        model_name: str,
+        *,
+        batch_size: int = 64,
+        max_batch_tokens: int = 8000,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        client: OpenAI | None = None,
+    ):
+        # 重试由本类负责，客户端自身不再重试以免次数叠加
+        self.client = client or OpenAI(
+            api_key=api_key, base_url=base_url, max_retries=0
+        )
         self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    @classmethod
+    def from_config(cls, config) -> "OpenAIEmbeddingProvider":
+        return cls(
+            api_key=config.embedding_api_key or config.api_key,
+            base_url=config.embedding_base_url or config.base_url,
+            model_name=config.embedding_model_name,
+            batch_size=config.embedding_batch_size,
+            max_batch_tokens=config.embedding_max_batch_tokens,
+            concurrency=config.embedding_concurrency,
+            max_retries=config.embedding_max_retries,
+            retry_backoff=config.embedding_retry_backoff,
+        )
 
     def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        response = self.client.embeddings.create(model=self.model_name, input=texts)
-        return [item.embedding for item in response.data]
+        batches = list(self._batches(texts))
+        if len(batches) <= 1 or self.concurrency <= 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            workers = min(self.concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._embed_batch, batches))
+        return [vector for batch in results for vector in batch]
+
+    def _batches(self, texts: list[str]) -> Iterator[list[str]]:
+        batch, tokens = [], 0
+        for text in texts:
+            cost = estimate_tokens(text)
+            if batch and (
+                len(batch) >= self.batch_size or tokens + cost > self.max_batch_tokens
+            ):
+                yield batch
+                batch, tokens = [], 0
+            batch.append(text)
+            tokens += cost
+        if batch:
+            yield batch
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        attempt = 0
+        while True:
+            try:
+                response = self.client.embeddings.create(
+                    model=self.model_name, input=texts
+                )
+            except RETRYABLE_ERRORS as err:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_backoff * 2**attempt
+                attempt += 1
+                logger.info(
+                    "Embedding request failed (%s), retry %d/%d in %.1fs",
+                    err,
+                    attempt,
+                    self.max_retries,
+                    delay,
+                )
+                time.sleep(delay)
+                continue
+            data = sorted(response.data, key=lambda item: item.index)
+            if len(data) != len(texts):
+                raise ValueError(
+                    f"Embedding endpoint returned {len(data)} vectors "
+                    f"for {len(texts)} inputs"
+                )
+            return [item.embedding for item in data]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-bound token estimate without a tokenizer.
+
+    CJK characters take three UTF-8 bytes and usually one token each, while
+    English averages three to four bytes per token.
+    """
+
+    return len(text.encode("utf-8")) // 3 + 1
 
 
 class EmbeddingService:
-    def __init__(self, config):
+    """Cached remote embeddings with a hash fallback.
+
+    After a remote failure the endpoint is skipped for
+    ``embedding_failure_cooldown`` seconds instead of being retried on every
+    call.
+    """
+
+    def __init__(self, config, cache=None, clock=time.monotonic):
         self.config = config
+        self.cache = cache
         self.hash_provider = HashEmbeddingProvider(config.embedding_dimension)
+        self._provider = None
+        self._clock = clock
+        self._skip_remote_until = 0.0
 
     def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        if not texts:
-            return []
-        try:
-            api_key = self.config.embedding_api_key or self.config.api_key
-            base_url = self.config.embedding_base_url or self.config.base_url
-            provider = OpenAIEmbeddingProvider(
-                api_key=api_key,
-                base_url=base_url,
-                model_name=self.config.embedding_model_name,
-            )
-            vectors = provider.embed_texts(texts)
-            if vectors:
-                return vectors
-        except Exception:
-            pass
-        return self.hash_provider.embed_texts(texts)
+        return self.embed_texts_with_source(texts)[0]
 
     def embed_query(self, text: str) -> list[float]:
         return self.embed_texts([text])[0]
+
+    def embed_query_with_source(self, text: str) -> tuple[list[float], bool]:
+        """Like :meth:`embed_query`, plus whether the hash fallback was used."""
+        vectors, from_fallback = self.embed_texts_with_source([text])
+        return vectors[0], from_fallback
+
+    def embed_texts_with_source(
+        self, texts: list[str]
+    ) -> tuple[list[list[float]], bool]:
+        """Embed ``texts`` and report whether they are hash fallback vectors.
+
+        Fallback vectors must not be cached: once the endpoint recovers they
+        no longer match the vectors stored in the table.
+        """
+        if not texts:
+            return [], False
+        model = self.config.embedding_model_name
+        vectors = {} if self.cache is None else self.cache.get_many(model, texts)
+        missing = list(dict.fromkeys(text for text in texts if text not in vectors))
+        if missing:
+            fetched = self._embed_remote(missing)
+            if fetched is None:
+                # 不混用两种向量空间：任一文本失败则整批退回哈希向量
+                return self.hash_provider.embed_texts(texts), True
+            if self.cache is not None:
+                self.cache.put_many(model, fetched)
+            vectors.update(fetched)
+        return [vectors[text] for text in texts], False
+
+    def _embed_remote(self, texts: list[str]) -> dict[str, list[float]] | None:
+        if self._clock() < self._skip_remote_until:
+            return None
+        try:
+            if self._provider is None:
+                self._provider = OpenAIEmbeddingProvider.from_config(self.config)
+            vectors = self._provider.embed_texts(texts)
+        except Exception as err:
+            cooldown = self.config.embedding_failure_cooldown
+            self._skip_remote_until = self._clock() + cooldown
+            logger.warning(
+                "Embedding %d texts with %s failed, using hash embeddings "
+                "for the next %.0fs: %s",
+                len(texts),
+                self.config.embedding_model_name,
+                cooldown,
+                err,
+            )
+            return None
+        return dict(zip(texts, vectors))
@@ -0,0 +1,139 @@
+"""SQLite catalog of indexed memory sessions."""
+
+import json
+import logging
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from .models import MemorySession
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    "seeker_id",
+    "session_id",
+    "case_id",
+    "session_index",
+    "summary",
+    "source_file",
+    "created_at",
+    "metadata_json",
+)
+
+
+class SessionCatalog:
+    """Session metadata keyed by ``(seeker_id, session_id)``.
+
+    Each upsert is a single ``INSERT ... ON CONFLICT`` statement, so
+    concurrent indexers never lose each other's rows. Lookups by seeker and
+    paging use the ``(seeker_id, session_index)`` index.
+
+    A ``sessions.json`` written by older versions next to the catalog is
+    imported on first open and renamed to ``sessions.json.migrated``.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "seeker_id TEXT NOT NULL, session_id TEXT NOT NULL, "
+                "case_id TEXT NOT NULL, session_index INTEGER NOT NULL, "
+                "summary TEXT NOT NULL, source_file TEXT NOT NULL, "
+                "created_at TEXT NOT NULL, metadata_json TEXT NOT NULL, "
+                "PRIMARY KEY (seeker_id, session_id))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_seeker_order "
+                "ON sessions (seeker_id, session_index)"
+            )
+        self._migrate_json(self.path.parent / "sessions.json")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def upsert(self, session: MemorySession) -> None:
+        self.upsert_many([session])
+
+    def upsert_many(self, sessions: list[MemorySession]) -> None:
+        updates = ", ".join(f"{column} = excluded.{column}" for column in COLUMNS[2:])
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                f"INSERT INTO sessions ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)}) "
+                f"ON CONFLICT (seeker_id, session_id) DO UPDATE SET {updates}",
+                [_to_row(session) for session in sessions],
+            )
+
+    def for_seeker(self, seeker_id: str) -> list[MemorySession]:
+        return self.page(seeker_id=seeker_id, limit=-1)
+
+    def page(
+        self, *, seeker_id: str | None = None, offset: int = 0, limit: int = 50
+    ) -> list[MemorySession]:
+        """Sessions ordered by seeker and session index; ``limit=-1`` is all."""
+
+        where, params = ("WHERE seeker_id = ?", [seeker_id]) if seeker_id else ("", [])
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM sessions {where} "
+                "ORDER BY seeker_id, session_index, session_id LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return [_from_row(row) for row in rows]
+
+    def count(self, seeker_id: str | None = None) -> int:
+        where, params = ("WHERE seeker_id = ?", [seeker_id]) if seeker_id else ("", [])
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM sessions {where}", params
+            ).fetchone()[0]
+
+    def _migrate_json(self, legacy_path: Path) -> None:
+        if not legacy_path.exists():
+            return
+        try:
+            items = json.loads(legacy_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            logger.warning("Ignoring unreadable %s", legacy_path)
+            return
+        fields = set(MemorySession.__dataclass_fields__)
+        self.upsert_many(
+            [
+                MemorySession(**{k: v for k, v in item.items() if k in fields})
+                for item in items
+            ]
+        )
+        legacy_path.replace(legacy_path.with_name("sessions.json.migrated"))
+        logger.info("Migrated %d sessions from %s", len(items), legacy_path)
+
+
+def _to_row(session: MemorySession) -> tuple:
+    return (
+        session.seeker_id,
+        session.session_id,
+        session.case_id,
+        session.session_index,
+        session.summary,
+        session.source_file,
+        session.created_at,
+        json.dumps(session.metadata, ensure_ascii=False, sort_keys=True),
+    )
+
+
+def _from_row(row: tuple) -> MemorySession:
+    values = dict(zip(COLUMNS, row))
+    values["metadata"] = json.loads(values.pop("metadata_json") or "{}")
+    return MemorySession(**values)
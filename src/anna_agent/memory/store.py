@@ -1,28 +1,160 @@
 import json
-from dataclasses import asdict
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import timedelta
 from pathlib import Path
 
-from .chunking import build_memory_chunks
+from ..config import anna_engine_defaults
+from .chunking import build_memory_chunks, session_summary_from_chunks
+from .embedding_cache import EmbeddingCache
 from .embeddings import EmbeddingService
 from .models import MemoryChunk, MemoryHit, MemorySession
+from .session_catalog import SessionCatalog
+
+logger = logging.getLogger(__name__)
+
+# Hashes per ``source_hash IN (...)`` lookup when deduplicating new chunks.
+HASH_LOOKUP_BATCH = 512
+
+# Columns filtered on by dedup and search; each gets a BTree scalar index.
+SCALAR_INDEX_COLUMNS = ("source_hash", "seeker_id")
+
+VECTOR_INDEX_TYPES = ("IVF_PQ", "IVF_HNSW_SQ", "IVF_HNSW_PQ", "none")
+
+SEARCH_MODES = ("hybrid", "vector")
+
+# Chinese text has no spaces, so the full-text index uses 2-3 character
+# n-grams instead of word tokens; this also matches names and drug names.
+FTS_INDEX_OPTIONS = {
+    "base_tokenizer": "ngram",
+    "ngram_min_length": 2,
+    "ngram_max_length": 3,
+}
+
+# Hybrid search fuses this many times ``top_k`` candidates from each ranking.
+HYBRID_CANDIDATE_FACTOR = 2
+
+
+@dataclass
+class MemoryIndexSettings:
+    """Index and search tuning for :class:`LanceMemoryStore`.
+
+    The ANN index is created once the table holds ``min_rows`` rows; below
+    that brute-force search is fast enough. Rows added later are folded into
+    the indexes by ``optimize()`` once ``optimize_rows`` of them are missing
+    from any one of them, the scalar and full-text indexes included, so this
+    also happens before the ANN index exists. Zero for
+    ``num_partitions``/``num_sub_vectors`` lets LanceDB pick.
+
+    ``search_mode="hybrid"`` fuses BM25 full-text and vector rankings with
+    reciprocal-rank fusion (constant ``rrf_k``); ``"vector"`` is vector-only.
+    """
+
+    index_type: str = anna_engine_defaults.memory_index_type
+    min_rows: int = anna_engine_defaults.memory_index_min_rows
+    optimize_rows: int = anna_engine_defaults.memory_index_optimize_rows
+    num_partitions: int = anna_engine_defaults.memory_index_num_partitions
+    num_sub_vectors: int = anna_engine_defaults.memory_index_num_sub_vectors
+    hnsw_m: int = anna_engine_defaults.memory_index_hnsw_m
+    hnsw_ef_construction: int = anna_engine_defaults.memory_index_hnsw_ef_construction
+    nprobes: int = anna_engine_defaults.memory_search_nprobes
+    refine_factor: int = anna_engine_defaults.memory_search_refine_factor
+    search_mode: str = anna_engine_defaults.memory_search_mode
+    rrf_k: int = anna_engine_defaults.memory_search_rrf_k
+
+    def __post_init__(self):
+        if self.index_type not in VECTOR_INDEX_TYPES:
+            raise ValueError(
+                f"Unsupported memory.index_type: {self.index_type} "
+                f"(expected one of {', '.join(VECTOR_INDEX_TYPES)})"
+            )
+        _check_search_mode(self.search_mode)
+
+    @classmethod
+    def from_config(cls, config) -> "MemoryIndexSettings":
+        return cls(
+            index_type=config.memory_index_type,
+            min_rows=config.memory_index_min_rows,
+            optimize_rows=config.memory_index_optimize_rows,
+            num_partitions=config.memory_index_num_partitions,
+            num_sub_vectors=config.memory_index_num_sub_vectors,
+            hnsw_m=config.memory_index_hnsw_m,
+            hnsw_ef_construction=config.memory_index_hnsw_ef_construction,
+            nprobes=config.memory_search_nprobes,
+            refine_factor=config.memory_search_refine_factor,
+            search_mode=config.memory_search_mode,
+            rrf_k=config.memory_search_rrf_k,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.index_type != "none" and self.min_rows > 0
 
 
 class LanceMemoryStore:
-    def __init__(self, db_path: str | Path, table_name: str, embedding_service):
+    """LanceDB-backed long-term memory for one table.
+
+    The connection and table handle are opened lazily and kept for the life of
+    the store, so one instance can serve many searches (``anna serve`` keeps
+    one per workspace); opening and creating the table is guarded by a lock
+    so concurrent requests share a single handle. With
+    ``read_consistency_interval`` set, the cached handle checks for a newer
+    table version at most that often (in seconds) and reloads only when
+    another writer committed one; ``None`` never looks for outside writes.
+
+    Scalar indexes on ``source_hash`` and ``seeker_id`` and a full-text index
+    on ``text`` are kept on the table, and an ANN index is built as described
+    by :class:`MemoryIndexSettings`.
+
+    Query vectors and hit lists are kept in LRUs of ``query_cache_size``
+    entries. Writing chunks for a seeker drops that seeker's cached hits; a
+    table version committed by another writer drops all of them.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        table_name: str,
+        embedding_service,
+        read_consistency_interval: float | None = None,
+        index_settings: MemoryIndexSettings | None = None,
+        query_cache_size: int = anna_engine_defaults.memory_query_cache_size,
+    ):
         self.db_path = Path(db_path)
         self.table_name = table_name
         self.embedding_service = embedding_service
+        self.read_consistency_interval = read_consistency_interval
+        self.index_settings = index_settings or MemoryIndexSettings()
         self._db = None
+        self._table = None
+        self._sessions = None
+        self._indexes_ready = False
+        self._lock = threading.RLock()
+        self._query_vectors = _LRUCache(query_cache_size)
+        self._hits = _LRUCache(query_cache_size)
+        self._hits_version = None
 
     @classmethod
-    def from_config(cls, config, workspace: str | Path | None = None):
+    def from_config(
+        cls,
+        config,
+        workspace: str | Path | None = None,
+        read_consistency_interval: float | None = None,
+    ):
         db_path = Path(config.memory_db_path)
         if not db_path.is_absolute() and workspace is not None:
             db_path = Path(workspace) / db_path
         return cls(
             db_path=db_path,
             table_name=config.memory_table_name,
-            embedding_service=EmbeddingService(config),
+            embedding_service=EmbeddingService(
+                config, cache=EmbeddingCache.from_config(config, workspace)
+            ),
+            read_consistency_interval=read_consistency_interval,
+            index_settings=MemoryIndexSettings.from_config(config),
+            query_cache_size=config.memory_query_cache_size,
         )
 
     def index_case(
@@ -56,66 +188,159 @@ class LanceMemoryStore:
                 case_id=case_id,
                 session_id=session_id,
                 session_index=session_index,
-                summary=_session_summary_from_chunks(chunks),
+                summary=session_summary_from_chunks(chunks),
                 metadata=chunks[0].metadata if chunks else {},
             )
         )
         return count
 
     def upsert_session(self, session: MemorySession) -> None:
-        path = self._sessions_path()
-        path.parent.mkdir(parents=True, exist_ok=True)
-        sessions = []
-        if path.exists():
-            try:
-                sessions = json.loads(path.read_text(encoding="utf-8"))
-            except json.JSONDecodeError:
-                sessions = []
-        session_key = (session.seeker_id, session.session_id)
-        sessions = [
-            item
-            for item in sessions
-            if (item.get("seeker_id"), item.get("session_id")) != session_key
-        ]
-        sessions.append(asdict(session))
-        sessions.sort(
-            key=lambda item: (item.get("seeker_id", ""), item.get("session_index", 0))
-        )
-        path.write_text(
-            json.dumps(sessions, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
+        self.sessions.upsert(session)
+
+    @property
+    def sessions(self) -> SessionCatalog:
+        """Catalog of indexed sessions, stored next to the LanceDB directory."""
+
+        with self._lock:
+            if self._sessions is None:
+                self._sessions = SessionCatalog(self.db_path.parent / "sessions.sqlite")
+            return self._sessions
 
     def add_chunks(self, chunks: list[MemoryChunk]) -> int:
-        records = self._records_from_chunks(chunks)
-        if not records:
+        if not chunks:
             return 0
-        existing_hashes = self._existing_hashes()
-        records = [
-            record for record in records if record["source_hash"] not in existing_hashes
-        ]
+        existing_hashes = self._existing_hashes([chunk.source_hash for chunk in chunks])
+        fresh = []
+        for chunk in chunks:
+            if chunk.source_hash not in existing_hashes:
+                existing_hashes.add(chunk.source_hash)
+                fresh.append(chunk)
+        # 先按 source_hash 去重再向量化，已入库的片段不再调用 embedding
+        records = self._records_from_chunks(fresh)
         if not records:
             return 0
-        table = self._open_table()
-        if table is None:
-            self._create_table(records)
-        else:
-            table.add(records)
+        with self._lock:
+            table = self._open_table()
+            if table is None:
+                table = self._create_table(records)
+                self._ensure_indexes(table)
+            else:
+                table.add(records)
+            self._maybe_index(table)
+            self._forget_hits({record["seeker_id"] for record in records}, table)
         return len(records)
 
+    def optimize(self) -> dict:
+        """Build missing indexes, fold new rows into them and compact files."""
+
+        with self._lock:
+            table = self._open_table()
+            if table is None:
+                return {"rows": 0, "vector_index": None, "indices": []}
+            self._ensure_indexes(table)
+            rows = table.count_rows()
+            if (
+                self.index_settings.enabled
+                and rows >= self.index_settings.min_rows
+                and self._vector_index_stats(table) is None
+            ):
+                self._build_vector_index(table)
+            table.optimize()
+            stats = self._vector_index_stats(table)
+            return {
+                "rows": rows,
+                "vector_index": stats.index_type if stats else None,
+                "unindexed_rows": stats.num_unindexed_rows if stats else rows,
+                "indices": sorted(index.name for index in table.list_indices()),
+            }
+
     def search(
         self,
         query_text: str,
         *,
         seeker_id: str,
         top_k: int = 8,
+        mode: str | None = None,
     ) -> list[MemoryHit]:
+        """Return the ``top_k`` chunks of ``seeker_id`` closest to the query.
+
+        In ``"vector"`` mode ``score`` is the vector distance (lower is
+        closer); in ``"hybrid"`` mode it is the fused RRF score (higher is
+        better).
+        """
+
+        mode = mode or self.index_settings.search_mode
+        _check_search_mode(mode)
         table = self._open_table()
         if table is None:
             return []
-        vector = self.embedding_service.embed_query(query_text)
+        key = (seeker_id, query_text, top_k, mode)
+        with self._lock:
+            if self._hits_version != table.version:
+                # 其他进程写入了新版本，无法得知涉及哪些 seeker，全部作废
+                self._hits.clear()
+                self._hits_version = table.version
+            version = self._hits_version
+            cached = self._hits.get(key)
+        if cached is not None:
+            return list(cached)
         where = f"seeker_id = '{_escape_sql(seeker_id)}'"
-        rows = table.search(vector).where(where).limit(top_k).to_list()
-        return [_row_to_hit(row) for row in rows]
+        if mode == "vector":
+            vector_rows, cacheable = self._vector_rows(table, query_text, where, top_k)
+            hits = [_row_to_hit(row) for row in vector_rows]
+        else:
+            limit = top_k * HYBRID_CANDIDATE_FACTOR
+            vector_rows, cacheable = self._vector_rows(table, query_text, where, limit)
+            text_rows = self._text_rows(table, query_text, where, limit)
+            hits = _reciprocal_rank_fusion(
+                [vector_rows, text_rows], top_k, self.index_settings.rrf_k
+            )
+        with self._lock:
+            # 检索期间若有写入，结果可能已过时；哈希回退向量的结果同样不缓存
+            if cacheable and self._hits_version == version:
+                self._hits.put(key, hits)
+        return list(hits)
+
+    def _forget_hits(self, seeker_ids: set[str], table) -> None:
+        with self._lock:
+            self._hits.discard(lambda key: key[0] in seeker_ids)
+            self._hits_version = table.version
+
+    def _vector_rows(self, table, query_text: str, where: str, limit: int):
+        """Return the nearest rows and whether the query vector is cacheable."""
+        with self._lock:
+            vector = self._query_vectors.get(query_text)
+        cacheable = True
+        if vector is None:
+            vector, cacheable = self._embed_query(query_text)
+            if cacheable:
+                with self._lock:
+                    self._query_vectors.put(query_text, vector)
+        query = table.search(vector).where(where).limit(limit)
+        # 两个参数只在存在 ANN 索引时生效，暴力检索会忽略它们
+        settings = self.index_settings
+        if settings.nprobes > 0:
+            query = query.nprobes(settings.nprobes)
+        if settings.refine_factor > 0:
+            query = query.refine_factor(settings.refine_factor)
+        return query.to_list(), cacheable
+
+    def _embed_query(self, query_text: str) -> tuple[list[float], bool]:
+        embed = getattr(self.embedding_service, "embed_query_with_source", None)
+        if embed is None:
+            return self.embedding_service.embed_query(query_text), True
+        vector, from_fallback = embed(query_text)
+        return vector, not from_fallback
+
+    def _text_rows(self, table, query_text: str, where: str, limit: int):
+        # 旧表可能还没有全文索引，先补建
+        self._ensure_indexes(table)
+        try:
+            query = table.search(query_text, query_type="fts")
+            return query.where(where).limit(limit).to_list()
+        except Exception as err:
+            logger.warning("Full-text memory search failed, using vectors: %s", err)
+            return []
 
     def format_hits(self, hits: list[MemoryHit]) -> str:
         if not hits:
@@ -145,38 +370,181 @@ class LanceMemoryStore:
         return records
 
     def _connect(self):
-        if self._db is None:
-            import lancedb
+        with self._lock:
+            if self._db is None:
+                import lancedb
 
-            self.db_path.mkdir(parents=True, exist_ok=True)
-            self._db = lancedb.connect(str(self.db_path))
-        return self._db
-
-    def _sessions_path(self) -> Path:
-        return self.db_path.parent / "sessions.json"
+                self.db_path.mkdir(parents=True, exist_ok=True)
+                options = {}
+                if self.read_consistency_interval is not None:
+                    options["read_consistency_interval"] = timedelta(
+                        seconds=self.read_consistency_interval
+                    )
+                self._db = lancedb.connect(str(self.db_path), **options)
+            return self._db
 
     def _open_table(self):
-        db = self._connect()
-        if self.table_name not in db.table_names():
-            return None
-        return db.open_table(self.table_name)
+        with self._lock:
+            if self._table is None:
+                db = self._connect()
+                if self.table_name not in db.table_names():
+                    return None
+                self._table = db.open_table(self.table_name)
+            return self._table
 
     def _create_table(self, records: list[dict]):
-        db = self._connect()
-        return db.create_table(self.table_name, data=records)
+        with self._lock:
+            db = self._connect()
+            try:
+                self._table = db.create_table(self.table_name, data=records)
+            except ValueError:
+                # 其他进程或并发的批处理任务已抢先建表，改为追加写入
+                if self.table_name not in db.table_names():
+                    raise
+                self._table = db.open_table(self.table_name)
+                self._table.add(records)
+            return self._table
 
-    def _existing_hashes(self) -> set[str]:
+    def _existing_hashes(self, hashes: list[str]) -> set[str]:
+        """Return which of ``hashes`` are already stored.
+
+        Only the ``source_hash`` column of matching rows is read, and the
+        filter is served by a scalar index, so the cost does not grow with
+        the size of the table.
+        """
         table = self._open_table()
-        if table is None:
-            return set()
-        try:
-            if hasattr(table, "to_list"):
-                data = table.to_list()
-            else:
-                data = table.to_arrow().to_pylist()
-        except Exception:
+        if table is None or not hashes:
             return set()
-        return {row.get("source_hash", "") for row in data}
+        self._ensure_indexes(table)
+        unique = sorted(set(hashes))
+        found = set()
+        for start in range(0, len(unique), HASH_LOOKUP_BATCH):
+            batch = unique[start : start + HASH_LOOKUP_BATCH]
+            values = ", ".join(f"'{_escape_sql(value)}'" for value in batch)
+            rows = (
+                table.search()
+                .where(f"source_hash IN ({values})")
+                .select(["source_hash"])
+                .limit(None)
+                .to_arrow()
+            )
+            found.update(rows.column("source_hash").to_pylist())
+        return found
+
+    def _ensure_indexes(self, table) -> None:
+        with self._lock:
+            if self._indexes_ready:
+                return
+            indexed = {
+                column for index in table.list_indices() for column in index.columns
+            }
+            for column in SCALAR_INDEX_COLUMNS:
+                if column not in indexed:
+                    table.create_scalar_index(column)
+            if "text" not in indexed:
+                table.create_fts_index("text", **FTS_INDEX_OPTIONS)
+            self._indexes_ready = True
+
+    def _maybe_index(self, table) -> None:
+        settings = self.index_settings
+        if (
+            settings.enabled
+            and self._vector_index_stats(table) is None
+            and table.count_rows() >= settings.min_rows
+        ):
+            self._build_vector_index(table)
+        if 0 < settings.optimize_rows <= self._unindexed_rows(table):
+            table.optimize()
+
+    def _unindexed_rows(self, table) -> int:
+        """Most rows missing from any one index, scalar and full-text included."""
+
+        counts = [0]
+        for index in table.list_indices():
+            stats = table.index_stats(index.name)
+            if stats is not None:
+                counts.append(stats.num_unindexed_rows)
+        return max(counts)
+
+    def _vector_index_stats(self, table):
+        for index in table.list_indices():
+            if list(index.columns) == ["vector"]:
+                return table.index_stats(index.name)
+        return None
+
+    def _build_vector_index(self, table) -> None:
+        settings = self.index_settings
+        options = {"index_type": settings.index_type, "replace": True}
+        if settings.num_partitions > 0:
+            options["num_partitions"] = settings.num_partitions
+        if settings.num_sub_vectors > 0 and settings.index_type.endswith("PQ"):
+            options["num_sub_vectors"] = settings.num_sub_vectors
+        if settings.index_type.startswith("IVF_HNSW"):
+            options["m"] = settings.hnsw_m
+            options["ef_construction"] = settings.hnsw_ef_construction
+        table.create_index(**options)
+
+
+class _LRUCache:
+    """Minimal LRU mapping; callers hold the store lock."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, predicate) -> None:
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _check_search_mode(mode: str) -> None:
+    if mode not in SEARCH_MODES:
+        raise ValueError(
+            f"Unsupported memory search mode: {mode} "
+            f"(expected one of {', '.join(SEARCH_MODES)})"
+        )
+
+
+def _reciprocal_rank_fusion(
+    rankings: list[list[dict]], top_k: int, k: int
+) -> list[MemoryHit]:
+    """Merge ranked row lists by summing ``1 / (k + rank)`` per chunk id."""
+
+    scores: dict[str, float] = {}
+    rows: dict[str, dict] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            chunk_id = row.get("id", "")
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
+            rows.setdefault(chunk_id, row)
+    # sorted 是稳定排序，同分时保留向量检索的先后顺序
+    ranked = sorted(scores, key=lambda chunk_id: scores[chunk_id], reverse=True)
+    hits = []
+    for chunk_id in ranked[:top_k]:
+        hit = _row_to_hit(rows[chunk_id])
+        hit.score = scores[chunk_id]
+        hits.append(hit)
+    return hits
 
 
 def _escape_sql(value: str) -> str:
@@ -204,10 +572,3 @@ def _row_to_hit(row: dict) -> MemoryHit:
         score=float(row.get("_distance", 0.0)),
         metadata=metadata,
     )
-
-
-def _session_summary_from_chunks(chunks: list[MemoryChunk]) -> str:
-    for chunk in chunks:
-        if chunk.memory_type == "session_summary":
-            return chunk.text
-    return ""
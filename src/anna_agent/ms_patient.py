@@ -1,23 +1,41 @@
+import asyncio
 import logging
 import random
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from .anna_agent_template import prompt_template
-from .backbone import get_openai_client
+from .backbone import get_async_openai_client, get_openai_client, start_trace
+from .common.fallbacks import fallbacks
 from .common.registry import registry
-from .complaint_chain import gen_complaint_chain
-from .complaint_elicitor import switch_complaint, transform_chain
-from .emotion_modulator import emotion_modulation
-from .event_trigger import event_trigger, situationalising_events
-from .fill_scales import fill_scales, fill_scales_previous
+from .common.stage_graph import Stage, arun_stage_graph, run_stage_graph
+from .common.streaming import aiter_text_deltas, iter_text_deltas
+from .common.tracing import activate, ain_stage, in_stage, stage, submit
+from .complaint_chain import agen_complaint_chain, gen_complaint_chain
+from .complaint_elicitor import aswitch_complaint, switch_complaint, transform_chain
+from .emotion_modulator import aemotion_modulation, emotion_modulation
+from .event_trigger import (
+    asituationalising_events,
+    event_trigger,
+    situationalising_events,
+)
+from .fill_scales import (
+    afill_scales,
+    afill_scales_previous,
+    fill_scales,
+    fill_scales_previous,
+)
 from .memory import LanceMemoryStore
-from .querier import is_need, query
-from .short_term_memory import summarize_scale_changes
-from .style_analyzer import analyze_style
+from .querier import ais_need, aquery, is_need, query
+from .short_term_memory import asummarize_scale_changes, summarize_scale_changes
+from .style_analyzer import aanalyze_style, analyze_style
 
 logger = logging.getLogger(__name__)
 
+# 模型没有返回任何内容时使用的兜底回复
+EMPTY_REPLY_FALLBACK = "抱歉，我刚才走神了...最近工作太忙，脑子有点乱。你刚才说什么？"
+
 
 class MsPatient:
     def __init__(
@@ -26,9 +44,29 @@ class MsPatient:
         report: dict,
         previous_conversations: list,
         progress_callback: Callable[[str, str], None] | None = None,
+        max_workers: int | None = None,
     ):
+        statement = self._setup(
+            portrait, report, previous_conversations, progress_callback
+        )
+        trace = start_trace("init")
+        with activate(trace):
+            results = run_stage_graph(
+                self._init_stages(statement),
+                max_workers=self._init_workers(max_workers),
+                on_start=self._on_stage_start,
+                on_finish=self._on_stage_finish,
+            )
+        self.init_trace = trace.finish() if trace else None
+        self._apply_init_results(results, statement)
+        self.client = get_openai_client(hedged=True)
+        self._report_progress("ready", "Seeker simulation is ready")
+
+    def _setup(self, portrait, report, previous_conversations, progress_callback):
         self._progress_callback = progress_callback
         self.last_turn_context: dict = {}
+        self.init_trace: dict | None = None
+        self.memory_store: LanceMemoryStore | None = None
         self.configuration = {}
         self.portrait = portrait  # age, gender, occupation, maritial_status, symptom
         self.configuration["gender"] = self.portrait["gender"]
@@ -39,32 +77,175 @@ class MsPatient:
         self.previous_conversations = previous_conversations
         self.case_id = self.portrait.get("_case_id", "default-case")
         self.seeker_id = self.portrait.get("_seeker_id", self.case_id)
-        self._report_progress("memory", "Indexing long-term memory")
-        self._setup_long_term_memory()
-        # 填写之前疗程的量表
-        self._report_progress("previous scales", "Estimating baseline BDI/GHQ/SASS")
-        self.p_bdi, self.p_ghq, self.p_sass = fill_scales_previous(
-            self.portrait, self.report
-        )
         self.conversation = []  # Conversation存储咨访记录
         self.messages = []  # Messages存储LLM的消息列表
-        # 生成主诉认知变化链
-        self._report_progress("complaint chain", "Generating complaint trajectory")
-        self.complaint_chain = gen_complaint_chain(self.portrait)
-        # 生成近期事件
-        self._report_progress("trigger", "Sampling recent triggering event")
-        self.event = event_trigger(self.portrait)
-        # 总结短期记忆-事件
-        self._report_progress("situation", "Building current life situation")
-        self.situation = situationalising_events(self.portrait)
+        return self._sample_statements()
+
+    def _apply_init_results(self, results: dict, statement: list[str]) -> None:
+        self.p_bdi, self.p_ghq, self.p_sass = results["previous scales"]
+        self.complaint_chain = results["complaint chain"]
+        self.event = results["trigger"]
+        self.situation = results["situation"]
+        self.style = results["style"]
+        self.bdi, self.ghq, self.sass = results["current scales"]
+        self.status = results["status"]
         self.configuration["situation"] = self.situation
-        # 分析说话风格
-        self._report_progress("style", "Analyzing seeker speaking style")
-        self.style = analyze_style(self.portrait, self.previous_conversations)
         self.configuration["style"] = self.style
-        self.configuration[
-            "status"
-        ] = ""  # 先置状态为空，后续会根据量表分析结果进行更新
+        self.configuration["status"] = self.status
+        self.configuration["statement"] = statement
+        # 选取对话样例
+        self.system = prompt_template.format(**self.configuration)
+        self.chain_index = 1
+
+    def _on_stage_start(self, stage: Stage) -> None:
+        self._report_progress(stage.name, stage.detail)
+
+    def _on_stage_finish(self, stage: Stage, elapsed: float) -> None:
+        self._report_progress(stage.name, f"{stage.detail} (done in {elapsed:.1f}s)")
+
+    def _init_stages(self, statement: list[str]) -> list[Stage]:
+        """Describe initialization as a DAG of LLM-backed stages.
+
+        Baseline scales, complaint chain, situation and style only depend on the
+        case itself; the current scales need the rendered prompt and the status
+        summary needs both scale sets.
+        """
+
+        return [
+            Stage(
+                "memory",
+                lambda _: self._setup_long_term_memory(),
+                detail="Indexing long-term memory",
+            ),
+            # 填写之前疗程的量表
+            Stage(
+                "previous scales",
+                lambda _: fill_scales_previous(self.portrait, self.report),
+                detail="Estimating baseline BDI/GHQ/SASS",
+            ),
+            # 生成主诉认知变化链
+            Stage(
+                "complaint chain",
+                lambda _: gen_complaint_chain(self.portrait),
+                detail="Generating complaint trajectory",
+            ),
+            # 生成近期事件
+            Stage(
+                "trigger",
+                lambda _: event_trigger(self.portrait),
+                detail="Sampling recent triggering event",
+            ),
+            # 总结短期记忆-事件
+            Stage(
+                "situation",
+                lambda _: situationalising_events(self.portrait),
+                detail="Building current life situation",
+            ),
+            # 分析说话风格
+            Stage(
+                "style",
+                lambda _: analyze_style(self.portrait, self.previous_conversations),
+                detail="Analyzing seeker speaking style",
+            ),
+            # 填写当前量表
+            Stage(
+                "current scales",
+                lambda inputs: self._fill_current_scales(inputs, statement),
+                requires=("situation", "style"),
+                detail="Estimating current BDI/GHQ/SASS",
+            ),
+            # 分析近期状态
+            Stage(
+                "status",
+                self._summarize_status,
+                requires=("previous scales", "current scales"),
+                detail="Summarizing scale changes",
+            ),
+        ]
+
+    def _ainit_stages(self, statement: list[str]) -> list[Stage]:
+        """Awaitable counterpart of :meth:`_init_stages` with the same DAG."""
+
+        return [
+            Stage(
+                "memory",
+                # LanceDB 索引是阻塞调用，放到线程中执行
+                lambda _: asyncio.to_thread(self._setup_long_term_memory),
+                detail="Indexing long-term memory",
+            ),
+            Stage(
+                "previous scales",
+                lambda _: afill_scales_previous(self.portrait, self.report),
+                detail="Estimating baseline BDI/GHQ/SASS",
+            ),
+            Stage(
+                "complaint chain",
+                lambda _: agen_complaint_chain(self.portrait),
+                detail="Generating complaint trajectory",
+            ),
+            Stage(
+                "trigger",
+                lambda _: self._aevent_trigger(),
+                detail="Sampling recent triggering event",
+            ),
+            Stage(
+                "situation",
+                lambda _: asituationalising_events(self.portrait),
+                detail="Building current life situation",
+            ),
+            Stage(
+                "style",
+                lambda _: aanalyze_style(self.portrait, self.previous_conversations),
+                detail="Analyzing seeker speaking style",
+            ),
+            Stage(
+                "current scales",
+                lambda inputs: afill_scales(self._scale_prompt(inputs, statement)),
+                requires=("situation", "style"),
+                detail="Estimating current BDI/GHQ/SASS",
+            ),
+            Stage(
+                "status",
+                lambda inputs: asummarize_scale_changes(self._scale_answers(inputs)),
+                requires=("previous scales", "current scales"),
+                detail="Summarizing scale changes",
+            ),
+        ]
+
+    async def _aevent_trigger(self) -> str:
+        return event_trigger(self.portrait)
+
+    def _fill_current_scales(self, inputs: dict, statement: list[str]) -> tuple:
+        return fill_scales(self._scale_prompt(inputs, statement))
+
+    def _scale_prompt(self, inputs: dict, statement: list[str]) -> str:
+        configuration = {
+            **self.configuration,
+            "situation": inputs["situation"],
+            "style": inputs["style"],
+            # 先置状态为空，后续会根据量表分析结果进行更新
+            "status": "",
+            "statement": statement,
+        }
+        return prompt_template.format(**configuration)
+
+    def _summarize_status(self, inputs: dict) -> str:
+        return summarize_scale_changes(self._scale_answers(inputs))
+
+    @staticmethod
+    def _scale_answers(inputs: dict) -> dict:
+        p_bdi, p_ghq, p_sass = inputs["previous scales"]
+        bdi, ghq, sass = inputs["current scales"]
+        return {
+            "p_bdi": p_bdi,
+            "p_ghq": p_ghq,
+            "p_sass": p_sass,
+            "bdi": bdi,
+            "ghq": ghq,
+            "sass": sass,
+        }
+
+    def _sample_statements(self) -> list[str]:
         seeker_utterances = [
             utterance["content"]
             for utterance in self.previous_conversations
@@ -73,149 +254,384 @@ class MsPatient:
         # 兼容空的历史会话，避免 random.choices 在空列表上触发"list index out of range"
         if seeker_utterances:
             k = 3 if len(seeker_utterances) >= 3 else len(seeker_utterances)
-            self.configuration["statement"] = random.choices(seeker_utterances, k=k)
-        else:
-            # 提供一个合理的默认主述，保证下游 Prompt 渲染不失败
-            self.configuration["statement"] = ["最近工作压力有点大，睡眠也不太好。"]
-        # 填写当前量表
-        self._report_progress("current scales", "Estimating current BDI/GHQ/SASS")
-        self.bdi, self.ghq, self.sass = fill_scales(
-            prompt_template.format(**self.configuration)
-        )
-        scales = {
-            "p_bdi": self.p_bdi,
-            "p_ghq": self.p_ghq,
-            "p_sass": self.p_sass,
-            "bdi": self.bdi,
-            "ghq": self.ghq,
-            "sass": self.sass,
-        }
-        # 分析近期状态
-        self._report_progress("status", "Summarizing scale changes")
-        self.status = summarize_scale_changes(scales)
-        self.configuration["status"] = self.status
-        # 选取对话样例
-        self.system = prompt_template.format(**self.configuration)
-        self.chain_index = 1
-        self.client = get_openai_client()
-        self._report_progress("ready", "Seeker simulation is ready")
+            return random.choices(seeker_utterances, k=k)
+        # 提供一个合理的默认主述，保证下游 Prompt 渲染不失败
+        return ["最近工作压力有点大，睡眠也不太好。"]
+
+    @staticmethod
+    def _init_workers(max_workers: int | None) -> int:
+        if max_workers is not None:
+            return max_workers
+        cfg = registry.get("anna_engine_config")
+        return cfg.concurrency_init_workers if cfg else 1
 
     def _report_progress(self, stage: str, detail: str) -> None:
         if self._progress_callback:
             self._progress_callback(stage, detail)
 
     def _setup_long_term_memory(self):
-        cfg = registry.get("anna_engine_config")
-        if not cfg or not cfg.memory_enabled:
-            return
-        try:
-            workspace = registry.get("anna_agent_workspace", Path.cwd())
-            store = LanceMemoryStore.from_config(cfg, workspace=workspace)
-            if cfg.memory_auto_index:
-                store.index_case(
-                    seeker_id=self.seeker_id,
-                    case_id=self.case_id,
-                    portrait=self.portrait,
-                    report=self.report,
-                    conversations=self.previous_conversations,
-                    window_size=cfg.memory_window_size,
-                    window_stride=cfg.memory_window_stride,
-                )
-            registry.register("long_term_memory_store", store)
-            registry.register("long_term_memory_seeker_id", self.seeker_id)
-        except Exception as err:
-            logger.warning("Long-term memory setup failed: %s", err)
+        self.memory_store = open_long_term_memory(
+            self.seeker_id,
+            self.case_id,
+            self.portrait,
+            self.report,
+            self.previous_conversations,
+        )
 
     def chat(self, message):
         # 更新消息列表
-        self.conversation.append({"role": "Counselor", "content": message})
-        self.messages.append({"role": "user", "content": message})
+        self._record_counselor_message(message)
+        trace = start_trace("turn")
+        with activate(trace):
+            try:
+                messages = self._turn_messages(message)
+                with stage("reply"):
+                    response = self.client.chat.completions.create(
+                        model=registry.get("anna_engine_config").model_name,
+                        messages=messages,
+                    )
+                    reply = self._record_seeker_reply(response)
+            except Exception as err:
+                logger.exception("Chat generation failed: %s", err)
+                fallbacks.record("seeker_reply")
+                reply = ""
+        self._finish_turn_trace(trace)
+        return reply
+
+    def chat_stream(self, message):
+        """Like :meth:`chat`, but yield reply fragments as they arrive.
+
+        The turn is recorded once the stream ends; if it breaks midway or the
+        caller closes it early, the part the counselor has already seen is
+        kept. A turn that yielded nothing is withdrawn from the history.
+        """
+
+        self._record_counselor_message(message)
+        trace = start_trace("turn")
+        parts = []
         try:
-            # 初始化本次对话的状态
-            emotion = emotion_modulation(self.portrait, self.conversation)
-            self.chain_index = switch_complaint(
-                self.complaint_chain, self.chain_index, self.conversation
-            )
-            logger.debug("complaint_chain: %s", self.complaint_chain)
-            # 安全地获取complaint，避免list index out of range错误
-            transformed_chain = transform_chain(self.complaint_chain)
-            if transformed_chain and len(transformed_chain) > self.chain_index:
-                complaint = transformed_chain[self.chain_index]
-            else:
-                logger.warning(
-                    f"chain_index {self.chain_index} 超出范围，使用默认complaint"
-                )
-                complaint = "工作焦虑，失眠问题"
-            self.last_turn_context = {
-                "emotion": emotion,
-                "complaint_stage": self.chain_index,
-                "complaint": complaint,
-                "memory_used": False,
-            }
-            # 判断是否涉及前疗程内容
-            if is_need(message):
-                # 生成前疗程内容
-                sup_information = query(
-                    message, self.previous_conversations, self.report
-                )
-                self.last_turn_context["memory_used"] = bool(sup_information)
-
-                # 生成回复
-                messages = (
-                    [{"role": "system", "content": self.system}]
-                    + self.messages
-                    + [
-                        {
-                            "role": "user",
-                            "content": (
-                                f"当前的情绪状态是：{emotion}，"
-                                f"当前的主诉是：{complaint}，"
-                                f"涉及到之前疗程的信息是：{sup_information}"
-                            ),
-                        }
-                    ]
-                )
-                logger.debug("chat messages with memory: %s", messages)
+            try:
+                # 追踪上下文不能跨越 yield，只包住同步的准备阶段
+                with activate(trace):
+                    messages = self._turn_messages(message)
+                    with stage("reply"):
+                        stream = self.client.chat.completions.create(
+                            model=registry.get("anna_engine_config").model_name,
+                            messages=messages,
+                            stream=True,
+                        )
+                for text in iter_text_deltas(stream):
+                    parts.append(text)
+                    yield text
+            except Exception as err:
+                logger.exception("Chat generation failed: %s", err)
+                if not parts:
+                    self._stream_fallback(trace)
+                    return
+            if not parts:
+                self._stream_fallback(trace)
+                parts.append(EMPTY_REPLY_FALLBACK)
+                yield EMPTY_REPLY_FALLBACK
+        finally:
+            self._end_stream_turn(parts, trace)
 
-                response = self.client.chat.completions.create(
-                    model=registry.get("anna_engine_config").model_name,
-                    messages=messages,
+    def _turn_messages(self, message):
+        # 初始化本次对话的状态：情绪、主诉阶段和前疗程信息互不依赖，可并行推理
+        conversation = list(self.conversation)
+        if self._turn_pipeline_concurrent():
+            with ThreadPoolExecutor(
+                max_workers=3, thread_name_prefix="anna-turn"
+            ) as executor:
+                emotion_future = submit(
+                    executor,
+                    in_stage,
+                    "emotion",
+                    emotion_modulation,
+                    self.portrait,
+                    conversation,
                 )
-            else:
-                # 生成回复
-                messages = (
-                    [{"role": "system", "content": self.system}]
-                    + self.messages
-                    + [
-                        {
-                            "role": "user",
-                            "content": (
-                                f"当前的情绪状态是：{emotion}，"
-                                f"当前的主诉是：{complaint}"
-                            ),
-                        }
-                    ]
+                chain_future = submit(
+                    executor,
+                    in_stage,
+                    "complaint switch",
+                    switch_complaint,
+                    self.complaint_chain,
+                    self.chain_index,
+                    conversation,
                 )
-                logger.debug("chat messages: %s", messages)
-                response = self.client.chat.completions.create(
-                    model=registry.get("anna_engine_config").model_name,
-                    messages=messages,
+                memory_future = submit(
+                    executor, in_stage, "memory lookup", self._lookup_memory, message
                 )
+                emotion = emotion_future.result()
+                chain_index = chain_future.result()
+                sup_information = memory_future.result()
+        else:
+            emotion = in_stage(
+                "emotion", emotion_modulation, self.portrait, conversation
+            )
+            chain_index = in_stage(
+                "complaint switch",
+                switch_complaint,
+                self.complaint_chain,
+                self.chain_index,
+                conversation,
+            )
+            sup_information = in_stage("memory lookup", self._lookup_memory, message)
+        return self._prepare_generation(emotion, chain_index, sup_information)
 
-            # 更新消息列表
-            # 安全地提取响应内容，避免list index out of range错误
-            if response.choices and len(response.choices) > 0:
-                response_content = response.choices[0].message.content
-            else:
-                logger.warning("OpenAI API返回空的choices数组，使用默认响应")
-                response_content = (
-                    "抱歉，我刚才走神了...最近工作太忙，脑子有点乱。你刚才说什么？"
-                )
+    async def achat(self, message):
+        """Async variant of :meth:`chat` built on ``AsyncOpenAI``.
+
+        The per-turn checks are gathered on the running event loop, so many
+        seekers can chat concurrently without a thread per session.
+        """
 
-            self.conversation.append({"role": "Seeker", "content": response_content})
-            self.messages.append({"role": "assistant", "content": response_content})
-            return response_content
-        except Exception as err:
-            logger.exception("Chat generation failed: %s", err)
+        self._record_counselor_message(message)
+        trace = start_trace("turn")
+        with activate(trace):
+            try:
+                messages = await self._aturn_messages(message)
+                with stage("reply"):
+                    client = get_async_openai_client(hedged=True)
+                    response = await client.chat.completions.create(
+                        model=registry.get("anna_engine_config").model_name,
+                        messages=messages,
+                    )
+                    reply = self._record_seeker_reply(response)
+            except Exception as err:
+                logger.exception("Chat generation failed: %s", err)
+                fallbacks.record("seeker_reply")
+                reply = ""
+        self._finish_turn_trace(trace)
+        return reply
 
-            return ""
+    async def achat_stream(self, message):
+        """Async variant of :meth:`chat_stream`."""
+
+        self._record_counselor_message(message)
+        trace = start_trace("turn")
+        parts = []
+        try:
+            try:
+                with activate(trace):
+                    messages = await self._aturn_messages(message)
+                    with stage("reply"):
+                        client = get_async_openai_client()
+                        stream = await client.chat.completions.create(
+                            model=registry.get("anna_engine_config").model_name,
+                            messages=messages,
+                            stream=True,
+                        )
+                async for text in aiter_text_deltas(stream):
+                    parts.append(text)
+                    yield text
+            except Exception as err:
+                logger.exception("Chat generation failed: %s", err)
+                if not parts:
+                    self._stream_fallback(trace)
+                    return
+            if not parts:
+                self._stream_fallback(trace)
+                parts.append(EMPTY_REPLY_FALLBACK)
+                yield EMPTY_REPLY_FALLBACK
+        finally:
+            self._end_stream_turn(parts, trace)
+
+    async def _aturn_messages(self, message):
+        conversation = list(self.conversation)
+        emotion, chain_index, sup_information = await asyncio.gather(
+            ain_stage("emotion", aemotion_modulation(self.portrait, conversation)),
+            ain_stage(
+                "complaint switch",
+                aswitch_complaint(self.complaint_chain, self.chain_index, conversation),
+            ),
+            ain_stage("memory lookup", self._alookup_memory(message)),
+        )
+        return self._prepare_generation(emotion, chain_index, sup_information)
+
+    @staticmethod
+    def _turn_pipeline_concurrent() -> bool:
+        cfg = registry.get("anna_engine_config")
+        return bool(cfg and cfg.concurrency_turn_pipeline)
+
+    def _record_counselor_message(self, message):
+        self.conversation.append({"role": "Counselor", "content": message})
+        self.messages.append({"role": "user", "content": message})
+
+    def _lookup_memory(self, message):
+        """Return previous-session information, or ``None`` if not needed."""
+
+        # 判断是否涉及前疗程内容
+        if not is_need(message):
+            return None
+        # 生成前疗程内容
+        return query(
+            message,
+            self.previous_conversations,
+            self.report,
+            store=self.memory_store,
+            seeker_id=self.seeker_id,
+        )
+
+    async def _alookup_memory(self, message):
+        if not await ais_need(message):
+            return None
+        return await aquery(
+            message,
+            self.previous_conversations,
+            self.report,
+            store=self.memory_store,
+            seeker_id=self.seeker_id,
+        )
+
+    def _prepare_generation(self, emotion, chain_index, sup_information):
+        self.chain_index = chain_index
+        logger.debug("complaint_chain: %s", self.complaint_chain)
+        # 安全地获取complaint，避免list index out of range错误
+        transformed_chain = transform_chain(self.complaint_chain)
+        if transformed_chain and len(transformed_chain) > self.chain_index:
+            complaint = transformed_chain[self.chain_index]
+        else:
+            logger.warning(
+                f"chain_index {self.chain_index} 超出范围，使用默认complaint"
+            )
+            complaint = "工作焦虑，失眠问题"
+        self.last_turn_context = {
+            "emotion": emotion,
+            "complaint_stage": self.chain_index,
+            "complaint": complaint,
+            "memory_used": bool(sup_information),
+        }
+        reminder = f"当前的情绪状态是：{emotion}，当前的主诉是：{complaint}"
+        if sup_information is not None:
+            reminder = f"{reminder}，涉及到之前疗程的信息是：{sup_information}"
+        # 生成回复
+        messages = (
+            [{"role": "system", "content": self.system}]
+            + self.messages
+            + [{"role": "user", "content": reminder}]
+        )
+        logger.debug("chat messages: %s", messages)
+        return messages
+
+    def _record_seeker_reply(self, response):
+        # 更新消息列表
+        # 安全地提取响应内容，避免list index out of range错误
+        if response.choices and len(response.choices) > 0:
+            response_content = response.choices[0].message.content
+        else:
+            logger.warning("OpenAI API返回空的choices数组，使用默认响应")
+            fallbacks.record("seeker_reply")
+            response_content = EMPTY_REPLY_FALLBACK
+        return self._record_seeker_text(response_content)
+
+    def _record_seeker_text(self, response_content):
+        self.conversation.append({"role": "Seeker", "content": response_content})
+        self.messages.append({"role": "assistant", "content": response_content})
+        return response_content
+
+    def _end_stream_turn(self, parts, trace):
+        # 流被提前关闭、超时取消或出错时也要收尾，避免历史中留下连续两条用户消息
+        if parts:
+            self._record_seeker_text("".join(parts))
+        else:
+            self.conversation.pop()
+            self.messages.pop()
+        self._finish_turn_trace(trace)
+
+    def _stream_fallback(self, trace):
+        with activate(trace):
+            fallbacks.record("seeker_reply")
+
+    def _finish_turn_trace(self, trace):
+        if trace is not None:
+            self.last_turn_context["trace"] = trace.finish()
+
+
+class AsyncMsPatient(MsPatient):
+    """Seeker simulation with awaitable initialization and chat.
+
+    Construct it with ``await AsyncMsPatient.create(...)``; the initialization
+    stages and every turn run on the caller's event loop through ``AsyncOpenAI``,
+    so one process can host many seekers at once.
+    """
+
+    def __init__(
+        self,
+        portrait: dict,
+        report: dict,
+        previous_conversations: list,
+        progress_callback: Callable[[str, str], None] | None = None,
+    ):
+        self._statement = self._setup(
+            portrait, report, previous_conversations, progress_callback
+        )
+        self.initialized = False
+
+    @classmethod
+    async def create(
+        cls,
+        portrait: dict,
+        report: dict,
+        previous_conversations: list,
+        progress_callback: Callable[[str, str], None] | None = None,
+    ) -> "AsyncMsPatient":
+        seeker = cls(portrait, report, previous_conversations, progress_callback)
+        await seeker.initialize()
+        return seeker
+
+    async def initialize(self) -> None:
+        if self.initialized:
+            return
+        trace = start_trace("init")
+        with activate(trace):
+            results = await arun_stage_graph(
+                self._ainit_stages(self._statement),
+                on_start=self._on_stage_start,
+                on_finish=self._on_stage_finish,
+            )
+        self.init_trace = trace.finish() if trace else None
+        self._apply_init_results(results, self._statement)
+        self.initialized = True
+        self._report_progress("ready", "Seeker simulation is ready")
+
+    async def chat(self, message):
+        self._require_initialized()
+        return await self.achat(message)
+
+    async def chat_stream(self, message):
+        self._require_initialized()
+        async for text in self.achat_stream(message):
+            yield text
+
+    def _require_initialized(self) -> None:
+        if not self.initialized:
+            raise RuntimeError("AsyncMsPatient.initialize() must be awaited first")
+
+
+def open_long_term_memory(seeker_id, case_id, portrait, report, conversations):
+    """Open the configured memory store and index this case into it.
+
+    Returns ``None`` when long-term memory is disabled or cannot be set up.
+    """
+
+    cfg = registry.get("anna_engine_config")
+    if not cfg or not cfg.memory_enabled:
+        return None
+    try:
+        workspace = registry.get("anna_agent_workspace", Path.cwd())
+        store = LanceMemoryStore.from_config(cfg, workspace=workspace)
+        if cfg.memory_auto_index:
+            store.index_case(
+                seeker_id=seeker_id,
+                case_id=case_id,
+                portrait=portrait,
+                report=report,
+                conversations=conversations,
+                window_size=cfg.memory_window_size,
+                window_stride=cfg.memory_window_stride,
+            )
+        return store
+    except Exception as err:
+        logger.warning("Long-term memory setup failed: %s", err)
+        return None
@@ -10,6 +10,7 @@ import os
 from .emotion_modulator import emotion_modulation
 from .querier import query, is_need
 from .complaint_elicitor import switch_complaint, transform_chain
+from .ms_patient import open_long_term_memory
 
 
 
@@ -20,6 +21,9 @@ class MsPatient:
         self.portrait = portrait              # age, gender, occupation, maritial_status, symptom
         self.report = report
         self.previous_conversations = previous_conversations
+        self.case_id = self.portrait.get("_case_id", "default-case")
+        self.seeker_id = self.portrait.get("_seeker_id", self.case_id)
+        self.memory_store = open_long_term_memory(self.seeker_id, self.case_id, portrait, report, previous_conversations)
         self.conversation = []          # Conversation存储咨访记录
         self.messages = []              # Messages存储LLM的消息列表
         self.logs = []                 # Logs存储LLM的日志
@@ -42,7 +46,7 @@ class MsPatient:
         # 判断是否涉及前疗程内容
         if is_need(message):
             # 生成前疗程内容
-            sup_information = query(message, self.previous_conversations, self.report)
+            sup_information = query(message, self.previous_conversations, self.report, store=self.memory_store, seeker_id=self.seeker_id)
 
             # 生成回复
             response = self.client.chat.completions.create(
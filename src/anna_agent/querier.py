@@ -1,6 +1,8 @@
+import asyncio
 import logging
 
-from .backbone import get_counselor_client
+from .backbone import get_async_counselor_client, get_counselor_client
+from .common.fallbacks import fallbacks
 from .common.registry import registry
 from .common.tool_calls import extract_tool_call_arguments
 
@@ -38,8 +40,7 @@ tools = [
 ]
 
 
-def is_need(utterance):
-    client = get_counselor_client()
+def _is_need_request(utterance):
     messages = [
         {
             "role": "user",
@@ -51,30 +52,51 @@ def is_need(utterance):
     ]
 
     logger.debug("memory need messages: %s", messages)
-    response = client.chat.completions.create(
-        model=registry.get("anna_engine_config").counselor_model_name,
+    cfg = registry.get("anna_engine_config")
+    return dict(
+        model=cfg.counselor_model_name,
         messages=messages,
+        temperature=cfg.llm_cache_temperature,
         tools=tools,
         tool_choice={"type": "function", "function": {"name": "is_need"}},
     )
 
+
+def _parse_is_need(response):
     args = extract_tool_call_arguments(response)
-    return bool(args.get("is_need")) if args else False
+    if not args:
+        fallbacks.record("memory_need")
+        return False
+    return bool(args.get("is_need"))
 
 
-def query(utterance, conversations, scales):
-    # 根据utterance从conversations和scales中检索必要的信息
+def is_need(utterance):
+    client = get_counselor_client(cached=True)
+    response = client.chat.completions.create(**_is_need_request(utterance))
+    return _parse_is_need(response)
+
+
+async def ais_need(utterance):
+    client = get_async_counselor_client(cached=True)
+    response = await client.chat.completions.create(**_is_need_request(utterance))
+    return _parse_is_need(response)
+
+
+def _search_long_term_memory(utterance, store, seeker_id):
     cfg = registry.get("anna_engine_config")
-    store = registry.get("long_term_memory_store")
-    seeker_id = registry.get("long_term_memory_seeker_id")
     if cfg and cfg.memory_enabled and store and seeker_id:
-        hits = store.search(utterance, seeker_id=seeker_id, top_k=cfg.memory_top_k)
-        formatted_hits = store.format_hits(hits)
-        if formatted_hits:
-            return formatted_hits
+        hits = store.search(
+            utterance,
+            seeker_id=seeker_id,
+            top_k=cfg.memory_top_k,
+            mode=cfg.memory_search_mode,
+        )
+        return store.format_hits(hits)
+    return None
 
-    client = get_counselor_client()
-    response = client.chat.completions.create(
+
+def _knowledge_request(utterance, conversations, scales):
+    return dict(
         model=registry.get("anna_engine_config").counselor_model_name,
         messages=[
             {
@@ -87,11 +109,44 @@ def query(utterance, conversations, scales):
             }
         ],
         tools=tools,
-        tool_choice={"type": "function", "function": {"name": "search_knowledge"}}
+        tool_choice={"type": "function", "function": {"name": "search_knowledge"}},
     )
+
+
+def _parse_knowledge(response):
     logger.debug("knowledge response: %s", response)
     # 提取结构化知识字段
     args = extract_tool_call_arguments(response)
-    knowledge = args.get("knowledge") if args else ""
+    if not args:
+        fallbacks.record("knowledge")
+        return ""
+    return args.get("knowledge")
+
+
+def query(utterance, conversations, scales, store=None, seeker_id=None):
+    # 根据utterance从conversations和scales中检索必要的信息
+    # store/seeker_id 属于调用方的来访者实例，同一进程中的多个来访者互不干扰
+    formatted_hits = _search_long_term_memory(utterance, store, seeker_id)
+    if formatted_hits:
+        return formatted_hits
+
+    client = get_counselor_client()
+    response = client.chat.completions.create(
+        **_knowledge_request(utterance, conversations, scales)
+    )
+    return _parse_knowledge(response)
+
 
-    return knowledge
+async def aquery(utterance, conversations, scales, store=None, seeker_id=None):
+    # LanceDB 检索是阻塞调用，放到线程中避免卡住事件循环
+    formatted_hits = await asyncio.to_thread(
+        _search_long_term_memory, utterance, store, seeker_id
+    )
+    if formatted_hits:
+        return formatted_hits
+
+    client = get_async_counselor_client()
+    response = await client.chat.completions.create(
+        **_knowledge_request(utterance, conversations, scales)
+    )
+    return _parse_knowledge(response)
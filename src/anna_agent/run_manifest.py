@@ -0,0 +1,126 @@
+"""Progress log that lets ``anna run batch --resume`` pick up where it stopped."""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .runtime import append_jsonl
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+@dataclass
+class CaseProgress:
+    case_id: str = ""
+    state_file: str = ""
+    turns: list[dict[str, str]] = field(default_factory=list)
+    done: bool = False
+
+    def completed_turns(self, messages: list[str]) -> int:
+        """Number of leading recorded turns that match the script ``messages``."""
+
+        count = 0
+        for turn, message in zip(self.turns, messages):
+            if turn["message"] != message:
+                break
+            count += 1
+        return count
+
+
+class RunManifest:
+    """Append-only JSONL log of per-case stages in a batch output directory.
+
+    Each event (state built, scripted turn ``k`` answered, case finished) is
+    one appended line, so recording progress costs the same on the last case
+    of an overnight batch as on the first, and an interrupted write can only
+    tear the final line, which is cut off on replay so that the next event
+    starts on a line of its own.
+    """
+
+    def __init__(self, path: str | Path, *, resume: bool = False):
+        self.path = Path(path)
+        self.cases: dict[str, CaseProgress] = {}
+        self._lock = threading.Lock()
+        if resume:
+            self._replay()
+        else:
+            self.path.unlink(missing_ok=True)
+
+    def get(self, case_file: Path) -> CaseProgress | None:
+        return self.cases.get(_case_key(case_file))
+
+    def state_built(self, case_file: Path, case_id: str, state_file: Path) -> None:
+        self._record(
+            {
+                "event": "state",
+                "case": _case_key(case_file),
+                "case_id": case_id,
+                "state_file": str(state_file),
+            }
+        )
+
+    def turn_done(
+        self, case_file: Path, index: int, message: str, response: str
+    ) -> None:
+        self._record(
+            {
+                "event": "turn",
+                "case": _case_key(case_file),
+                "turn": index,
+                "message": message,
+                "response": response,
+            }
+        )
+
+    def case_done(self, case_file: Path) -> None:
+        self._record({"event": "done", "case": _case_key(case_file)})
+
+    def _record(self, event: dict[str, Any]) -> None:
+        with self._lock:
+            append_jsonl(self.path, event)
+            self._apply(event)
+
+    def _replay(self) -> None:
+        if not self.path.exists():
+            return
+        with self.path.open("rb+") as file:
+            end = 0
+            for number, line in enumerate(file, start=1):
+                if not line.endswith(b"\n"):
+                    # 末行未写完：截掉，之后的追加从新的一行开始
+                    logger.warning("Dropping torn line %d of %s", number, self.path)
+                    file.truncate(end)
+                    break
+                end += len(line)
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping torn line %d of %s", number, self.path)
+                    continue
+                self._apply(event)
+
+    def _apply(self, event: dict[str, Any]) -> None:
+        key = event["case"]
+        if event["event"] == "state":
+            self.cases[key] = CaseProgress(event["case_id"], event["state_file"])
+            return
+        progress = self.cases.get(key)
+        if progress is None:
+            return
+        if event["event"] == "turn":
+            # 重跑时脚本可能已修改，第 k 轮之后的旧记录作废
+            progress.turns[event["turn"] - 1 :] = [
+                {"message": event["message"], "response": event["response"]}
+            ]
+            progress.done = False
+        elif event["event"] == "done":
+            progress.done = True
+
+
+def _case_key(case_file: Path) -> str:
+    return str(Path(case_file).resolve())
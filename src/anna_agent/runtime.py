@@ -1,11 +1,13 @@
 import json
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable, Iterator
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-from .backbone import get_openai_client
+from .backbone import get_async_openai_client, get_openai_client, start_trace
 from .case_data import load_case
+from .common.streaming import aiter_text_deltas, iter_text_deltas
+from .common.tracing import Trace, activate, stage
 
 
 def build_full_state(
@@ -21,6 +23,26 @@ def build_full_state(
         case["conversation"],
         progress_callback=progress_callback,
     )
+    return _full_state(case_file, case, seeker)
+
+
+async def abuild_full_state(
+    case_file: Path,
+    progress_callback: Callable[[str, str], None] | None = None,
+) -> dict[str, Any]:
+    from .ms_patient import AsyncMsPatient
+
+    case = load_case(case_file)
+    seeker = await AsyncMsPatient.create(
+        case["portrait"],
+        case["report"],
+        case["conversation"],
+        progress_callback=progress_callback,
+    )
+    return _full_state(case_file, case, seeker)
+
+
+def _full_state(case_file: Path, case: dict[str, Any], seeker) -> dict[str, Any]:
     return {
         "schema_version": 1,
         "mode": "full",
@@ -34,6 +56,7 @@ def build_full_state(
         "complaint_chain": seeker.complaint_chain,
         "configuration": seeker.configuration,
         "metadata": {"source_file": str(case_file)},
+        "trace": seeker.init_trace,
     }
 
 
@@ -64,19 +87,101 @@ class FrozenPromptSession:
         validate_state(state)
         self.state = state
         self.messages: list[dict[str, str]] = []
-        self.client = get_openai_client()
+        self.last_turn_context: dict[str, Any] = {}
+        self.client = get_openai_client(hedged=True)
 
     def chat(self, message: str) -> str:
+        trace = start_trace("turn")
+        with activate(trace), stage("reply"):
+            response = self.client.chat.completions.create(**self._request(message))
+        self._finish_trace(trace)
+        return self._record_reply(response)
+
+    def chat_stream(self, message: str) -> Iterator[str]:
+        """Yield reply fragments as the model streams them.
+
+        If the stream fails or is closed early, the part already yielded is
+        recorded as the reply; a turn that yielded nothing is withdrawn.
+        """
+        trace = start_trace("turn")
+        parts, finished = [], False
+        try:
+            with activate(trace), stage("reply"):
+                stream = self.client.chat.completions.create(
+                    **self._request(message), stream=True
+                )
+            for text in iter_text_deltas(stream):
+                parts.append(text)
+                yield text
+            finished = True
+        finally:
+            self._finish_trace(trace)
+            self._end_stream_turn(parts, finished)
+
+    def _request(self, message: str) -> dict[str, Any]:
         self.messages.append({"role": "user", "content": message})
-        response = self.client.chat.completions.create(
-            model=self.state.get("model_name") or _configured_model_name(),
-            messages=[{"role": "system", "content": self.state["prompt"]}]
+        return {
+            "model": self.state.get("model_name") or _configured_model_name(),
+            "messages": [{"role": "system", "content": self.state["prompt"]}]
             + self.messages,
-        )
-        content = response.choices[0].message.content or ""
+        }
+
+    def _record_reply(self, response: Any) -> str:
+        return self._record_text(response.choices[0].message.content or "")
+
+    def _record_text(self, content: str) -> str:
         self.messages.append({"role": "assistant", "content": content})
         return content
 
+    def _end_stream_turn(self, parts: list[str], finished: bool) -> None:
+        # 流被提前关闭、超时取消或出错时也要收尾，避免历史中留下连续两条用户消息
+        if finished or parts:
+            self._record_text("".join(parts))
+        elif self.messages and self.messages[-1]["role"] == "user":
+            self.messages.pop()
+
+    def _finish_trace(self, trace: Trace | None) -> None:
+        self.last_turn_context = {"trace": trace.finish()} if trace else {}
+
+
+class AsyncFrozenPromptSession(FrozenPromptSession):
+    """:class:`FrozenPromptSession` whose ``chat`` is awaitable.
+
+    The ``AsyncOpenAI`` client is looked up per call because async clients are
+    pooled per event loop.
+    """
+
+    def __init__(self, state: dict[str, Any]):
+        validate_state(state)
+        self.state = state
+        self.messages = []
+        self.last_turn_context = {}
+
+    async def chat(self, message: str) -> str:
+        trace = start_trace("turn")
+        with activate(trace), stage("reply"):
+            client = get_async_openai_client(hedged=True)
+            response = await client.chat.completions.create(**self._request(message))
+        self._finish_trace(trace)
+        return self._record_reply(response)
+
+    async def chat_stream(self, message: str) -> AsyncIterator[str]:
+        trace = start_trace("turn")
+        parts, finished = [], False
+        try:
+            with activate(trace), stage("reply"):
+                client = get_async_openai_client()
+                stream = await client.chat.completions.create(
+                    **self._request(message), stream=True
+                )
+            async for text in aiter_text_deltas(stream):
+                parts.append(text)
+                yield text
+            finished = True
+        finally:
+            self._finish_trace(trace)
+            self._end_stream_turn(parts, finished)
+
 
 def state_summary(state: dict[str, Any]) -> dict[str, Any]:
     return {
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import uuid
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
@@ -5,22 +6,48 @@ from pathlib import Path
 from typing import Any
 
 from . import backbone
+from .common.fallbacks import fallbacks
 from .common.registry import registry
+from .common.retry import retry_stats
 from .memory import LanceMemoryStore
 from .runtime import FrozenPromptSession, load_state
+from .session_manager import SessionManager
 
 
-def serve(workspace: Path, host: str, port: int) -> None:
+def serve(workspace: Path, host: str, port: int, mode: str | None = None) -> None:
+    """Serve the HTTP API until interrupted.
+
+    ``mode`` is ``"asyncio"`` (default from ``service.mode``) or ``"threaded"``
+    for the original one-thread-per-connection server.
+    """
     backbone.configure(workspace)
-    sessions: dict[str, FrozenPromptSession] = {}
+    mode = mode or registry.get("anna_engine_config").service_mode
+    if mode == "asyncio":
+        from .async_service import serve_async
+
+        asyncio.run(serve_async(workspace, host, port))
+    elif mode == "threaded":
+        server = make_server(workspace, host, port)
+        try:
+            server.serve_forever()
+        finally:
+            server.sessions.close()
+    else:
+        raise ValueError(f"Unsupported service mode: {mode}")
+
+
+def make_server(workspace: Path, host: str, port: int) -> ThreadingHTTPServer:
+    cfg = registry.get("anna_engine_config")
+    sessions = SessionManager.from_config(workspace, cfg, FrozenPromptSession)
+    memory_store = shared_memory_store(workspace, cfg)
 
     class Handler(BaseHTTPRequestHandler):
         def do_GET(self):
             if self.path == "/health":
-                self._json({"status": "ok", "workspace": str(workspace)})
+                self._json(health_status(workspace))
                 return
             if self.path == "/v1/sessions":
-                self._json({"sessions": sorted(sessions.keys())})
+                self._json({"sessions": sessions.keys()})
                 return
             self._json({"error": "not found"}, status=404)
 
@@ -33,6 +60,9 @@ def serve(workspace: Path, host: str, port: int) -> None:
                 if self.path == "/v1/chat":
                     self._chat(body)
                     return
+                if self.path == "/v1/chat/stream":
+                    self._chat_stream(body)
+                    return
                 if self.path == "/v1/memory/search":
                     self._memory_search(body)
                     return
@@ -44,44 +74,44 @@ def serve(workspace: Path, host: str, port: int) -> None:
             return
 
         def _create_session(self, body: dict[str, Any]) -> None:
-            state_file = body.get("state_file")
-            case_file = body.get("case_file")
-            if state_file:
-                state = load_state(_resolve_path(workspace, state_file))
-            elif case_file:
-                raise ValueError(
-                    "case_file sessions are not supported. Run `anna init full` "
-                    "first and provide the generated state_file."
-                )
-            else:
-                raise ValueError("Provide state_file generated by `anna init full`")
-            session_id = body.get("session_id") or str(uuid.uuid4())
+            session_id, state = session_state(workspace, body)
             sessions[session_id] = FrozenPromptSession(state)
             self._json({"session_id": session_id})
 
         def _chat(self, body: dict[str, Any]) -> None:
-            session_id = body.get("session_id")
-            message = body.get("message")
-            if not session_id or not message:
-                raise ValueError("session_id and message are required")
-            session = sessions.get(session_id)
-            if not session:
-                raise ValueError(f"Unknown session_id: {session_id}")
-            self._json({"response": session.chat(message)})
+            session_id, session, message = session_message(sessions, body)
+            try:
+                self._json({"response": session.chat(message)})
+            finally:
+                sessions.release(session_id)
+
+        def _chat_stream(self, body: dict[str, Any]) -> None:
+            session_id, session, message = session_message(sessions, body)
+            try:
+                self._stream_reply(session, message)
+            finally:
+                sessions.release(session_id)
+
+        def _stream_reply(self, session: Any, message: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            # 响应头已发出，之后的错误只能以 SSE 事件的形式告知客户端
+            parts = []
+            try:
+                for text in session.chat_stream(message):
+                    parts.append(text)
+                    self._event({"delta": text})
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            except Exception as err:
+                self._event({"error": str(err)}, event="error")
+                return
+            self._event({"response": "".join(parts)}, event="done")
 
         def _memory_search(self, body: dict[str, Any]) -> None:
-            cfg = registry.get("anna_engine_config")
-            store = LanceMemoryStore.from_config(cfg, workspace=workspace)
-            query = body.get("query")
-            seeker_id = body.get("seeker_id")
-            if not query or not seeker_id:
-                raise ValueError("query and seeker_id are required")
-            hits = store.search(
-                query,
-                seeker_id=seeker_id,
-                top_k=int(body.get("top_k") or cfg.memory_top_k),
-            )
-            self._json({"hits": [hit.__dict__ for hit in hits]})
+            self._json(memory_search(memory_store, body))
 
         def _body(self) -> dict[str, Any]:
             length = int(self.headers.get("Content-Length", "0"))
@@ -97,8 +127,89 @@ def serve(workspace: Path, host: str, port: int) -> None:
             self.end_headers()
             self.wfile.write(raw)
 
+        def _event(self, data: dict[str, Any], event: str | None = None) -> None:
+            self.wfile.write(sse_event(data, event))
+            self.wfile.flush()
+
+    sessions.start_sweeper()
     server = ThreadingHTTPServer((host, port), Handler)
-    server.serve_forever()
+    server.sessions = sessions
+    server.memory_store = memory_store
+    return server
+
+
+def health_status(workspace: Path) -> dict[str, Any]:
+    return {
+        "status": "ok",
+        "workspace": str(workspace),
+        "retries": retry_stats.snapshot(),
+        "fallbacks": fallbacks.snapshot(),
+    }
+
+
+def session_state(workspace: Path, body: dict[str, Any]) -> tuple[str, dict]:
+    """Validate a ``POST /v1/sessions`` body and load its frozen state."""
+    state_file = body.get("state_file")
+    case_file = body.get("case_file")
+    if state_file:
+        state = load_state(_resolve_path(workspace, state_file))
+    elif case_file:
+        raise ValueError(
+            "case_file sessions are not supported. Run `anna init full` "
+            "first and provide the generated state_file."
+        )
+    else:
+        raise ValueError("Provide state_file generated by `anna init full`")
+    return body.get("session_id") or str(uuid.uuid4()), state
+
+
+def session_message(
+    sessions: SessionManager, body: dict[str, Any]
+) -> tuple[str, Any, str]:
+    """Acquire the session addressed by a chat request body.
+
+    Returns the session id, the session and the message. The caller must
+    ``sessions.release(session_id)`` once the turn is over.
+    """
+    session_id = body.get("session_id")
+    message = body.get("message")
+    if not session_id or not message:
+        raise ValueError("session_id and message are required")
+    session = sessions.acquire(session_id)
+    if not session:
+        raise ValueError(f"Unknown session_id: {session_id}")
+    return session_id, session, message
+
+
+def shared_memory_store(workspace: Path, cfg) -> LanceMemoryStore:
+    """Build the long-lived memory store one server keeps for ``workspace``."""
+    return LanceMemoryStore.from_config(
+        cfg,
+        workspace=workspace,
+        read_consistency_interval=cfg.memory_read_consistency_interval,
+    )
+
+
+def memory_search(store: LanceMemoryStore, body: dict[str, Any]) -> dict[str, Any]:
+    cfg = registry.get("anna_engine_config")
+    query = body.get("query")
+    seeker_id = body.get("seeker_id")
+    if not query or not seeker_id:
+        raise ValueError("query and seeker_id are required")
+    hits = store.search(
+        query,
+        seeker_id=seeker_id,
+        top_k=int(body.get("top_k") or cfg.memory_top_k),
+        mode=body.get("mode"),
+    )
+    return {"hits": [hit.__dict__ for hit in hits]}
+
+
+def sse_event(data: dict[str, Any], event: str | None = None) -> bytes:
+    """Encode one server-sent event with a JSON ``data`` payload."""
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
 
 
 def _resolve_path(workspace: Path, value: str) -> Path:
@@ -0,0 +1,280 @@
+"""Bounded store for live chat sessions served by ``anna serve``."""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from .config import anna_engine_defaults
+
+logger = logging.getLogger(__name__)
+
+SPILL_SCHEMA_VERSION = 1
+
+
+class SessionManager:
+    """Keep recently used sessions in memory and spill the rest to disk.
+
+    Sessions are evicted least recently used first when there are more than
+    ``max_sessions`` of them, when their estimated size exceeds ``max_bytes``,
+    or after ``idle_ttl`` seconds without a request. An evicted session is
+    written to ``spill_dir`` as its frozen state plus message history and is
+    rebuilt with ``factory`` on the next lookup, so clients never notice.
+
+    A session taken with :meth:`acquire` stays in memory until it is
+    released, so a turn never finishes on an object that has already been
+    spilled; limits it held back are applied on :meth:`release`.
+
+    The mapping-style ``get``/``keys``/``__setitem__`` methods let the HTTP
+    handlers use it in place of a plain dict.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[dict[str, Any]], Any],
+        spill_dir: str | Path,
+        *,
+        max_sessions: int = anna_engine_defaults.service_session_max_count,
+        max_bytes: int = anna_engine_defaults.service_session_max_bytes,
+        idle_ttl: float = anna_engine_defaults.service_session_idle_ttl,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.factory = factory
+        self.spill_dir = Path(spill_dir)
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        # session_id -> (session, last_used)
+        self._live: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._spilled: set[str] = set()
+        self._in_use: Counter[str] = Counter()
+        # session_id -> (estimated bytes, messages counted so far)
+        self._sizes: dict[str, tuple[int, int]] = {}
+        self._live_bytes = 0
+        self._lock = threading.RLock()
+        self._sweeper: threading.Thread | None = None
+        self._stop_sweeper = threading.Event()
+        self.evictions = 0
+        self.rehydrations = 0
+
+    @classmethod
+    def from_config(
+        cls, workspace: Path, cfg, factory: Callable[[dict[str, Any]], Any]
+    ) -> "SessionManager":
+        spill_dir = Path(cfg.service_session_spill_dir)
+        if not spill_dir.is_absolute():
+            spill_dir = workspace / spill_dir
+        return cls(
+            factory,
+            spill_dir,
+            max_sessions=cfg.service_session_max_count,
+            max_bytes=cfg.service_session_max_bytes,
+            idle_ttl=cfg.service_session_idle_ttl,
+        )
+
+    def __setitem__(self, session_id: str, session: Any) -> None:
+        with self._lock:
+            self._live[session_id] = (session, self._clock())
+            self._live.move_to_end(session_id)
+            self._forget_size(session_id)
+            self._update_size(session_id)
+            self._spilled.discard(session_id)
+            self._spill_path(session_id).unlink(missing_ok=True)
+            self._enforce_limits(keep=session_id)
+
+    def get(self, session_id: str) -> Any | None:
+        with self._lock:
+            entry = self._live.get(session_id)
+            if entry is not None:
+                session = entry[0]
+                self._live[session_id] = (session, self._clock())
+                self._live.move_to_end(session_id)
+            else:
+                session = self._rehydrate(session_id)
+                if session is None:
+                    return None
+                self._live[session_id] = (session, self._clock())
+                self._update_size(session_id)
+            self._enforce_limits(keep=session_id)
+            return session
+
+    def acquire(self, session_id: str) -> Any | None:
+        """Like :meth:`get`, but keep the session in memory until released."""
+        with self._lock:
+            session = self.get(session_id)
+            if session is not None:
+                self._in_use[session_id] += 1
+            return session
+
+    def release(self, session_id: str) -> None:
+        with self._lock:
+            self._in_use[session_id] -= 1
+            if self._in_use[session_id] <= 0:
+                del self._in_use[session_id]
+            if session_id in self._live:
+                self._live[session_id] = (self._live[session_id][0], self._clock())
+                self._live.move_to_end(session_id)
+                self._update_size(session_id)
+            self._enforce_limits()
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return sorted(set(self._live) | self._spilled)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return (
+                session_id in self._live
+                or session_id in self._spilled
+                or self._spill_path(session_id).exists()
+            )
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "live": len(self._live),
+                "spilled": len(self._spilled),
+                "live_bytes": self._live_bytes,
+                "evictions": self.evictions,
+                "rehydrations": self.rehydrations,
+            }
+
+    def evict_idle(self) -> int:
+        """Spill every session idle for longer than ``idle_ttl``."""
+        with self._lock:
+            return self._enforce_limits()
+
+    def start_sweeper(self) -> None:
+        """Run :meth:`evict_idle` in a background thread.
+
+        Without it idle sessions are only spilled when a request arrives. The
+        sweep runs every ``idle_ttl / 2`` seconds, at most once a minute.
+        """
+        if self.idle_ttl <= 0 or self._sweeper is not None:
+            return
+        interval = min(self.idle_ttl / 2, 60.0)
+
+        def sweep() -> None:
+            while not self._stop_sweeper.wait(interval):
+                try:
+                    self.evict_idle()
+                except Exception as err:
+                    logger.warning("Idle session sweep failed: %s", err)
+
+        self._sweeper = threading.Thread(
+            target=sweep, name="anna-session-sweeper", daemon=True
+        )
+        self._sweeper.start()
+
+    def close(self) -> None:
+        """Spill all live sessions, e.g. before the server exits."""
+        self._stop_sweeper.set()
+        with self._lock:
+            for session_id in list(self._live):
+                self._evict(session_id)
+
+    def _enforce_limits(self, keep: str | None = None) -> int:
+        evicted = 0
+        now = self._clock()
+        if self.idle_ttl > 0:
+            for session_id, (_, last_used) in list(self._live.items()):
+                if now - last_used <= self.idle_ttl:
+                    # OrderedDict keeps least recently used sessions first.
+                    break
+                if session_id != keep and session_id not in self._in_use:
+                    self._evict(session_id)
+                    evicted += 1
+        while self.max_sessions > 0 and len(self._live) > self.max_sessions:
+            victim = self._lru_victim(keep)
+            if victim is None:
+                break
+            self._evict(victim)
+            evicted += 1
+        while self.max_bytes > 0 and self._live_bytes > self.max_bytes:
+            victim = self._lru_victim(keep)
+            if victim is None:
+                break
+            self._evict(victim)
+            evicted += 1
+        return evicted
+
+    def _lru_victim(self, keep: str | None) -> str | None:
+        return next(
+            (sid for sid in self._live if sid != keep and sid not in self._in_use),
+            None,
+        )
+
+    def _update_size(self, session_id: str) -> None:
+        """Add the messages appended since the last update to the byte total."""
+        session = self._live[session_id][0]
+        size, counted = self._sizes.get(session_id, (0, 0))
+        if session_id not in self._sizes or counted > len(session.messages):
+            # New session, or its history was cut back: count from scratch.
+            self._forget_size(session_id)
+            size, counted = _prompt_bytes(session), 0
+            self._live_bytes += size
+        added = sum(_message_bytes(message) for message in session.messages[counted:])
+        self._sizes[session_id] = (size + added, len(session.messages))
+        self._live_bytes += added
+
+    def _forget_size(self, session_id: str) -> None:
+        size, _ = self._sizes.pop(session_id, (0, 0))
+        self._live_bytes -= size
+
+    def _evict(self, session_id: str) -> None:
+        session, _ = self._live.pop(session_id)
+        self._forget_size(session_id)
+        path = self._spill_path(session_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "schema_version": SPILL_SCHEMA_VERSION,
+            "session_id": session_id,
+            "state": session.state,
+            "messages": session.messages,
+        }
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        tmp_path.replace(path)
+        self._spilled.add(session_id)
+        self.evictions += 1
+        logger.debug("Spilled session %s to %s", session_id, path)
+
+    def _rehydrate(self, session_id: str) -> Any | None:
+        path = self._spill_path(session_id)
+        if not path.exists():
+            return None
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        session = self.factory(payload["state"])
+        session.messages = payload.get("messages") or []
+        path.unlink(missing_ok=True)
+        self._spilled.discard(session_id)
+        self.rehydrations += 1
+        return session
+
+    def _spill_path(self, session_id: str) -> Path:
+        digest = hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+        return self.spill_dir / f"{digest[:32]}.json"
+
+
+def _prompt_bytes(session: Any) -> int:
+    """Rough in-memory size of a session's frozen prompt."""
+
+    return len(str(session.state.get("prompt", "")).encode("utf-8"))
+
+
+def _message_bytes(message: dict[str, Any]) -> int:
+    """Rough in-memory size of one history message."""
+
+    return len(str(message.get("content", "")).encode("utf-8")) + 64
@@ -1,24 +1,35 @@
+import asyncio
 import importlib.resources
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-from .backbone import get_counselor_client
+from .backbone import get_async_counselor_client, get_counselor_client
+from .common.fallbacks import fallbacks
 from .common.registry import registry
 from .common.tool_calls import extract_tool_call_arguments
+from .common.tracing import submit
 
 logger = logging.getLogger(__name__)
 
 
-def _fallback_scale_changes(scale_name, previous_answers, current_answers):
+def _fallback_scale_changes(
+    scale_name,
+    previous_answers,
+    current_answers,
+    explanation="模型未返回结构化工具调用，使用保守默认结果。",
+):
     return [
         {
             "item": f"{scale_name}-{index}",
             "change": "无变化",
-            "explanation": "模型未返回结构化工具调用，使用保守默认结果。",
+            "explanation": explanation,
         }
         for index, _ in enumerate(zip(previous_answers, current_answers), start=1)
     ]
 
+
 tools = [
     {
         "type": "function",
@@ -58,105 +69,149 @@ tools = [
 ]
 
 
-def analyzing_changes(scales):
-    client = get_counselor_client()
+# 量表名称、答案字段及题目文件
+SCALES = [
+    ("BDI", "bdi", "bdi.json"),
+    ("GHQ", "ghq", "ghq-28.json"),
+    ("SASS", "sass", "sass.json"),
+]
+
+
+@lru_cache(maxsize=None)
+def _load_scale(filename):
     # 导入量表及问题
-    with importlib.resources.files("anna_agent.scales").joinpath("bdi.json").open(
-        "r", encoding="utf-8"
-    ) as f:
-        bdi_scale = json.load(f)
-    with importlib.resources.files("anna_agent.scales").joinpath("ghq-28.json").open(
-        "r", encoding="utf-8"
-    ) as f:
-        ghq_scale = json.load(f)
-    with importlib.resources.files("anna_agent.scales").joinpath("sass.json").open(
-        "r", encoding="utf-8"
-    ) as f:
-        sass_scale = json.load(f)
+    with (
+        importlib.resources.files("anna_agent.scales")
+        .joinpath(filename)
+        .open("r", encoding="utf-8") as f
+    ):
+        return json.load(f)
+
+
+def _scale_change_request(scale_name, filename, previous_answers, current_answers):
     messages = [
         {
             "role": "user",
             "content": (
                 "### 任务\n根据量表的问题和答案，总结出两份量表之间的变化。"
-                f"\n### 量表及问题\n{bdi_scale}"
-                f"\n### 第一份量表的答案\n{scales['p_bdi']}"
-                f"\n### 第二份量表的答案\n{scales['bdi']}"
+                f"\n### 量表及问题\n{_load_scale(filename)}"
+                f"\n### 第一份量表的答案\n{previous_answers}"
+                f"\n### 第二份量表的答案\n{current_answers}"
             ),
         },
     ]
 
-    logger.debug("BDI change messages: %s", messages)
-    # 总结bdi的变化
-    response = client.chat.completions.create(
-        model=registry.get("anna_engine_config").counselor_model_name,
+    logger.debug("%s change messages: %s", scale_name, messages)
+    cfg = registry.get("anna_engine_config")
+    return dict(
+        model=cfg.counselor_model_name,
         messages=messages,
+        temperature=cfg.llm_cache_temperature,
         tools=tools,
         tool_choice={"type": "function", "function": {"name": "summarizing_scale"}},
     )
+
+
+def _parse_scale_changes(response, scale_name, previous_answers, current_answers):
     args = extract_tool_call_arguments(response)
-    bdi_changes = (
-        args.get("changes")
-        if args and isinstance(args.get("changes"), list)
-        else _fallback_scale_changes("BDI", scales["p_bdi"], scales["bdi"])
-    )
-    messages = [
-        {
-            "role": "user",
-            "content": (
-                "### 任务\n根据量表的问题和答案，总结出两份量表之间的变化。"
-                f"\n### 量表及问题\n{ghq_scale}"
-                f"\n### 第一份量表的答案\n{scales['p_ghq']}"
-                f"\n### 第二份量表的答案\n{scales['ghq']}"
-            ),
-        },
-    ]
+    if args and isinstance(args.get("changes"), list):
+        return args.get("changes")
+    fallbacks.record("scale_changes")
+    return _fallback_scale_changes(scale_name, previous_answers, current_answers)
+
 
-    logger.debug("GHQ change messages: %s", messages)
-    # 总结ghq的变化
+def _summarize_scale(client, scale_name, filename, previous_answers, current_answers):
     response = client.chat.completions.create(
-        model=registry.get("anna_engine_config").counselor_model_name,
-        messages=messages,
-        tools=tools,
-        tool_choice={"type": "function", "function": {"name": "summarizing_scale"}},
-    )
-    args = extract_tool_call_arguments(response)
-    ghq_changes = (
-        args.get("changes")
-        if args and isinstance(args.get("changes"), list)
-        else _fallback_scale_changes("GHQ", scales["p_ghq"], scales["ghq"])
+        **_scale_change_request(scale_name, filename, previous_answers, current_answers)
     )
-    messages = [
-        {
-            "role": "user",
-            "content": (
-                "### 任务\n根据量表的问题和答案，总结出两份量表之间的变化。"
-                f"\n### 量表及问题\n{sass_scale}"
-                f"\n### 第一份量表的答案\n{scales['p_sass']}"
-                f"\n### 第二份量表的答案\n{scales['sass']}"
-            ),
-        },
-    ]
+    return _parse_scale_changes(response, scale_name, previous_answers, current_answers)
 
-    # 总结sass的变化
-    response = client.chat.completions.create(
-        model=registry.get("anna_engine_config").counselor_model_name,
-        messages=messages,
-        tools=tools,
-        tool_choice={"type": "function", "function": {"name": "summarizing_scale"}},
+
+async def _asummarize_scale(
+    client, scale_name, filename, previous_answers, current_answers
+):
+    response = await client.chat.completions.create(
+        **_scale_change_request(scale_name, filename, previous_answers, current_answers)
     )
-    args = extract_tool_call_arguments(response)
-    sass_changes = (
-        args.get("changes")
-        if args and isinstance(args.get("changes"), list)
-        else _fallback_scale_changes("SASS", scales["p_sass"], scales["sass"])
+    return _parse_scale_changes(response, scale_name, previous_answers, current_answers)
+
+
+def _unchanged_scale(scales, scale_name, key, skip_unchanged):
+    """Return the no-op diff for an unchanged scale, or ``None``."""
+
+    previous_answers, current_answers = scales[f"p_{key}"], scales[key]
+    if skip_unchanged and list(previous_answers) == list(current_answers):
+        return _fallback_scale_changes(
+            scale_name,
+            previous_answers,
+            current_answers,
+            explanation="前后两份量表答案完全一致，未调用模型。",
+        )
+    return None
+
+
+def _skip_unchanged(skip_unchanged):
+    if skip_unchanged is None:
+        cfg = registry.get("anna_engine_config")
+        skip_unchanged = bool(cfg and cfg.concurrency_skip_unchanged_scales)
+    return skip_unchanged
+
+
+def analyzing_changes(scales, concurrent=None, skip_unchanged=None):
+    """Summarize the per-item changes of BDI, GHQ-28 and SASS.
+
+    The three diffs are independent and run concurrently by default. When
+    ``skip_unchanged`` is on, a scale whose answers did not change at all is
+    reported as unchanged without calling the model.
+    """
+
+    client = get_counselor_client(cached=True)
+    cfg = registry.get("anna_engine_config")
+    if concurrent is None:
+        concurrent = bool(cfg and cfg.concurrency_scale_changes)
+    skip_unchanged = _skip_unchanged(skip_unchanged)
+
+    def summarize(scale_name, key, filename):
+        unchanged = _unchanged_scale(scales, scale_name, key, skip_unchanged)
+        if unchanged is not None:
+            return unchanged
+        return _summarize_scale(
+            client, scale_name, filename, scales[f"p_{key}"], scales[key]
+        )
+
+    # 总结bdi、ghq、sass的变化
+    if not concurrent:
+        bdi_changes, ghq_changes, sass_changes = (summarize(*scale) for scale in SCALES)
+        return bdi_changes, ghq_changes, sass_changes
+    with ThreadPoolExecutor(
+        max_workers=len(SCALES), thread_name_prefix="anna-scale-changes"
+    ) as executor:
+        futures = [submit(executor, summarize, *scale) for scale in SCALES]
+        bdi_changes, ghq_changes, sass_changes = (future.result() for future in futures)
+    return bdi_changes, ghq_changes, sass_changes
+
+
+async def aanalyzing_changes(scales, skip_unchanged=None):
+    """Async :func:`analyzing_changes`; the scale diffs are always gathered."""
+
+    client = get_async_counselor_client(cached=True)
+    skip_unchanged = _skip_unchanged(skip_unchanged)
+
+    async def summarize(scale_name, key, filename):
+        unchanged = _unchanged_scale(scales, scale_name, key, skip_unchanged)
+        if unchanged is not None:
+            return unchanged
+        return await _asummarize_scale(
+            client, scale_name, filename, scales[f"p_{key}"], scales[key]
+        )
+
+    bdi_changes, ghq_changes, sass_changes = await asyncio.gather(
+        *(summarize(*scale) for scale in SCALES)
     )
     return bdi_changes, ghq_changes, sass_changes
 
 
-def summarize_scale_changes(scales):
-    client = get_counselor_client()
-    # 获取量表变化
-    bdi_changes, ghq_changes, sass_changes = analyzing_changes(scales)
+def _status_request(bdi_changes, ghq_changes, sass_changes):
     messages = [
         {
             "role": "user",
@@ -168,18 +223,34 @@ def summarize_scale_changes(scales):
     ]
 
     logger.debug("scale summary messages: %s", messages)
-    # 总结量表变化
-    response = client.chat.completions.create(
+    return dict(
         model=registry.get("anna_engine_config").counselor_model_name,
         messages=messages,
         tools=tools,
         tool_choice={"type": "function", "function": {"name": "summarizing_changes"}},
     )
+
+
+def _parse_status(response):
     logger.debug("scale summary response: %s", response)
     args = extract_tool_call_arguments(response)
-    status = (
-        args.get("status")
-        if args and isinstance(args.get("status"), str)
-        else "模型未返回结构化状态总结，暂按量表结果保守记录为状态稳定。"
-    )
-    return status
+    if args and isinstance(args.get("status"), str):
+        return args.get("status")
+    fallbacks.record("scale_status")
+    return "模型未返回结构化状态总结，暂按量表结果保守记录为状态稳定。"
+
+
+def summarize_scale_changes(scales):
+    client = get_counselor_client()
+    # 并行获取三份量表的变化，再汇总为整体状态
+    changes = analyzing_changes(scales)
+    # 总结量表变化
+    response = client.chat.completions.create(**_status_request(*changes))
+    return _parse_status(response)
+
+
+async def asummarize_scale_changes(scales):
+    client = get_async_counselor_client()
+    changes = await aanalyzing_changes(scales)
+    response = await client.chat.completions.create(**_status_request(*changes))
+    return _parse_status(response)
@@ -1,6 +1,7 @@
 import logging
 
-from .backbone import get_counselor_client
+from .backbone import get_async_counselor_client, get_counselor_client
+from .common.fallbacks import fallbacks
 from .common.registry import registry
 from .common.tool_calls import extract_tool_call_arguments
 
@@ -29,8 +30,7 @@ tools = [
 ]
 
 
-def analyze_style(profile, conversations):
-    client = get_counselor_client()
+def _style_request(profile, conversations):
     # 提取患者信息
     patient_info = f"### 患者信息\n年龄：{profile['age']}\n性别：{profile['gender']}\n职业：{profile['occupation']}\n婚姻状况：{profile['martial_status']}\n症状：{profile['symptoms']}"
     # 提取对话记录
@@ -38,20 +38,40 @@ def analyze_style(profile, conversations):
         [f"{conv['role']}: {conv['content']}" for conv in conversations]
     )
 
-    response = client.chat.completions.create(
-        model=registry.get("anna_engine_config").counselor_model_name,
+    cfg = registry.get("anna_engine_config")
+    return dict(
+        model=cfg.counselor_model_name,
         messages=[
             {
                 "role": "user",
                 "content": f"### 任务\n根据患者情况及咨访对话历史记录分析患者的说话风格。\n{patient_info}\n### 对话记录\n{dialogue_history}",
             }
         ],
+        temperature=cfg.llm_cache_temperature,
         tools=tools,
         tool_choice={"type": "function", "function": {"name": "analyze_style"}},
     )
+
+
+def _parse_style(response):
     logger.debug("style response: %s", response)
     args = extract_tool_call_arguments(response)
     style = args.get("style") if args else None
     if not isinstance(style, list):
+        fallbacks.record("style")
         return ["表达克制", "描述具体症状"]
     return style
+
+
+def analyze_style(profile, conversations):
+    client = get_counselor_client(cached=True)
+    response = client.chat.completions.create(**_style_request(profile, conversations))
+    return _parse_style(response)
+
+
+async def aanalyze_style(profile, conversations):
+    client = get_async_counselor_client(cached=True)
+    response = await client.chat.completions.create(
+        **_style_request(profile, conversations)
+    )
+    return _parse_style(response)
@@ -49,3 +49,148 @@ memory:
     assert cfg.active_emotion_model_name == "em"
     assert cfg.memory_enabled is False
     assert cfg.memory_db_path == ".memory/db"
+
+
+def test_backbone_reuses_pooled_clients_until_reconfigured(tmp_path):
+    cfg = tmp_path / "settings.yaml"
+    cfg.write_text(
+        """
+model_service:
+  model_name: my-model
+  api_key: key
+  base_url: https://example.com/v1
+servers:
+  emotion:
+    use_sft_model: true
+    api_key: ek
+    base_url: https://e.example.com/v1
+http:
+  max_connections: 7
+  timeout: 12.5
+  max_retries: 0
+retry:
+  max_attempts: 1
+tracing:
+  enabled: false
+""",
+        encoding="utf-8",
+    )
+    mod = importlib.import_module("anna_agent.backbone")
+    mod.configure(tmp_path)
+
+    first = mod.get_openai_client()
+    assert mod.get_openai_client() is first
+    assert mod.get_counselor_client() is first
+    assert mod.get_emotion_client() is not first
+    assert first.max_retries == 0
+    assert first.timeout.read == 12.5
+
+    mod.configure(tmp_path)
+    assert mod.get_openai_client() is not first
+
+
+def test_backbone_governs_requests_per_endpoint(tmp_path):
+    import threading
+    import time
+    from types import SimpleNamespace
+
+    from anna_agent.common.governor import GovernedClient
+
+    cfg = tmp_path / "settings.yaml"
+    cfg.write_text(
+        """
+model_service:
+  model_name: my-model
+  api_key: key
+  base_url: https://example.com/v1
+servers:
+  emotion:
+    use_sft_model: true
+    api_key: ek
+    base_url: https://e.example.com/v1
+concurrency:
+  base_max_inflight: 4
+  counselor_max_inflight: 2
+  emotion_requests_per_second: 5
+retry:
+  max_attempts: 1
+tracing:
+  enabled: false
+""",
+        encoding="utf-8",
+    )
+    mod = importlib.import_module("anna_agent.backbone")
+    mod.configure(tmp_path)
+
+    base = mod.get_openai_client()
+    assert isinstance(base, GovernedClient)
+    # base and counselor share one endpoint, so the smaller cap wins
+    assert base.governor.max_inflight == 2
+    assert mod.get_counselor_client().governor is base.governor
+    emotion = mod.get_emotion_client().governor
+    assert emotion is not base.governor
+    assert (emotion.max_inflight, emotion.requests_per_second) == (0, 5)
+
+    active = peak = 0
+    lock = threading.Lock()
+
+    def create(**kwargs):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return kwargs["model"]
+
+    fake = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    client = GovernedClient(fake, base.governor)
+    threads = [
+        threading.Thread(target=client.chat.completions.create, kwargs={"model": "m"})
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
+
+
+def test_backbone_retry_layer_owns_retries(tmp_path):
+    from anna_agent.common.governor import GovernedClient
+    from anna_agent.common.retry import RetryingClient
+
+    cfg = tmp_path / "settings.yaml"
+    cfg.write_text(
+        """
+model_service:
+  model_name: my-model
+  api_key: key
+  base_url: https://example.com/v1
+concurrency:
+  base_max_inflight: 4
+http:
+  max_retries: 2
+retry:
+  max_attempts: 4
+  hedge_enabled: true
+tracing:
+  enabled: false
+""",
+        encoding="utf-8",
+    )
+    mod = importlib.import_module("anna_agent.backbone")
+    mod.configure(tmp_path)
+
+    client = mod.get_openai_client()
+    assert isinstance(client, RetryingClient)
+    assert isinstance(client.wrapped, GovernedClient)
+    assert client.policy.max_attempts == 4
+    assert client.latencies is None
+    # SDK retries are off so attempts do not multiply
+    assert client.max_retries == 0
+    hedged = mod.get_openai_client(hedged=True)
+    assert hedged.latencies is mod.get_openai_client(hedged=True).latencies
@@ -99,6 +99,122 @@ def test_workspace_to_batch_full_prompt_journey(tmp_path: Path, monkeypatch):
     assert (out_dir / "summary.jsonl").exists()
 
 
+def test_run_batch_workers_keep_summary_in_input_order(tmp_path: Path, monkeypatch):
+    import time
+
+    workspace = tmp_path / "workspace"
+    result = runner.invoke(app, ["create", str(workspace)])
+    assert result.exit_code == 0, result.output
+    template = (workspace / "cases" / "family_stress_case.json").read_text(
+        encoding="utf-8"
+    )
+    names = [f"case_{index}" for index in range(6)]
+    for name in names:
+        (workspace / "cases" / f"{name}.json").write_text(template, encoding="utf-8")
+
+    def slow_full_state(case_file: Path, progress_callback=None):
+        # 先提交的任务更晚完成，验证输出顺序不受完成顺序影响
+        if case_file.stem.startswith("case_"):
+            time.sleep(0.05 * (6 - int(case_file.stem.split("_")[1])))
+        return _fake_full_state(case_file, progress_callback)
+
+    monkeypatch.setattr("anna_agent.cli.build_full_state", slow_full_state)
+    out_dir = workspace / "runs" / "batch"
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            "batch",
+            "--workspace",
+            str(workspace),
+            "--case",
+            "cases/case_*.json",
+            "--out",
+            str(out_dir),
+            "--workers",
+            "3",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    lines = (out_dir / "summary.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["case_id"] for line in lines] == names
+
+
+def test_run_batch_resume_skips_finished_cases_and_turns(tmp_path: Path, monkeypatch):
+    workspace = tmp_path / "workspace"
+    result = runner.invoke(app, ["create", str(workspace)])
+    assert result.exit_code == 0, result.output
+    template = (workspace / "cases" / "family_stress_case.json").read_text(
+        encoding="utf-8"
+    )
+    for name in ["case_a", "case_b"]:
+        (workspace / "cases" / f"{name}.json").write_text(template, encoding="utf-8")
+    script = workspace / "script.json"
+    script.write_text(json.dumps(["m1", "m2", "m3"]), encoding="utf-8")
+
+    built = []
+    chats = []
+    fail_on = {("case_b", "m2")}
+
+    def counting_full_state(case_file: Path, progress_callback=None):
+        built.append(case_file.stem)
+        return _fake_full_state(case_file, progress_callback)
+
+    class FakeSession:
+        def __init__(self, state):
+            self.case_id = state["case_id"]
+            self.messages = []
+
+        def chat(self, message):
+            if (self.case_id, message) in fail_on:
+                raise RuntimeError("endpoint went away")
+            chats.append((self.case_id, message, len(self.messages)))
+            self.messages += [{}, {}]
+            return f"{self.case_id}:{message}"
+
+    monkeypatch.setattr("anna_agent.cli.build_full_state", counting_full_state)
+    monkeypatch.setattr("anna_agent.cli.FrozenPromptSession", FakeSession)
+    out_dir = workspace / "runs" / "batch"
+    args = [
+        "run",
+        "batch",
+        "--workspace",
+        str(workspace),
+        "--case",
+        "cases/case_*.json",
+        "--script",
+        str(script),
+        "--live",
+        "--out",
+        str(out_dir),
+    ]
+
+    result = runner.invoke(app, args)
+    assert result.exit_code != 0
+    assert built == ["case_a", "case_b"]
+
+    fail_on.clear()
+    built.clear()
+    chats.clear()
+    result = runner.invoke(app, [*args, "--resume"])
+    assert result.exit_code == 0, result.output
+    assert built == []
+    # case_b continues at turn 2 with turn 1 already in its history
+    assert chats == [("case_b", "m2", 2), ("case_b", "m3", 4)]
+    records = [
+        json.loads(line)
+        for line in (out_dir / "summary.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    assert [record["case_id"] for record in records] == ["case_a", "case_b"]
+    assert [turn["response"] for turn in records[1]["turns"]] == [
+        "case_b:m1",
+        "case_b:m2",
+        "case_b:m3",
+    ]
+    transcript = (out_dir / "case_b.transcript.jsonl").read_text(encoding="utf-8")
+    assert len(transcript.splitlines()) == 6
+
+
 def test_create_can_create_deploy_env(tmp_path: Path, monkeypatch):
     workspace = tmp_path / "workspace"
 
@@ -542,6 +658,59 @@ def test_chat_state_uses_stage_based_rich_ui(tmp_path: Path, monkeypatch):
     assert "ChatCompletion" not in result.output
 
 
+def test_chat_streams_seeker_reply_when_supported(tmp_path: Path, monkeypatch):
+    workspace = tmp_path / "workspace"
+    result = runner.invoke(app, ["create", str(workspace)])
+    assert result.exit_code == 0, result.output
+    state_file = workspace / "prompts" / "state.json"
+    state_file.write_text(
+        json.dumps(
+            {
+                "schema_version": 1,
+                "mode": "full",
+                "portrait": {},
+                "report": {},
+                "previous_conversations": [],
+                "prompt": "Act as a seeker.",
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    class FakeStreamingSession:
+        def __init__(self, state):
+            self.state = state
+
+        def chat(self, message: str) -> str:
+            raise AssertionError("streaming sessions should not use chat()")
+
+        def chat_stream(self, message: str):
+            yield "我最近"
+            yield "有点累。"
+
+    monkeypatch.setattr("anna_agent.cli.FrozenPromptSession", FakeStreamingSession)
+    transcript = workspace / "transcript.jsonl"
+
+    result = runner.invoke(
+        app,
+        [
+            "chat",
+            "--workspace",
+            str(workspace),
+            "--state",
+            str(state_file),
+            "--save",
+            str(transcript),
+        ],
+        input="你好\nq\n",
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "我最近有点累。" in result.output
+    saved = [json.loads(line) for line in transcript.read_text().splitlines()]
+    assert saved[-1] == {"role": "Seeker", "content": "我最近有点累。"}
+
+
 def test_chat_compact_ui_shows_initialization_progress(tmp_path: Path, monkeypatch):
     workspace = tmp_path / "workspace"
     result = runner.invoke(app, ["create", str(workspace)])
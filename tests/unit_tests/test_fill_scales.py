@@ -0,0 +1,69 @@
+import json
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anna_agent import fill_scales
+from anna_agent.common.registry import registry
+from anna_agent.config import AnnaEngineConfig
+
+
+def _tool_response(arguments):
+    tool_call = SimpleNamespace(
+        function=SimpleNamespace(arguments=json.dumps(arguments))
+    )
+    message = SimpleNamespace(tool_calls=[tool_call], content=None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeCompletions:
+    def __init__(self, barrier=None):
+        self.barrier = barrier
+        self.calls = []
+
+    def create(self, **kwargs):
+        name = kwargs["tool_choice"]["function"]["name"]
+        self.calls.append(name)
+        if self.barrier:
+            self.barrier.wait()
+        if name == "fill_ghq":
+            # Wrong length: the GHQ scale must fall back to its defaults.
+            return _tool_response({"answers": ["A"]})
+        return _tool_response({"answers": ["C"] * 21})
+
+
+def _fake_client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+def test_fill_scales_concurrent_mode_sends_all_scales_at_once(monkeypatch):
+    registry.register("anna_engine_config", AnnaEngineConfig())
+    completions = FakeCompletions(barrier=threading.Barrier(3, timeout=5))
+    monkeypatch.setattr(
+        fill_scales, "get_counselor_client", lambda **_: _fake_client(completions)
+    )
+
+    bdi, ghq, sass = fill_scales.fill_scales("system prompt", concurrent=True)
+
+    assert sorted(completions.calls) == ["fill_bdi", "fill_ghq", "fill_sass"]
+    assert bdi == ["C"] * 21
+    assert ghq == ["B"] * 28
+    assert sass == ["C"] * 21
+
+
+def test_fill_scales_previous_sequential_mode_keeps_scale_order(monkeypatch):
+    registry.register(
+        "anna_engine_config", AnnaEngineConfig(concurrency_scale_fills=False)
+    )
+    completions = FakeCompletions()
+    monkeypatch.setattr(
+        fill_scales, "get_counselor_client", lambda **_: _fake_client(completions)
+    )
+
+    bdi, ghq, sass = fill_scales.fill_scales_previous({"age": "30"}, {})
+
+    assert completions.calls == ["fill_bdi", "fill_ghq", "fill_sass"]
+    assert len(bdi) == 21 and len(ghq) == 28 and len(sass) == 21
@@ -0,0 +1,212 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anna_agent.common.governor import (
+    AsyncGovernedClient,
+    EndpointGovernor,
+    GovernedClient,
+)
+
+
+class Throttled(Exception):
+    status_code = 429
+
+
+def _fake_client(create):
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+def test_token_bucket_spaces_request_starts():
+    governor = EndpointGovernor(requests_per_second=50, burst=1)
+    starts = []
+    client = GovernedClient(
+        _fake_client(lambda **kwargs: starts.append(time.monotonic())), governor
+    )
+
+    for _ in range(5):
+        client.chat.completions.create(model="m")
+
+    # A late start lets the next one catch up, so check cumulative spacing.
+    assert all(start - starts[0] >= index * 0.018 for index, start in enumerate(starts))
+    assert governor.inflight == 0
+
+
+def test_adaptive_cap_halves_once_per_throttled_window_and_recovers():
+    governor = EndpointGovernor(max_inflight=8, adaptive=True, min_inflight=2)
+    started = time.monotonic()
+    for _ in range(4):
+        governor.acquire()
+    for _ in range(4):
+        governor.release(started, throttled=True)
+    assert governor.limit == 4
+    assert governor.throttled == 4
+
+    for _ in range(3):
+        governor.acquire()
+        governor.release(time.monotonic(), throttled=True)
+    assert governor.limit == 2
+
+    for _ in range(20):
+        governor.acquire()
+        governor.release(time.monotonic())
+    assert 4 < governor.limit <= 8
+
+    client = GovernedClient(_fake_client(_raise_throttled), governor)
+    with pytest.raises(Throttled):
+        client.chat.completions.create(model="m")
+    assert governor.throttled == 8
+
+
+def _raise_throttled(**kwargs):
+    raise Throttled("slow down")
+
+
+def test_threads_and_coroutines_share_one_inflight_cap():
+    governor = EndpointGovernor(max_inflight=2)
+    active = peak = 0
+    lock = threading.Lock()
+
+    def enter():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+
+    def leave():
+        nonlocal active
+        with lock:
+            active -= 1
+
+    def create(**kwargs):
+        enter()
+        time.sleep(0.02)
+        leave()
+
+    async def acreate(**kwargs):
+        enter()
+        await asyncio.sleep(0.02)
+        leave()
+
+    sync_client = GovernedClient(_fake_client(create), governor)
+    async_client = AsyncGovernedClient(_fake_client(acreate), governor)
+
+    async def run_async():
+        await asyncio.gather(
+            *(async_client.chat.completions.create(model="m") for _ in range(6))
+        )
+
+    threads = [
+        threading.Thread(
+            target=sync_client.chat.completions.create, kwargs={"model": "m"}
+        )
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    asyncio.run(run_async())
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert governor.snapshot()["inflight"] == 0
+
+
+def test_cancelled_async_waiter_gives_back_its_place():
+    governor = EndpointGovernor(max_inflight=1)
+
+    async def scenario():
+        governor.acquire()
+        waiter = asyncio.create_task(governor.aacquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        governor.release()
+        await asyncio.wait_for(governor.aacquire(), 1)
+        governor.release()
+
+    asyncio.run(scenario())
+    assert governor.snapshot() == {
+        "inflight": 0,
+        "limit": 1,
+        "waiting": 0,
+        "throttled": 0,
+    }
+
+
+def test_streams_release_their_slot_when_closed_or_dropped():
+    governor = EndpointGovernor(max_inflight=1)
+    closed = []
+
+    class Stream:
+        response = "raw"
+
+        def __init__(self):
+            self.chunks = iter(["a", "b"])
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            return next(self.chunks)
+
+        def close(self):
+            closed.append(True)
+
+    client = GovernedClient(_fake_client(lambda **_: Stream()), governor)
+
+    with client.chat.completions.create(stream=True) as stream:
+        assert next(stream) == "a"
+        assert stream.response == "raw"
+        assert governor.snapshot()["inflight"] == 1
+    assert closed == [True]
+    assert governor.snapshot()["inflight"] == 0
+
+    client.chat.completions.create(stream=True)
+    assert governor.snapshot()["inflight"] == 0
+    assert list(client.chat.completions.create(stream=True)) == ["a", "b"]
+    assert governor.snapshot()["inflight"] == 0
+
+    async def astream():
+        for chunk in ["a", "b"]:
+            yield chunk
+
+    async def acreate(**kwargs):
+        return astream()
+
+    aclient = AsyncGovernedClient(_fake_client(acreate), governor)
+
+    async def scenario():
+        stream = await aclient.chat.completions.create(stream=True)
+        async with stream:
+            assert await stream.__anext__() == "a"
+        assert governor.snapshot()["inflight"] == 0
+        stream = await aclient.chat.completions.create(stream=True)
+        assert [chunk async for chunk in stream] == ["a", "b"]
+
+    asyncio.run(scenario())
+    assert governor.snapshot()["inflight"] == 0
+
+
+def test_interrupted_token_wait_gives_back_the_slot(monkeypatch):
+    governor = EndpointGovernor(max_inflight=1, requests_per_second=1, burst=1)
+    governor.acquire()
+    governor.release()
+
+    def interrupted(delay):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(time, "sleep", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        governor.acquire()
+    assert governor.snapshot()["inflight"] == 0
@@ -0,0 +1,186 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from openai.types.chat import ChatCompletion
+
+from anna_agent.llm_cache import (
+    AsyncCachingChatClient,
+    CachingChatClient,
+    DiskCacheBackend,
+    LLMResponseCache,
+    MemoryCacheBackend,
+    cache_key,
+)
+
+
+def _completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "anna-backbone",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+        }
+    )
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return _completion(f"reply-{self.calls}")
+
+
+def _request(content: str) -> dict:
+    return {
+        "model": "anna-backbone",
+        "messages": [{"role": "user", "content": content}],
+        "tools": [],
+        "tool_choice": {"type": "function", "function": {"name": "fill_bdi"}},
+        "temperature": 0.1,
+    }
+
+
+def test_cache_key_ignores_unrelated_fields():
+    request = _request("hello")
+    assert cache_key(request) == cache_key({**request, "timeout": 30})
+    assert cache_key(request) != cache_key(_request("hello again"))
+
+
+def test_memory_backend_evicts_least_recently_used_and_expired():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.put("a", {"value": 1})
+    backend.put("b", {"value": 2})
+    assert backend.get("a") == {"value": 1}
+    assert backend.put("c", {"value": 3}) == 1
+    assert backend.get("b") is None
+    assert backend.get("a") == {"value": 1}
+
+    expiring = MemoryCacheBackend(ttl_seconds=0.01)
+    expiring.put("a", {"value": 1})
+    time.sleep(0.02)
+    assert expiring.get("a") is None
+
+
+def test_disk_backend_persists_and_enforces_size_limits(tmp_path):
+    path = tmp_path / "cache" / "llm.sqlite"
+    backend = DiskCacheBackend(path, max_entries=2)
+    backend.put("a", {"value": 1})
+    backend.put("b", {"value": 2})
+    backend.put("c", {"value": 3})
+    reopened = DiskCacheBackend(path, max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.get("c") == {"value": 3}
+
+    tiny = DiskCacheBackend(tmp_path / "tiny.sqlite", max_bytes=40)
+    tiny.put("a", {"value": "x" * 20})
+    tiny.put("b", {"value": "y" * 20})
+    assert tiny.get("a") is None
+    assert tiny.get("b") == {"value": "y" * 20}
+
+
+def test_caching_client_serves_repeated_calls_from_cache(tmp_path):
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    cache = LLMResponseCache(DiskCacheBackend(tmp_path / "llm.sqlite"))
+    cached_client = CachingChatClient(client, cache)
+
+    first = cached_client.chat.completions.create(**_request("hello"))
+    second = cached_client.chat.completions.create(**_request("hello"))
+    other = cached_client.chat.completions.create(**_request("other"))
+
+    assert completions.calls == 2
+    assert first.choices[0].message.content == "reply-1"
+    assert second.choices[0].message.content == "reply-1"
+    assert other.choices[0].message.content == "reply-2"
+    assert cache.snapshot() == {"hits": 1, "misses": 2, "writes": 2, "evictions": 0}
+
+
+def test_async_caching_client_awaits_only_on_miss(tmp_path):
+    completions = FakeCompletions()
+
+    async def create(**kwargs):
+        return completions.create(**kwargs)
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    cache = LLMResponseCache(MemoryCacheBackend())
+    cached_client = AsyncCachingChatClient(client, cache)
+
+    async def run():
+        first = await cached_client.chat.completions.create(**_request("hello"))
+        second = await cached_client.chat.completions.create(**_request("hello"))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert completions.calls == 1
+    assert second.choices[0].message.content == first.choices[0].message.content
+
+    # SQLite I/O runs in worker threads, not on the event loop.
+    disk = DiskCacheBackend(tmp_path / "llm.sqlite")
+    threads = []
+    for name in ["get", "put"]:
+        method = getattr(disk, name)
+
+        def traced(*args, method=method):
+            threads.append(threading.current_thread())
+            return method(*args)
+
+        setattr(disk, name, traced)
+    cached_client = AsyncCachingChatClient(client, LLMResponseCache(disk))
+
+    first, second = asyncio.run(run())
+    assert completions.calls == 2
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
+
+
+def _tool_completion(arguments: str) -> ChatCompletion:
+    tool_call = {
+        "id": "call-1",
+        "type": "function",
+        "function": {"name": "fill_bdi", "arguments": arguments},
+    }
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "anna-backbone",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "tool_calls",
+                    "message": {"role": "assistant", "tool_calls": [tool_call]},
+                }
+            ],
+        }
+    )
+
+
+def test_cache_skips_tool_calls_whose_arguments_do_not_parse():
+    cache = LLMResponseCache(MemoryCacheBackend())
+    request = {**_request("hello"), "tools": [{"type": "function"}]}
+
+    cache.put(request, _tool_completion('{"answers": ["A"'))
+    assert cache.get(request) is None
+
+    cache.put(request, _tool_completion('{"answers": ["A"]}'))
+    assert cache.get(request) is not None
+    assert cache.snapshot()["writes"] == 1
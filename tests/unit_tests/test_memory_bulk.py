@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anna_agent.case_data import sample_case, write_case_json
+from anna_agent.memory import LanceMemoryStore
+from anna_agent.memory.bulk import bulk_index
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.calls = []
+
+    def embed_texts(self, texts):
+        self.calls.append(len(texts))
+        return [[1.0, 0.0, 0.0] for _ in texts]
+
+
+def _case_files(tmp_path: Path, count: int) -> list[Path]:
+    files = []
+    for index in range(count):
+        case = sample_case()
+        case["id"] = f"case-{index}"
+        case["seeker_id"] = f"seeker-{index}"
+        path = tmp_path / "cases" / f"case-{index}.json"
+        write_case_json(case, path)
+        files.append(path)
+    return files
+
+
+def test_bulk_index_chunks_in_processes_and_writes_in_large_batches(tmp_path):
+    embedder = FakeEmbeddingService()
+    store = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=embedder,
+    )
+    files = _case_files(tmp_path, 3)
+
+    result = bulk_index(
+        store, files, window_size=4, window_stride=2, workers=2, write_rows=10**6
+    )
+
+    assert result.cases == 3
+    assert result.added == result.chunks == store._table.count_rows()
+    assert result.writes == 1
+    assert embedder.calls == [result.chunks]
+    assert [s.seeker_id for s in store.sessions.page()] == [
+        "seeker-0",
+        "seeker-1",
+        "seeker-2",
+    ]
+
+    again = bulk_index(store, files, window_size=4, window_stride=2, write_rows=1)
+    assert again.added == 0
+    assert again.writes == 0
+    assert again.cases == 3
+    assert embedder.calls[1:] == [0] * result.chunks
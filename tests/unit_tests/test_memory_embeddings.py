@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import math
+import re
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from openai import APIConnectionError, BadRequestError, InternalServerError
+
+from anna_agent.config import AnnaEngineConfig
+from anna_agent.memory import EmbeddingService, embeddings
+from anna_agent.memory.embeddings import HashEmbeddingProvider
+
+
+class FakeEmbeddings:
+    def __init__(self, failures=0, error=None):
+        self.inputs = []
+        self.failures = failures
+        self.error = error
+        self._lock = threading.Lock()
+
+    def create(self, model, input):  # noqa: A002
+        with self._lock:
+            self.inputs.append(list(input))
+            if self.failures:
+                self.failures -= 1
+                raise self.error or APIConnectionError(request=None)
+        # 打乱返回顺序，提供方按 index 字段还原
+        data = [
+            SimpleNamespace(index=index, embedding=[float(len(text))])
+            for index, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+def _reference_hash_embedding(text, dimension):
+    vector = [0.0] * dimension
+    tokens = re.findall(r"[\w]+|[\u4e00-\u9fff]", text.lower())
+    for token in tokens or [text]:
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        index = int.from_bytes(digest[:8], "big") % dimension
+        vector[index] += 1.0 if digest[8] % 2 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        return vector
+    return [value / norm for value in vector]
+
+
+def test_hash_embeddings_match_per_text_reference_bit_for_bit():
+    texts = [
+        "Seeker: 最近压力很大，晚上睡不着 sleep sleep",
+        "",
+        "!!!",
+        "Counselor: How long has this been going on?",
+        "焦虑" * 50,
+    ]
+    for dimension in (7, 1536):
+        vectors = HashEmbeddingProvider(dimension).embed_texts(texts)
+        assert vectors == [_reference_hash_embedding(t, dimension) for t in texts]
+
+
+def _provider(fake, **kwargs):
+    return embeddings.OpenAIEmbeddingProvider(
+        "key",
+        "http://localhost",
+        "model",
+        client=SimpleNamespace(embeddings=fake),
+        **kwargs,
+    )
+
+
+def test_provider_splits_requests_by_count_and_token_budget():
+    fake = FakeEmbeddings()
+    provider = _provider(fake, batch_size=3, max_batch_tokens=20, concurrency=2)
+    texts = ["a", "bb", "ccc", "dddd", "x" * 60, "y"]
+
+    vectors = provider.embed_texts(texts)
+
+    assert vectors == [[float(len(text))] for text in texts]
+    assert sorted(fake.inputs) == sorted(
+        [["a", "bb", "ccc"], ["dddd"], ["x" * 60], ["y"]]
+    )
+
+
+def test_provider_retries_transient_errors_with_backoff(monkeypatch):
+    delays = []
+    monkeypatch.setattr(embeddings.time, "sleep", delays.append)
+    response = SimpleNamespace(status_code=503, headers={}, request=None)
+    error = InternalServerError("overloaded", response=response, body=None)
+    fake = FakeEmbeddings(failures=2, error=error)
+    provider = _provider(fake, max_retries=3, retry_backoff=0.5)
+
+    assert provider.embed_texts(["a"]) == [[1.0]]
+    assert delays == [0.5, 1.0]
+
+
+def test_provider_does_not_retry_bad_requests_or_connection_errors(monkeypatch):
+    monkeypatch.setattr(embeddings.time, "sleep", lambda delay: None)
+    response = SimpleNamespace(status_code=400, headers={}, request=None)
+    bad_request = BadRequestError("too long", response=response, body=None)
+
+    for error, error_type in [
+        (bad_request, BadRequestError),
+        (None, APIConnectionError),
+    ]:
+        fake = FakeEmbeddings(failures=5, error=error)
+        try:
+            _provider(fake).embed_texts(["a"])
+        except error_type:
+            pass
+        assert len(fake.inputs) == 1
+
+
+def test_service_reuses_provider_and_warns_on_hash_fallback(monkeypatch, caplog):
+    built = []
+    calls = []
+    now = [0.0]
+
+    class FailingProvider:
+        @classmethod
+        def from_config(cls, config):
+            built.append(config)
+            return cls()
+
+        def embed_texts(self, texts):
+            calls.append(texts)
+            raise RuntimeError("endpoint down")
+
+    monkeypatch.setattr(embeddings, "OpenAIEmbeddingProvider", FailingProvider)
+    config = AnnaEngineConfig(embedding_dimension=8, embedding_failure_cooldown=30)
+    service = EmbeddingService(config, clock=lambda: now[0])
+
+    with caplog.at_level(logging.WARNING, logger=embeddings.__name__):
+        first = service.embed_texts(["焦虑"])
+        # 冷却期内不再请求远端
+        now[0] = 10
+        assert service.embed_texts(["失眠"]) == service.hash_provider.embed_texts(
+            ["失眠"]
+        )
+        now[0] = 31
+        service.embed_texts(["失眠"])
+
+    assert first == service.hash_provider.embed_texts(["焦虑"])
+    assert len(built) == 1
+    assert calls == [["焦虑"], ["失眠"]]
+    assert "using hash embeddings" in caplog.text
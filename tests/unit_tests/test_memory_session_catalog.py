@@ -0,0 +1,45 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anna_agent.memory import MemorySession, SessionCatalog
+
+
+def _session(seeker_id: str, index: int, summary: str = "") -> MemorySession:
+    return MemorySession(
+        seeker_id=seeker_id,
+        case_id=f"case-{seeker_id}",
+        session_id=f"session-{index:03d}",
+        session_index=index,
+        summary=summary or f"第{index}次会谈",
+        metadata={"source": "test"},
+    )
+
+
+def test_session_catalog_upserts_and_pages_by_seeker(tmp_path):
+    catalog = SessionCatalog(tmp_path / "sessions.sqlite")
+    catalog.upsert_many([_session("b", 2), _session("a", 1), _session("b", 1)])
+    catalog.upsert(_session("b", 2, summary="更新后的摘要"))
+
+    assert catalog.count() == 3
+    assert [s.session_index for s in catalog.for_seeker("b")] == [1, 2]
+    assert catalog.for_seeker("b")[1].summary == "更新后的摘要"
+    assert catalog.for_seeker("b")[1].metadata == {"source": "test"}
+    page = catalog.page(offset=1, limit=1)
+    assert [(s.seeker_id, s.session_index) for s in page] == [("b", 1)]
+
+
+def test_session_catalog_migrates_legacy_sessions_json(tmp_path):
+    legacy = tmp_path / "sessions.json"
+    legacy.write_text(
+        json.dumps([{**_session("a", 1).__dict__, "unknown_field": 1}]),
+        encoding="utf-8",
+    )
+
+    catalog = SessionCatalog(tmp_path / "sessions.sqlite")
+
+    assert catalog.count("a") == 1
+    assert not legacy.exists()
+    assert (tmp_path / "sessions.json.migrated").exists()
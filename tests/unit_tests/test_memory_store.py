@@ -3,7 +3,16 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
 
-from anna_agent.memory import LanceMemoryStore, MemoryChunk
+from anna_agent.config import AnnaEngineConfig
+from anna_agent.memory import (
+    EmbeddingCache,
+    EmbeddingService,
+    LanceMemoryStore,
+    MemoryChunk,
+    MemoryIndexSettings,
+    embeddings,
+)
+from anna_agent.memory.embeddings import HashEmbeddingProvider
 
 
 class FakeEmbeddingService:
@@ -14,14 +23,9 @@ class FakeEmbeddingService:
         return [1.0, 0.0, 0.0]
 
 
-def test_lance_memory_store_skips_duplicate_chunks(tmp_path):
-    store = LanceMemoryStore(
-        db_path=tmp_path / "lancedb",
-        table_name="chunks",
-        embedding_service=FakeEmbeddingService(),
-    )
-    chunk = MemoryChunk(
-        id="chunk-1",
+def _chunk(index: int) -> MemoryChunk:
+    return MemoryChunk(
+        id=f"chunk-{index}",
         seeker_id="seeker-1",
         case_id="case-1",
         session_id="session-1",
@@ -30,8 +34,272 @@ def test_lance_memory_store_skips_duplicate_chunks(tmp_path):
         memory_type="conversation_turn",
         text="Seeker: 最近压力很大",
         text_for_embedding="Seeker: 最近压力很大",
-        source_hash="hash-1",
+        source_hash=f"hash-{index}",
+    )
+
+
+def test_lance_memory_store_skips_duplicate_chunks(tmp_path):
+    store = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=FakeEmbeddingService(),
     )
+    chunk = _chunk(1)
 
     assert store.add_chunks([chunk]) == 1
     assert store.add_chunks([chunk]) == 0
+
+
+def test_lance_memory_store_reuses_table_handle_and_sees_new_versions(tmp_path):
+    reader = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=FakeEmbeddingService(),
+        read_consistency_interval=0,
+    )
+    writer = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=FakeEmbeddingService(),
+    )
+    assert reader.search("压力", seeker_id="seeker-1") == []
+
+    writer.add_chunks([_chunk(1)])
+    assert len(reader.search("压力", seeker_id="seeker-1")) == 1
+    table = reader._table
+
+    writer.add_chunks([_chunk(2)])
+    assert len(reader.search("压力", seeker_id="seeker-1")) == 2
+    assert reader._table is table
+
+
+def test_lance_memory_store_dedups_through_source_hash_index(tmp_path):
+    store = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=FakeEmbeddingService(),
+    )
+    assert store.add_chunks([_chunk(1), _chunk(2), _chunk(2)]) == 2
+
+    table = store._table
+    indexed = [index.columns for index in table.list_indices()]
+    assert ["source_hash"] in indexed
+
+    def full_scan():
+        raise AssertionError("dedup must not materialize the whole table")
+
+    table.to_arrow = full_scan
+    table.to_list = full_scan
+    assert store.add_chunks([_chunk(1), _chunk(3)]) == 1
+    assert table.count_rows() == 3
+
+
+def test_add_chunks_embeds_only_new_chunks(tmp_path):
+    embedder = FakeEmbeddingService()
+    embedded = []
+    embed_texts = embedder.embed_texts
+    embedder.embed_texts = lambda texts: embedded.append(texts) or embed_texts(texts)
+    store = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=embedder,
+    )
+
+    assert store.add_chunks([_chunk(1), _chunk(2)]) == 2
+    assert store.add_chunks([_chunk(1), _chunk(2)]) == 0
+    assert store.add_chunks([_chunk(2), _chunk(3)]) == 1
+
+    assert [len(texts) for texts in embedded] == [2, 0, 1]
+
+
+def test_embedding_service_caches_vectors_by_model_and_text(tmp_path, monkeypatch):
+    calls = []
+
+    class FakeProvider:
+        @classmethod
+        def from_config(cls, config):
+            return cls()
+
+        def embed_texts(self, texts):
+            calls.append(list(texts))
+            return [[0.1 * len(text), 0.2, 0.3] for text in texts]
+
+    monkeypatch.setattr(embeddings, "OpenAIEmbeddingProvider", FakeProvider)
+    config = AnnaEngineConfig(embedding_model_name="m1", embedding_dimension=3)
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite")
+
+    first = EmbeddingService(config, cache=cache).embed_texts(["a", "bb", "a"])
+    second = EmbeddingService(config, cache=cache).embed_texts(["bb", "ccc"])
+
+    assert calls == [["a", "bb"], ["ccc"]]
+    assert first[0] == first[2] == [0.1, 0.2, 0.3]
+    assert second[0] == first[1]
+    assert len(cache) == 3
+
+    other = AnnaEngineConfig(embedding_model_name="m2", embedding_dimension=3)
+    EmbeddingService(other, cache=cache).embed_texts(["a"])
+    assert calls[-1] == ["a"]
+
+
+def test_search_does_not_cache_hash_fallback_query_vectors(tmp_path, monkeypatch):
+    down = [False]
+    queries = []
+
+    class FlakyProvider:
+        @classmethod
+        def from_config(cls, config):
+            return cls()
+
+        def embed_texts(self, texts):
+            if down[0]:
+                raise RuntimeError("endpoint down")
+            queries.extend(texts)
+            return [[1.0, 0.0, 0.0] for _ in texts]
+
+    monkeypatch.setattr(embeddings, "OpenAIEmbeddingProvider", FlakyProvider)
+    config = AnnaEngineConfig(embedding_dimension=3, embedding_failure_cooldown=0)
+    store = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=EmbeddingService(config),
+    )
+    store.add_chunks([_chunk(1)])
+    queries.clear()
+
+    down[0] = True
+    store.search("压力", seeker_id="seeker-1", mode="vector")
+    assert len(store._query_vectors) == len(store._hits) == 0
+
+    down[0] = False
+    store.search("压力", seeker_id="seeker-1", mode="vector")
+    store.search("压力", seeker_id="seeker-1", mode="vector")
+    assert queries == ["压力"]
+    assert len(store._hits) == 1
+
+
+class HashEmbeddingService:
+    def __init__(self, dimension):
+        self.provider = HashEmbeddingProvider(dimension)
+
+    def embed_texts(self, texts):
+        return self.provider.embed_texts(texts)
+
+    def embed_query(self, text):
+        return self.embed_texts([text])[0]
+
+
+def _turn(index: int) -> MemoryChunk:
+    chunk = _chunk(index)
+    chunk.seeker_id = f"seeker-{index % 3}"
+    chunk.text_for_embedding = f"Seeker: 第{index}次 turn {index} 睡眠 {index * 7}"
+    return chunk
+
+
+def test_lance_memory_store_builds_and_maintains_vector_index(tmp_path):
+    store = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=HashEmbeddingService(8),
+        index_settings=MemoryIndexSettings(
+            min_rows=300, optimize_rows=50, num_partitions=2, num_sub_vectors=2
+        ),
+    )
+    store.add_chunks([_turn(index) for index in range(200)])
+    table = store._table
+    assert store._vector_index_stats(table) is None
+    indexed = {tuple(index.columns) for index in table.list_indices()}
+    assert {("source_hash",), ("seeker_id",)} <= indexed
+
+    store.add_chunks([_turn(index) for index in range(200, 320)])
+    stats = store._vector_index_stats(table)
+    assert stats.index_type == "IVF_PQ"
+    assert stats.num_unindexed_rows == 0
+
+    store.add_chunks([_turn(index) for index in range(320, 340)])
+    assert store._vector_index_stats(table).num_unindexed_rows == 20
+    result = store.optimize()
+    assert result["rows"] == 340
+    assert result["unindexed_rows"] == 0
+
+    hits = store.search("睡眠", seeker_id="seeker-1", top_k=5)
+    assert len(hits) == 5
+    assert {hit.seeker_id for hit in hits} == {"seeker-1"}
+
+
+def test_scalar_and_full_text_indexes_are_optimized_without_vector_index(tmp_path):
+    store = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=HashEmbeddingService(8),
+        index_settings=MemoryIndexSettings(index_type="none", optimize_rows=30),
+    )
+    store.add_chunks([_turn(index) for index in range(10)])
+    table = store._table
+    store.add_chunks([_turn(index) for index in range(10, 30)])
+    assert store._unindexed_rows(table) == 20
+
+    store.add_chunks([_turn(index) for index in range(30, 40)])
+    assert store._vector_index_stats(table) is None
+    assert store._unindexed_rows(table) == 0
+
+
+def test_hybrid_search_fuses_full_text_and_vector_rankings(tmp_path):
+    store = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=FakeEmbeddingService(),
+    )
+    chunks = [_chunk(index) for index in range(1, 5)]
+    chunks[2].text = "Seeker: 医生给我开了舍曲林，吃了两周"
+    chunks[3].seeker_id = "seeker-2"
+    chunks[3].text = "Seeker: 我也在吃舍曲林"
+    store.add_chunks(chunks[:3])
+    # 建表之后写入的行尚未进入全文索引，也要能被检索到
+    store.add_chunks(chunks[3:])
+
+    vector_hits = store.search("舍曲林", seeker_id="seeker-1", top_k=1, mode="vector")
+    hybrid_hits = store.search("舍曲林", seeker_id="seeker-1", top_k=2)
+    other_hits = store.search("舍曲林", seeker_id="seeker-2", top_k=1)
+
+    assert vector_hits[0].id == "chunk-1"
+    assert hybrid_hits[0].id == "chunk-3"
+    assert len(hybrid_hits) == 2
+    assert hybrid_hits[0].score > hybrid_hits[1].score
+    assert other_hits[0].id == "chunk-4"
+
+
+def test_search_caches_query_vectors_and_hits_per_seeker(tmp_path):
+    embedder = FakeEmbeddingService()
+    queries = []
+    embed_query = embedder.embed_query
+    embedder.embed_query = lambda text: queries.append(text) or embed_query(text)
+    store = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=embedder,
+    )
+    other = _chunk(2)
+    other.seeker_id = "seeker-2"
+    store.add_chunks([_chunk(1), other])
+
+    first = store.search("压力", seeker_id="seeker-1", mode="vector")
+    assert store.search("压力", seeker_id="seeker-1", mode="vector") == first
+    store.search("压力", seeker_id="seeker-2", mode="vector")
+    assert queries == ["压力"]
+    assert len(store._hits) == 2
+
+    store.add_chunks([_chunk(3)])
+    assert len(store._hits) == 1
+    assert len(store.search("压力", seeker_id="seeker-1", mode="vector")) == 2
+    assert queries == ["压力"]
+
+    outside = LanceMemoryStore(
+        db_path=tmp_path / "lancedb",
+        table_name="chunks",
+        embedding_service=FakeEmbeddingService(),
+    )
+    newer = _chunk(4)
+    newer.seeker_id = "seeker-2"
+    outside.add_chunks([newer])
+    store._table.checkout_latest()
+    assert len(store.search("压力", seeker_id="seeker-2", mode="vector")) == 2
@@ -0,0 +1,214 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anna_agent import ms_patient
+from anna_agent import ms_patient_with_prompt as legacy
+from anna_agent.common.registry import registry
+from anna_agent.config import AnnaEngineConfig
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.messages = []
+
+    def create(self, **kwargs):
+        self.messages.append(kwargs["messages"])
+        if kwargs.get("stream"):
+            return iter(
+                SimpleNamespace(
+                    choices=[SimpleNamespace(delta=SimpleNamespace(content=text))]
+                )
+                for text in ["我最近", "", "睡得不好。"]
+            )
+        message = SimpleNamespace(content="我最近睡得不好。")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _seeker():
+    seeker = ms_patient.MsPatient.__new__(ms_patient.MsPatient)
+    seeker.portrait = {"age": "30"}
+    seeker.report = {}
+    seeker.previous_conversations = []
+    seeker.conversation = []
+    seeker.messages = []
+    seeker.complaint_chain = [
+        {"stage": 1, "content": "失眠"},
+        {"stage": 2, "content": "工作压力"},
+    ]
+    seeker.chain_index = 1
+    seeker.system = "Act as a seeker."
+    seeker.last_turn_context = {}
+    seeker.memory_store = None
+    seeker.seeker_id = "seeker-1"
+    seeker.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    return seeker
+
+
+def _patch_turn_helpers(monkeypatch, barrier=None):
+    def wait():
+        if barrier:
+            barrier.wait()
+
+    def fake_emotion(portrait, conversation):
+        wait()
+        return "sadness"
+
+    def fake_switch(chain, index, conversation):
+        wait()
+        return index
+
+    def fake_is_need(message):
+        wait()
+        return True
+
+    monkeypatch.setattr(ms_patient, "emotion_modulation", fake_emotion)
+    monkeypatch.setattr(ms_patient, "switch_complaint", fake_switch)
+    monkeypatch.setattr(ms_patient, "is_need", fake_is_need)
+    monkeypatch.setattr(ms_patient, "query", lambda *args, **kwargs: "上次聊到失眠")
+
+
+def test_chat_runs_turn_helpers_concurrently(monkeypatch):
+    registry.register("anna_engine_config", AnnaEngineConfig(model_name="m"))
+    _patch_turn_helpers(monkeypatch, barrier=threading.Barrier(3, timeout=5))
+    seeker = _seeker()
+
+    assert seeker.chat("你还记得上次说的吗？") == "我最近睡得不好。"
+
+    reminder = seeker.client.chat.completions.messages[-1][-1]["content"]
+    assert "sadness" in reminder
+    assert "上次聊到失眠" in reminder
+    assert seeker.last_turn_context["memory_used"] is True
+    assert seeker.conversation[-1] == {"role": "Seeker", "content": "我最近睡得不好。"}
+
+
+def test_chat_stream_yields_fragments_and_records_turn(monkeypatch):
+    registry.register(
+        "anna_engine_config",
+        AnnaEngineConfig(model_name="m", concurrency_turn_pipeline=False),
+    )
+    _patch_turn_helpers(monkeypatch)
+    seeker = _seeker()
+
+    fragments = list(seeker.chat_stream("你好"))
+
+    assert fragments == ["我最近", "睡得不好。"]
+    assert seeker.conversation[-1] == {"role": "Seeker", "content": "我最近睡得不好。"}
+    assert seeker.messages[-1]["content"] == "我最近睡得不好。"
+
+
+def test_chat_stream_closed_early_keeps_history_alternating(monkeypatch):
+    registry.register(
+        "anna_engine_config",
+        AnnaEngineConfig(model_name="m", concurrency_turn_pipeline=False),
+    )
+    _patch_turn_helpers(monkeypatch)
+    seeker = _seeker()
+
+    stream = seeker.chat_stream("你好")
+    assert next(stream) == "我最近"
+    stream.close()
+    assert [m["role"] for m in seeker.messages] == ["user", "assistant"]
+    assert seeker.conversation[-1] == {"role": "Seeker", "content": "我最近"}
+
+    def broken(**kwargs):
+        raise RuntimeError("endpoint went away")
+
+    seeker.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=broken))
+    )
+    # 出错且未产出任何内容时撤回本轮咨询师消息
+    assert list(seeker.chat_stream("还在吗？")) == []
+    assert len(seeker.messages) == len(seeker.conversation) == 2
+
+
+def test_achat_gathers_async_turn_helpers(monkeypatch):
+    registry.register("anna_engine_config", AnnaEngineConfig(model_name="m"))
+    started = []
+
+    async def gate(name, value):
+        started.append(name)
+        # 三个检查都启动之后才返回，证明它们在同一事件循环上并发
+        while len(started) < 3:
+            await asyncio.sleep(0)
+        return value
+
+    monkeypatch.setattr(
+        ms_patient, "aemotion_modulation", lambda *args: gate("emotion", "sadness")
+    )
+    monkeypatch.setattr(
+        ms_patient, "aswitch_complaint", lambda chain, index, conv: gate("chain", index)
+    )
+    monkeypatch.setattr(ms_patient, "ais_need", lambda message: gate("need", False))
+    completions = FakeCompletions()
+
+    async def create(**kwargs):
+        return completions.create(**kwargs)
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    monkeypatch.setattr(ms_patient, "get_async_openai_client", lambda **_: client)
+    seeker = _seeker()
+
+    response = asyncio.run(seeker.achat("你好"))
+
+    assert response == "我最近睡得不好。"
+    assert sorted(started) == ["chain", "emotion", "need"]
+    assert [item["role"] for item in seeker.conversation] == ["Counselor", "Seeker"]
+    assert seeker.last_turn_context["complaint"] == "失眠"
+    assert seeker.last_turn_context["memory_used"] is False
+
+
+def test_memory_lookup_uses_each_seekers_own_store(monkeypatch):
+    registry.register(
+        "anna_engine_config", AnnaEngineConfig(model_name="m", memory_enabled=True)
+    )
+    monkeypatch.setattr(ms_patient, "is_need", lambda message: True)
+
+    async def ais_need(message):
+        return True
+
+    monkeypatch.setattr(ms_patient, "ais_need", ais_need)
+
+    class FakeStore:
+        def __init__(self, text):
+            self.text = text
+
+        def search(self, utterance, seeker_id, top_k, mode):
+            return [(seeker_id, self.text)]
+
+        def format_hits(self, hits):
+            return "; ".join(f"{seeker}:{text}" for seeker, text in hits)
+
+    first, second = _seeker(), _seeker()
+    first.memory_store, first.seeker_id = FakeStore("失眠"), "a"
+    second.memory_store, second.seeker_id = FakeStore("搬家"), "b"
+
+    assert first._lookup_memory("上次说的") == "a:失眠"
+    assert second._lookup_memory("上次说的") == "b:搬家"
+    assert asyncio.run(second._alookup_memory("上次说的")) == "b:搬家"
+
+
+def test_prompt_only_seeker_queries_its_own_store(monkeypatch):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    queried = []
+    monkeypatch.setattr(legacy, "get_openai_client", lambda: client)
+    monkeypatch.setattr(
+        legacy, "open_long_term_memory", lambda seeker_id, *_: f"store-{seeker_id}"
+    )
+    monkeypatch.setattr(legacy, "is_need", lambda message: True)
+    monkeypatch.setattr(legacy, "query", lambda *_, **kwargs: queried.append(kwargs))
+    monkeypatch.setattr(legacy, "emotion_modulation", lambda *_: "平静")
+    monkeypatch.setattr(legacy, "switch_complaint", lambda *_: 1)
+    monkeypatch.setattr(legacy, "transform_chain", lambda chain: ["", "失眠"])
+    registry.register("anna_engine_config", AnnaEngineConfig(model_name="m"))
+
+    seeker = legacy.MsPatient({"_seeker_id": "s-1"}, {}, [], [], "Act as a seeker.")
+    seeker.chat("上次说的")
+
+    assert queried == [{"store": "store-s-1", "seeker_id": "s-1"}]
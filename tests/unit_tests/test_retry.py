@@ -0,0 +1,171 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anna_agent.common.fallbacks import fallbacks
+from anna_agent.common.retry import (
+    AsyncRetryingClient,
+    LatencyWindow,
+    RetryingClient,
+    RetryPolicy,
+    retry_stats,
+)
+from anna_agent.fill_scales import _extract_answers
+from anna_agent.short_term_memory import _parse_status
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def _fake_client(create):
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+def _policy(**overrides):
+    values = dict(max_attempts=3, backoff=0.001, max_backoff=0.01, deadline=5.0)
+    values.update(overrides)
+    return RetryPolicy(**values)
+
+
+def test_transient_errors_are_retried_until_success():
+    retry_stats.reset()
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) < 3:
+            raise StatusError(502)
+        return "ok"
+
+    client = RetryingClient(_fake_client(create), _policy())
+
+    assert client.chat.completions.create(model="m") == "ok"
+    assert len(calls) == 3
+    assert all(0 < call["timeout"] <= 5.0 for call in calls)
+    assert retry_stats.snapshot()["retries"] == 2
+
+    # Without a deadline the client's own HTTP timeout is left alone.
+    calls.clear()
+    client = RetryingClient(_fake_client(create), RetryPolicy(backoff=0.001))
+    assert client.chat.completions.create(model="m") == "ok"
+    assert all("timeout" not in call for call in calls)
+
+
+def test_client_errors_and_exhausted_deadlines_are_not_retried():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        raise StatusError(400 if len(calls) == 1 else 503)
+
+    client = RetryingClient(_fake_client(create), _policy())
+    with pytest.raises(StatusError):
+        client.chat.completions.create(model="m")
+    assert len(calls) == 1
+
+    retry_stats.reset()
+    client = RetryingClient(
+        _fake_client(create), _policy(backoff=1.0, max_backoff=1.0, deadline=0.5)
+    )
+    with pytest.raises(StatusError):
+        client.chat.completions.create(model="m", timeout=3)
+    assert len(calls) == 2
+    assert calls[-1]["timeout"] == 3
+    assert retry_stats.snapshot()["deadline_exceeded"] == 1
+
+
+def test_slow_request_is_hedged_and_the_faster_copy_wins():
+    retry_stats.reset()
+    window = LatencyWindow()
+    for _ in range(20):
+        window.add(0.01)
+    calls = []
+
+    def create(**kwargs):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    client = RetryingClient(
+        _fake_client(create), _policy(hedge_min_delay=0.02), latencies=window
+    )
+
+    started = time.monotonic()
+    assert client.chat.completions.create(model="m") == "fast"
+    assert time.monotonic() - started < 0.4
+    assert retry_stats.snapshot()["hedges"] == 1
+    assert retry_stats.snapshot()["hedge_wins"] == 1
+
+
+def test_failed_first_attempt_is_covered_by_the_hedge():
+    retry_stats.reset()
+    window = LatencyWindow()
+    for _ in range(20):
+        window.add(0.01)
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            time.sleep(0.2)
+            raise StatusError(400)
+        return "hedge"
+
+    client = RetryingClient(
+        _fake_client(create), _policy(hedge_min_delay=0.02), latencies=window
+    )
+
+    assert client.chat.completions.create(model="m") == "hedge"
+    assert retry_stats.snapshot()["hedge_wins"] == 1
+
+
+def test_async_hedge_cancels_the_losing_request():
+    window = LatencyWindow()
+    for _ in range(20):
+        window.add(0.01)
+    calls = []
+    cancelled = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        try:
+            await asyncio.sleep(0.5 if len(calls) == 1 else 0)
+        except asyncio.CancelledError:
+            cancelled.append(len(calls))
+            raise
+        return f"call {len(calls)}"
+
+    async def scenario():
+        client = AsyncRetryingClient(
+            _fake_client(create), _policy(hedge_min_delay=0.02), latencies=window
+        )
+        return await client.chat.completions.create(model="m")
+
+    started = time.monotonic()
+    assert asyncio.run(scenario()) == "call 2"
+    assert time.monotonic() - started < 0.4
+    assert cancelled == [2]
+
+
+def test_fallbacks_are_counted_by_site():
+    fallbacks.reset()
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace())])
+
+    assert _extract_answers(response, 3) == ["B", "B", "B"]
+    assert _extract_answers(response, 2) == ["B", "B"]
+    assert _parse_status(response).startswith("模型未返回")
+
+    assert fallbacks.snapshot() == {"scale_answers": 2, "scale_status": 1}
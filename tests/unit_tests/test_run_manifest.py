@@ -0,0 +1,25 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anna_agent.run_manifest import RunManifest
+
+
+def test_resume_cuts_torn_last_line_before_appending(tmp_path: Path):
+    path = tmp_path / "manifest.jsonl"
+    case_file = tmp_path / "case.json"
+    manifest = RunManifest(path)
+    manifest.state_built(case_file, "case", tmp_path / "state.json")
+    manifest.turn_done(case_file, 1, "m1", "r1")
+    with path.open("a", encoding="utf-8") as file:
+        file.write('{"event": "turn", "case": "')
+
+    resumed = RunManifest(path, resume=True)
+    assert resumed.get(case_file).turns == [{"message": "m1", "response": "r1"}]
+    resumed.turn_done(case_file, 2, "m2", "r2")
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ["state", "turn", "turn"]
+    assert len(RunManifest(path, resume=True).get(case_file).turns) == 2
@@ -0,0 +1,335 @@
+import asyncio
+import json
+import sys
+import threading
+import urllib.request
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anna_agent import runtime, service
+from anna_agent.async_service import AsyncService
+from anna_agent.common.registry import registry
+from anna_agent.config import AnnaEngineConfig
+from anna_agent.session_manager import SessionManager
+
+
+class FakeCompletions:
+    def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        return iter(
+            SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=text))]
+            )
+            for text in ["我最近", "有点累。"]
+        )
+
+
+class FakeAsyncCompletions:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        message = SimpleNamespace(content=f"reply-{self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _write_state(path: Path) -> None:
+    path.write_text(
+        json.dumps(
+            {
+                "mode": "full",
+                "portrait": {},
+                "report": {},
+                "previous_conversations": [],
+                "prompt": "Act as a seeker.",
+                "model_name": "m",
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+async def _request(reader, writer, method: str, path: str, body=None):
+    raw = json.dumps(body or {}).encode("utf-8")
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\n"
+        f"Content-Length: {len(raw)}\r\n\r\n".encode("latin-1")
+        + raw
+    )
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    status = int(head.split(" ", 2)[1])
+    length = int(head.lower().split("content-length: ", 1)[1].split("\r\n", 1)[0])
+    return status, json.loads(await reader.readexactly(length))
+
+
+def _post(base_url: str, path: str, body: dict):
+    request = urllib.request.Request(
+        base_url + path,
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    return urllib.request.urlopen(request, timeout=5)
+
+
+def test_chat_stream_endpoint_emits_server_sent_events(tmp_path: Path, monkeypatch):
+    registry.register("anna_engine_config", AnnaEngineConfig())
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    monkeypatch.setattr(runtime, "get_openai_client", lambda **_: client)
+    state_file = tmp_path / "state.json"
+    state_file.write_text(
+        json.dumps(
+            {
+                "mode": "full",
+                "portrait": {},
+                "report": {},
+                "previous_conversations": [],
+                "prompt": "Act as a seeker.",
+                "model_name": "m",
+            }
+        ),
+        encoding="utf-8",
+    )
+    server = service.make_server(tmp_path, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with _post(base_url, "/v1/sessions", {"state_file": "state.json"}) as resp:
+            session_id = json.loads(resp.read())["session_id"]
+        with _post(
+            base_url, "/v1/chat/stream", {"session_id": session_id, "message": "你好"}
+        ) as resp:
+            assert resp.headers["Content-Type"].startswith("text/event-stream")
+            raw = resp.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    events = [block for block in raw.split("\n\n") if block]
+    assert events[0] == 'data: {"delta": "我最近"}'
+    assert events[-1] == 'event: done\ndata: {"response": "我最近有点累。"}'
+
+
+def test_async_service_keeps_connections_alive_and_sheds_load(
+    tmp_path: Path, monkeypatch
+):
+    completions = FakeAsyncCompletions(delay=0.2)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(runtime, "get_async_openai_client", lambda **_: client)
+    _write_state(tmp_path / "state.json")
+
+    async def scenario():
+        service = AsyncService(tmp_path, max_concurrency=1, max_pending=0)
+        await service.start("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+        # 同一个 keep-alive 连接上依次发送多个请求
+        status, health = await _request(reader, writer, "GET", "/health")
+        assert (status, health["status"]) == (200, "ok")
+        assert set(health["retries"]) >= {"retries", "hedges"}
+        status, created = await _request(
+            reader, writer, "POST", "/v1/sessions", {"state_file": "state.json"}
+        )
+        session_id = created["session_id"]
+        body = {"session_id": session_id, "message": "你好"}
+        other = await asyncio.open_connection("127.0.0.1", service.port)
+        first = asyncio.create_task(_request(reader, writer, "POST", "/v1/chat", body))
+        await asyncio.sleep(0.05)
+        busy = await _request(*other, "POST", "/v1/chat", body)
+        assert (await first) == (200, {"response": "reply-1"})
+        assert busy == (503, {"error": "server busy"})
+        status, missing = await _request(reader, writer, "GET", "/nope")
+        assert status == 404
+        writer.close()
+        other[1].close()
+        await service.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_async_service_times_out_and_drains_on_shutdown(tmp_path: Path, monkeypatch):
+    completions = FakeAsyncCompletions(delay=0.3)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(runtime, "get_async_openai_client", lambda **_: client)
+    _write_state(tmp_path / "state.json")
+
+    async def scenario():
+        service = AsyncService(tmp_path, request_timeout=0.1)
+        await service.start("127.0.0.1", 0)
+        conn = await asyncio.open_connection("127.0.0.1", service.port)
+        _, created = await _request(
+            *conn, "POST", "/v1/sessions", {"state_file": "state.json"}
+        )
+        body = {"session_id": created["session_id"], "message": "你好"}
+        assert await _request(*conn, "POST", "/v1/chat", body) == (
+            504,
+            {"error": "request timed out"},
+        )
+
+        service.request_timeout = 5
+        port = service.port
+        conn = await asyncio.open_connection("127.0.0.1", port)
+        in_flight = asyncio.create_task(_request(*conn, "POST", "/v1/chat", body))
+        await asyncio.sleep(0.05)
+        await service.shutdown()
+        assert (await in_flight)[0] == 200
+        try:
+            await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            return
+        raise AssertionError("server should stop accepting after shutdown")
+
+    asyncio.run(scenario())
+
+
+def test_session_manager_spills_and_rehydrates_sessions(tmp_path: Path):
+    now = [0.0]
+
+    class Session:
+        def __init__(self, state):
+            self.state = state
+            self.messages = []
+
+    manager = SessionManager(
+        Session, tmp_path / "spill", max_sessions=2, idle_ttl=60, clock=lambda: now[0]
+    )
+    for session_id in ["a", "b", "c"]:
+        session = Session({"prompt": f"prompt-{session_id}"})
+        session.messages.append({"role": "user", "content": session_id})
+        manager[session_id] = session
+
+    assert manager.keys() == ["a", "b", "c"]
+    assert manager.stats()["live"] == 2
+    rehydrated = manager.get("a")
+    assert rehydrated.state == {"prompt": "prompt-a"}
+    assert rehydrated.messages == [{"role": "user", "content": "a"}]
+    assert manager.stats()["rehydrations"] == 1
+
+    now[0] = 120
+    manager.get("c")
+    assert manager.stats()["live"] == 1
+    assert manager.get("b").state["prompt"] == "prompt-b"
+    assert manager.get("missing") is None
+
+    small = SessionManager(Session, tmp_path / "small", max_bytes=20)
+    small["x"] = Session({"prompt": "x" * 15})
+    small["y"] = Session({"prompt": "y" * 15})
+    assert small.stats() | {"live_bytes": 0} == {
+        "live": 1,
+        "spilled": 1,
+        "live_bytes": 0,
+        "evictions": 1,
+        "rehydrations": 0,
+    }
+
+
+def test_session_manager_keeps_a_running_byte_total(tmp_path: Path):
+    class Session:
+        def __init__(self, state):
+            self.state = state
+            self.messages = []
+
+    manager = SessionManager(Session, tmp_path / "spill", max_bytes=1000)
+    first = Session({"prompt": "p" * 10})
+    manager["a"] = first
+    manager["b"] = Session({"prompt": "q" * 20})
+    assert manager.stats()["live_bytes"] == 30
+
+    manager.acquire("a")
+    first.messages.append({"role": "user", "content": "hi"})
+    first.messages.append({"role": "assistant", "content": "hello"})
+    manager.release("a")
+    assert manager.stats()["live_bytes"] == 30 + 2 + 5 + 2 * 64
+
+    manager.acquire("a")
+    first.messages[:] = [{"role": "user", "content": "hi"}]
+    manager.release("a")
+    assert manager.stats()["live_bytes"] == 30 + 2 + 64
+
+    manager.close()
+    assert manager.stats()["live_bytes"] == 0
+    assert manager.get("a").messages == first.messages
+    assert manager.stats()["live_bytes"] == 10 + 2 + 64
+
+
+def test_session_manager_keeps_acquired_sessions_until_released(tmp_path: Path):
+    now = [0.0]
+
+    class Session:
+        def __init__(self, state):
+            self.state = state
+            self.messages = []
+
+    manager = SessionManager(
+        Session, tmp_path / "spill", max_sessions=1, idle_ttl=60, clock=lambda: now[0]
+    )
+    manager["a"] = Session({"prompt": "a"})
+    busy = manager.acquire("a")
+    manager["b"] = Session({"prompt": "b"})
+    assert manager.stats()["live"] == 2
+    now[0] = 120
+    assert manager.evict_idle() == 1
+    assert manager.stats()["spilled"] == 1
+
+    manager["c"] = Session({"prompt": "c"})
+    busy.messages.append({"role": "user", "content": "你好"})
+    manager.release("a")
+    assert manager.stats()["live"] == 1
+    now[0] = 240
+    assert manager.evict_idle() == 1
+    assert manager.get("a").messages == [{"role": "user", "content": "你好"}]
+
+    sweeping = SessionManager(Session, tmp_path / "sweep", idle_ttl=0.05)
+    sweeping["x"] = Session({"prompt": "x"})
+    sweeping.start_sweeper()
+    try:
+        for _ in range(100):
+            if sweeping.stats()["live"] == 0:
+                break
+            threading.Event().wait(0.02)
+        assert sweeping.stats()["spilled"] == 1
+    finally:
+        sweeping.close()
+
+
+def test_frozen_session_streams_closed_early_keep_history_alternating(
+    tmp_path: Path, monkeypatch
+):
+    registry.register("anna_engine_config", AnnaEngineConfig())
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    monkeypatch.setattr(runtime, "get_openai_client", lambda **_: client)
+    _write_state(tmp_path / "state.json")
+    state = runtime.load_state(tmp_path / "state.json")
+
+    session = runtime.FrozenPromptSession(state)
+    stream = session.chat_stream("你好")
+    assert next(stream) == "我最近"
+    stream.close()
+    assert session.messages == [
+        {"role": "user", "content": "你好"},
+        {"role": "assistant", "content": "我最近"},
+    ]
+
+    async def create(**kwargs):
+        raise RuntimeError("endpoint went away")
+
+    aclient = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    monkeypatch.setattr(runtime, "get_async_openai_client", lambda **_: aclient)
+    asession = runtime.AsyncFrozenPromptSession(state)
+
+    async def scenario():
+        try:
+            async for _ in asession.chat_stream("你好"):
+                pass
+        except RuntimeError:
+            pass
+
+    asyncio.run(scenario())
+    assert asession.messages == []
@@ -0,0 +1,74 @@
+import json
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anna_agent import short_term_memory
+from anna_agent.common.registry import registry
+from anna_agent.config import AnnaEngineConfig
+
+
+def _tool_response(arguments):
+    tool_call = SimpleNamespace(
+        function=SimpleNamespace(arguments=json.dumps(arguments, ensure_ascii=False))
+    )
+    message = SimpleNamespace(tool_calls=[tool_call], content=None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeCompletions:
+    def __init__(self, barrier=None):
+        self.barrier = barrier
+        self.prompts = []
+
+    def create(self, **kwargs):
+        self.prompts.append(kwargs["messages"][0]["content"])
+        if kwargs["tool_choice"]["function"]["name"] == "summarizing_changes":
+            return _tool_response({"status": "睡眠改善"})
+        if self.barrier:
+            self.barrier.wait()
+        return _tool_response({"changes": ["有变化"]})
+
+
+def _scales(ghq_changed):
+    return {
+        "p_bdi": ["A"] * 21,
+        "bdi": ["B"] * 21,
+        "p_ghq": ["A"] * 28,
+        "ghq": ["C"] * 28 if ghq_changed else ["A"] * 28,
+        "p_sass": ["A"] * 21,
+        "sass": ["D"] * 21,
+    }
+
+
+def test_analyzing_changes_runs_scale_diffs_concurrently(monkeypatch):
+    registry.register("anna_engine_config", AnnaEngineConfig())
+    completions = FakeCompletions(barrier=threading.Barrier(3, timeout=5))
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(short_term_memory, "get_counselor_client", lambda **_: client)
+
+    changes = short_term_memory.analyzing_changes(_scales(ghq_changed=True))
+
+    assert changes == (["有变化"], ["有变化"], ["有变化"])
+    assert len(completions.prompts) == 3
+
+
+def test_summarize_scale_changes_skips_unchanged_scale(monkeypatch):
+    registry.register("anna_engine_config", AnnaEngineConfig())
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(short_term_memory, "get_counselor_client", lambda **_: client)
+
+    bdi, ghq, sass = short_term_memory.analyzing_changes(_scales(ghq_changed=False))
+
+    assert bdi == ["有变化"] and sass == ["有变化"]
+    assert len(ghq) == 28
+    assert all(item["change"] == "无变化" for item in ghq)
+    assert len(completions.prompts) == 2
+
+    status = short_term_memory.summarize_scale_changes(_scales(ghq_changed=False))
+    assert status == "睡眠改善"
+    assert "GHQ-1" in completions.prompts[-1]
@@ -0,0 +1,218 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anna_agent.common.registry import registry
+from anna_agent.common.stage_graph import Stage, arun_stage_graph, run_stage_graph
+from anna_agent.config import AnnaEngineConfig
+
+
+def test_stage_graph_runs_independent_stages_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+    events = []
+
+    def independent(name):
+        def run(_):
+            barrier.wait()
+            return name
+
+        return run
+
+    results = run_stage_graph(
+        [
+            Stage("a", independent("a")),
+            Stage("b", independent("b")),
+            Stage("c", independent("c")),
+            Stage(
+                "join", lambda inputs: sorted(inputs.values()), requires=("a", "b", "c")
+            ),
+        ],
+        max_workers=3,
+        on_start=lambda stage: events.append(("start", stage.name)),
+        on_finish=lambda stage, elapsed: events.append(("finish", stage.name)),
+    )
+
+    assert results["join"] == ["a", "b", "c"]
+    assert events.index(("start", "join")) > events.index(("finish", "a"))
+    assert events[-1] == ("finish", "join")
+
+
+def test_stage_graph_sequential_mode_and_errors():
+    order = []
+    results = run_stage_graph(
+        [
+            Stage(
+                "second",
+                lambda inputs: order.append("second") or inputs["first"] + 1,
+                requires=("first",),
+            ),
+            Stage("first", lambda _: order.append("first") or 1),
+        ],
+        max_workers=1,
+    )
+    assert order == ["first", "second"]
+    assert results == {"first": 1, "second": 2}
+
+    def boom(_):
+        raise RuntimeError("stage failed")
+
+    with pytest.raises(RuntimeError, match="stage failed"):
+        run_stage_graph(
+            [Stage("boom", boom), Stage("after", lambda _: 1, requires=("boom",))]
+        )
+    with pytest.raises(ValueError, match="cycle"):
+        run_stage_graph(
+            [
+                Stage("x", lambda _: 1, requires=("y",)),
+                Stage("y", lambda _: 1, requires=("x",)),
+            ]
+        )
+
+
+def test_async_stage_graph_runs_on_event_loop():
+    async def value(result, inputs=None):
+        await asyncio.sleep(0)
+        return result
+
+    results = asyncio.run(
+        arun_stage_graph(
+            [
+                Stage(
+                    "sum",
+                    lambda inputs: value(inputs["a"] + inputs["b"]),
+                    requires=("a", "b"),
+                ),
+                Stage("a", lambda _: value(1)),
+                Stage("b", lambda _: value(2)),
+            ]
+        )
+    )
+    assert results == {"a": 1, "b": 2, "sum": 3}
+
+    async def boom(_):
+        raise RuntimeError("stage failed")
+
+    with pytest.raises(RuntimeError, match="stage failed"):
+        asyncio.run(
+            arun_stage_graph(
+                [Stage("boom", boom), Stage("slow", lambda _: asyncio.sleep(10))]
+            )
+        )
+
+
+def test_ms_patient_init_follows_stage_dependencies(monkeypatch):
+    from anna_agent import ms_patient
+
+    registry.register("anna_engine_config", AnnaEngineConfig(memory_enabled=False))
+    calls = []
+
+    def record(name, value):
+        def fake(*args, **kwargs):
+            calls.append(name)
+            return value
+
+        return fake
+
+    monkeypatch.setattr(
+        ms_patient, "fill_scales_previous", record("previous", (["A"], ["A"], ["A"]))
+    )
+    monkeypatch.setattr(
+        ms_patient,
+        "gen_complaint_chain",
+        record("chain", [{"stage": 1, "content": "c"}]),
+    )
+    monkeypatch.setattr(
+        ms_patient, "situationalising_events", record("situation", "你最近搬家了")
+    )
+    monkeypatch.setattr(ms_patient, "analyze_style", record("style", ["简短"]))
+    monkeypatch.setattr(
+        ms_patient, "fill_scales", record("current", (["B"], ["B"], ["B"]))
+    )
+    monkeypatch.setattr(
+        ms_patient, "summarize_scale_changes", record("status", "情绪稳定")
+    )
+    monkeypatch.setattr(ms_patient, "get_openai_client", lambda **_: object())
+    progress = []
+
+    seeker = ms_patient.MsPatient(
+        {
+            "age": "30",
+            "gender": "女",
+            "occupation": "教师",
+            "martial_status": "已婚",
+            "symptoms": "失眠",
+        },
+        {},
+        [{"role": "Seeker", "content": "我睡不好"}],
+        progress_callback=lambda stage, detail: progress.append((stage, detail)),
+        max_workers=4,
+    )
+
+    assert calls.index("current") > calls.index("situation")
+    assert calls.index("current") > calls.index("style")
+    assert calls[-1] == "status"
+    assert seeker.status == "情绪稳定"
+    assert "你最近搬家了" in seeker.system
+    assert ("status", "Summarizing scale changes") in progress
+    assert any(stage == "status" and "done" in detail for stage, detail in progress)
+    assert progress[-1] == ("ready", "Seeker simulation is ready")
+    assert seeker.init_trace["name"] == "init"
+    assert {"current scales", "status"} <= set(seeker.init_trace["stages"])
+
+
+def test_async_ms_patient_initializes_with_async_helpers(monkeypatch):
+    from anna_agent import ms_patient
+
+    registry.register("anna_engine_config", AnnaEngineConfig(memory_enabled=False))
+    calls = []
+
+    def record(name, value):
+        async def fake(*args, **kwargs):
+            calls.append(name)
+            return value
+
+        return fake
+
+    monkeypatch.setattr(
+        ms_patient, "afill_scales_previous", record("previous", (["A"], ["A"], ["A"]))
+    )
+    monkeypatch.setattr(
+        ms_patient,
+        "agen_complaint_chain",
+        record("chain", [{"stage": 1, "content": "c"}]),
+    )
+    monkeypatch.setattr(
+        ms_patient, "asituationalising_events", record("situation", "你最近搬家了")
+    )
+    monkeypatch.setattr(ms_patient, "aanalyze_style", record("style", ["简短"]))
+    monkeypatch.setattr(
+        ms_patient, "afill_scales", record("current", (["B"], ["B"], ["B"]))
+    )
+    monkeypatch.setattr(
+        ms_patient, "asummarize_scale_changes", record("status", "情绪稳定")
+    )
+
+    seeker = asyncio.run(
+        ms_patient.AsyncMsPatient.create(
+            {
+                "age": "30",
+                "gender": "女",
+                "occupation": "教师",
+                "martial_status": "已婚",
+                "symptoms": "失眠",
+            },
+            {},
+            [{"role": "Seeker", "content": "我睡不好"}],
+        )
+    )
+
+    assert calls.index("current") > calls.index("situation")
+    assert calls[-1] == "status"
+    assert seeker.initialized
+    assert seeker.status == "情绪稳定"
+    assert "你最近搬家了" in seeker.system
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from openai.types.chat import ChatCompletion
+
+from anna_agent import ms_patient
+from anna_agent.common.fallbacks import fallbacks
+from anna_agent.common.registry import registry
+from anna_agent.common.stage_graph import Stage, run_stage_graph
+from anna_agent.common.tracing import (
+    AsyncTracingClient,
+    JsonlSpanExporter,
+    Trace,
+    TracingClient,
+    activate,
+    ain_stage,
+    build_exporters,
+    stage,
+    submit,
+)
+from anna_agent.config import AnnaEngineConfig
+from anna_agent.llm_cache import CachingChatClient, LLMResponseCache, MemoryCacheBackend
+
+
+def _completion(content="好的", prompt_tokens=12, completion_tokens=3):
+    return ChatCompletion.model_validate(
+        {
+            "id": "c",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "m",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+    )
+
+
+def _fake_client(create):
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+def _llm_spans(summary):
+    return [span for span in summary["spans"] if span["kind"] == "llm"]
+
+
+def test_tracing_client_records_stage_tokens_cache_hits_and_fallbacks(tmp_path):
+    cache = LLMResponseCache(MemoryCacheBackend())
+    inner = CachingChatClient(_fake_client(lambda **_: _completion()), cache)
+    client = TracingClient(inner, "http://vllm:8000/v1")
+    exporter = JsonlSpanExporter(tmp_path / "logs" / "traces.jsonl")
+
+    # Outside a trace calls are not recorded.
+    client.chat.completions.create(
+        model="m", messages=[{"role": "user", "content": "a"}]
+    )
+
+    trace = Trace("turn", [exporter])
+    with activate(trace):
+        with stage("emotion"):
+            request = {"model": "m", "messages": [{"role": "user", "content": "b"}]}
+            client.chat.completions.create(**request)
+            client.chat.completions.create(**request)
+            fallbacks.record("emotion")
+        with stage("reply"):
+            fallbacks.record("seeker_reply")
+    summary = trace.finish()
+
+    first, second = _llm_spans(summary)
+    assert (first["stage"], first["endpoint"], first["model"]) == (
+        "emotion",
+        "http://vllm:8000/v1",
+        "m",
+    )
+    assert (first["prompt_tokens"], first["completion_tokens"]) == (12, 3)
+    assert (first["cache_hit"], second["cache_hit"]) == (False, True)
+    assert (first["fallback"], second["fallback"]) == ("", "emotion")
+    assert summary["llm_calls"] == 2
+    assert summary["prompt_tokens"] == 24
+    assert summary["cache_hits"] == 1
+    assert summary["fallbacks"] == ["emotion", "seeker_reply"]
+    assert summary["stages"]["emotion"]["llm_calls"] == 2
+    assert summary["stages"]["reply"]["fallbacks"] == 1
+
+    lines = (tmp_path / "logs" / "traces.jsonl").read_text(encoding="utf-8")
+    spans = [json.loads(line) for line in lines.splitlines()]
+    assert spans[0]["kind"] == "trace" and spans[0]["name"] == "turn"
+    assert {span["trace_id"] for span in spans} == {trace.trace_id}
+    assert len(spans) == len(summary["spans"]) + 1
+
+
+def test_streamed_spans_end_with_the_stream_and_read_final_usage():
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        usage = SimpleNamespace(prompt_tokens=40, completion_tokens=2)
+        return iter(
+            [
+                SimpleNamespace(usage=None),
+                SimpleNamespace(usage=None),
+                SimpleNamespace(usage=usage),
+            ]
+        )
+
+    client = TracingClient(_fake_client(create), "e")
+    trace = Trace("turn")
+    with activate(trace), stage("reply"):
+        stream = client.chat.completions.create(model="m", stream=True)
+    assert _llm_spans(trace.summary()) == []
+
+    assert len(list(stream)) == 3
+    (span,) = _llm_spans(trace.finish())
+    assert (span["stage"], span["prompt_tokens"], span["completion_tokens"]) == (
+        "reply",
+        40,
+        2,
+    )
+    assert requests[0]["stream_options"] == {"include_usage": True}
+
+    client.chat.completions.create(model="m", stream=True)
+    assert "stream_options" not in requests[1]
+
+
+def test_trace_follows_threads_started_with_submit_and_gathered_coroutines():
+    seen = []
+    lock = threading.Lock()
+
+    def create(**kwargs):
+        with lock:
+            seen.append(threading.current_thread().name)
+        return _completion()
+
+    client = TracingClient(_fake_client(create), "e")
+    stages = [
+        Stage(
+            name,
+            lambda _: client.chat.completions.create(model="m"),
+        )
+        for name in ["trigger", "style", "complaint chain"]
+    ]
+    trace = Trace("init")
+    with activate(trace):
+        run_stage_graph(stages, max_workers=3)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            submit(executor, client.chat.completions.create, model="m").result()
+    summary = trace.finish()
+
+    assert sorted(span["stage"] for span in _llm_spans(summary)) == [
+        "",
+        "complaint chain",
+        "style",
+        "trigger",
+    ]
+    assert summary["stages"]["style"]["duration"] > 0
+    assert all(name != threading.current_thread().name for name in seen)
+
+    async def acreate(**kwargs):
+        await asyncio.sleep(0.01)
+        return _completion(prompt_tokens=5)
+
+    aclient = AsyncTracingClient(_fake_client(acreate), "e")
+
+    async def turn():
+        trace = Trace("turn")
+        with activate(trace):
+            await asyncio.gather(
+                ain_stage("emotion", aclient.chat.completions.create(model="m")),
+                ain_stage("memory lookup", aclient.chat.completions.create(model="m")),
+            )
+        return trace.finish()
+
+    summary = asyncio.run(turn())
+    assert sorted(summary["stages"]) == ["emotion", "memory lookup"]
+    assert summary["prompt_tokens"] == 10
+
+
+def test_build_exporters_follow_tracing_settings(tmp_path, caplog):
+    assert build_exporters(AnnaEngineConfig(tracing_enabled=False), tmp_path) == []
+    # A relative path needs a workspace to live in.
+    assert build_exporters(AnnaEngineConfig(), None) == []
+
+    (exporter,) = build_exporters(AnnaEngineConfig(), tmp_path)
+    assert exporter.path == tmp_path / "logs" / "traces.jsonl"
+
+    otel = AnnaEngineConfig(tracing_path="", tracing_otel=True)
+    try:
+        import opentelemetry  # noqa: F401
+    except ImportError:
+        assert build_exporters(otel, tmp_path) == []
+        assert "opentelemetry-api is not installed" in caplog.text
+
+
+def test_chat_attaches_turn_trace_to_last_turn_context(monkeypatch):
+    registry.register(
+        "anna_engine_config",
+        AnnaEngineConfig(model_name="m", concurrency_turn_pipeline=False),
+    )
+    registry.register("span_exporters", [])
+    monkeypatch.setattr(ms_patient, "emotion_modulation", lambda *args: "sadness")
+    monkeypatch.setattr(ms_patient, "switch_complaint", lambda chain, index, _: index)
+    monkeypatch.setattr(ms_patient, "is_need", lambda message: False)
+    seeker = ms_patient.MsPatient.__new__(ms_patient.MsPatient)
+    seeker.portrait = {"age": "30"}
+    seeker.conversation = []
+    seeker.messages = []
+    seeker.complaint_chain = [
+        {"stage": 1, "content": "失眠"},
+        {"stage": 2, "content": "工作压力"},
+    ]
+    seeker.chain_index = 1
+    seeker.system = "Act as a seeker."
+    seeker.last_turn_context = {}
+    seeker.client = TracingClient(_fake_client(lambda **_: _completion("嗯")), "e")
+
+    assert seeker.chat("你好") == "嗯"
+
+    trace = seeker.last_turn_context["trace"]
+    assert seeker.last_turn_context["emotion"] == "sadness"
+    assert trace["name"] == "turn"
+    assert set(trace["stages"]) == {
+        "emotion",
+        "complaint switch",
+        "memory lookup",
+        "reply",
+    }
+    assert trace["stages"]["reply"]["llm_calls"] == 1
+    assert trace["completion_tokens"] == 3
+    registry.unregister("span_exporters")